@@ -1,47 +1,113 @@
 from datetime import datetime
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
 from bson import ObjectId
 
+from app.core.config import settings
 from app.core.security import get_current_active_user, get_current_admin_user
+from app.core.etag import not_modified, required_version, version_etag
 from app.models.user import User, UserInDB, UserUpdate
-from app.crud.crud_user import user as crud_user
+from app.crud.crud_user import SEARCH_PROJECTION, user as crud_user
+from app.crud.crud_admin import admin as crud_admin
+from app.models.enums import UserRole
 from app.schemas.base import ResponseModel, ListResponse
 from app.schemas.user import UserResponse
+from app.schemas.admin import BulkActivationUpdate, BulkRoleUpdate, BulkUserSelection
+from app.services.user_export import EXPORT_MEDIA_TYPES, EXPORT_STREAMS, export_cursor
+from app.services.user_cleanup import user_cleanup
+from app.crud.crud_cleanup_job import cleanup_job
+from app.db.indexes import index_usage, reconcile_indexes
+from app.crud.crud_user_stats import user_stats
+from app.core.responses import standard_response
 
 router = APIRouter()
 
-def standard_response(success: bool, data: any = None, message: str = "", status_code: int = 200):
-    return {
-        "success": success,
-        "data": data,
-        "message": message,
-        "timestamp": datetime.utcnow().isoformat() + "Z"
-    }
-
 @router.get("/users/", response_model=ListResponse)
 async def admin_list_users(
-    skip: int = 0,
-    limit: int = 100,
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.ADMIN_PAGE_SIZE_DEFAULT, ge=1, le=settings.ADMIN_PAGE_SIZE_MAX),
+    include_total: bool = False,
     current_user: UserInDB = Depends(get_current_admin_user),
 ):
     """
-    Retrieve all users (admin only)
+    Retrieve all users (admin only), newest first.
+    Pass ``next_cursor`` from the previous page as ``cursor`` to continue;
+    ``include_total`` adds an estimated total count.
     """
-    users = []
-    total = await crud_user.collection.count_documents({})
+    users, next_cursor = await crud_user.list_page(limit, cursor)
+    total = await crud_user.estimated_count() if include_total else None
     
-    async for user_data in crud_user.collection.find().skip(skip).limit(limit):
-        users.append(UserInDB(**user_data))
+    return standard_response(
+        True,
+        data={"items": users, "total": total, "limit": limit, "next_cursor": next_cursor},
+        message="Users retrieved successfully"
+    )
+
+@router.get("/users/search", response_model=ListResponse)
+async def admin_search_users(
+    q: Optional[str] = Query(None, min_length=2, max_length=100, description="Full-text search on email and name"),
+    prefix: Optional[str] = Query(None, min_length=1, max_length=100, description="Case-insensitive prefix (autocomplete)"),
+    prefix_field: Literal["email", "name"] = "email",
+    role: Optional[UserRole] = None,
+    is_active: Optional[bool] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(settings.ADMIN_PAGE_SIZE_DEFAULT, ge=1, le=settings.ADMIN_PAGE_SIZE_MAX),
+    current_user: UserInDB = Depends(get_current_admin_user),
+):
+    """
+    Search and filter users (admin only), newest first, paginated by cursor
+    """
+    query = crud_user.build_search_query(
+        q=q,
+        prefix=prefix,
+        prefix_field=prefix_field,
+        role=role.value if role else None,
+        is_active=is_active,
+        created_from=created_from,
+        created_to=created_to,
+    )
+    users, next_cursor = await crud_user.list_page(limit, cursor, query=query, projection=SEARCH_PROJECTION)
     
     return standard_response(
         True,
-        data={"items": users, "total": total, "skip": skip, "limit": limit},
+        data={"items": users, "limit": limit, "next_cursor": next_cursor},
         message="Users retrieved successfully"
     )
 
+@router.get("/users/export")
+async def admin_export_users(
+    export_format: Literal["ndjson", "csv"] = Query("ndjson", alias="format"),
+    q: Optional[str] = Query(None, min_length=2, max_length=100),
+    role: Optional[UserRole] = None,
+    is_active: Optional[bool] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    current_user: UserInDB = Depends(get_current_admin_user),
+):
+    """
+    Stream all users, or the filtered subset, as NDJSON or CSV (admin only).
+    Rows are written as the cursor delivers them, in constant memory.
+    """
+    query = crud_user.build_search_query(
+        q=q,
+        role=role.value if role else None,
+        is_active=is_active,
+        created_from=created_from,
+        created_to=created_to,
+    )
+    filename = f"users-{datetime.utcnow():%Y%m%d-%H%M%S}.{export_format}"
+    return StreamingResponse(
+        EXPORT_STREAMS[export_format](export_cursor(query)),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
 @router.get("/users/{user_id}", response_model=UserResponse)
 async def admin_get_user(
+    request: Request,
     user_id: str,
     current_user: UserInDB = Depends(get_current_admin_user),
 ):
@@ -61,16 +127,22 @@ async def admin_get_user(
             detail="User not found"
         )
     
-    return standard_response(True, data=user, message="User retrieved successfully")
+    etag = version_etag(user.updated_at)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    
+    return standard_response(True, data=user.to_public(), message="User retrieved successfully", headers={"ETag": etag})
 
 @router.patch("/users/{user_id}", response_model=UserResponse)
 async def admin_update_user(
+    request: Request,
     user_id: str,
     user_update: UserUpdate,
     current_user: UserInDB = Depends(get_current_admin_user),
 ):
     """
-    Update a user (admin only)
+    Update a user (admin only); honours If-Match for optimistic concurrency
     """
     if not ObjectId.is_valid(user_id):
         raise HTTPException(
@@ -78,21 +150,17 @@ async def admin_update_user(
             detail="Invalid user ID format"
         )
     
-    user = await crud_user.get(user_id)
-    if not user:
+    updated_user = await crud_user.update(user_id, user_update, required_version(request))
+    if not updated_user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
     
-    updated_user = await crud_user.update(user_id, user_update)
-    if not updated_user:
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to update user"
-        )
-    
-    return standard_response(True, data=updated_user, message="User updated successfully")
+    return standard_response(
+        True, data=updated_user.to_public(), message="User updated successfully",
+        headers={"ETag": version_etag(updated_user.updated_at)}
+    )
 
 @router.delete("/users/{user_id}", response_model=ResponseModel)
 async def admin_delete_user(
@@ -128,4 +196,139 @@ async def admin_delete_user(
             detail="Failed to delete user"
         )
     
+    # Uploaded files are removed in the background; see GET /users/{user_id}/cleanup
+    await user_cleanup.enqueue(user_id)
+    
     return standard_response(True, message="User deleted successfully")
+
+async def _bulk_targets(selection: BulkUserSelection) -> List[str]:
+    if selection.user_ids:
+        return selection.user_ids
+    criteria = selection.filter
+    query = crud_user.build_search_query(
+        role=criteria.role.value if criteria.role else None,
+        is_active=criteria.is_active,
+        created_from=criteria.created_from,
+        created_to=criteria.created_to,
+    )
+    user_ids = await crud_admin.resolve_filter(query, settings.ADMIN_BULK_MAX_USERS + 1)
+    if len(user_ids) > settings.ADMIN_BULK_MAX_USERS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Filter matches more than {settings.ADMIN_BULK_MAX_USERS} users; narrow it down"
+        )
+    return user_ids
+
+def _bulk_response(results: List[dict], message: str):
+    return standard_response(
+        True,
+        data={"results": results, "summary": crud_admin.summarize(results)},
+        message=message
+    )
+
+@router.post("/users/bulk/role", response_model=ResponseModel)
+async def admin_bulk_update_role(
+    bulk_in: BulkRoleUpdate,
+    current_user: UserInDB = Depends(get_current_admin_user),
+):
+    """
+    Change the role of many users at once (admin only)
+    """
+    user_ids = await _bulk_targets(bulk_in)
+    results = await crud_admin.bulk_update(user_ids, {"role": bulk_in.role.value}, exclude=str(current_user.id))
+    return _bulk_response(results, "Roles updated")
+
+@router.post("/users/bulk/activation", response_model=ResponseModel)
+async def admin_bulk_update_activation(
+    bulk_in: BulkActivationUpdate,
+    current_user: UserInDB = Depends(get_current_admin_user),
+):
+    """
+    Activate or deactivate many users at once (admin only)
+    """
+    user_ids = await _bulk_targets(bulk_in)
+    results = await crud_admin.bulk_update(user_ids, {"is_active": bulk_in.is_active}, exclude=str(current_user.id))
+    return _bulk_response(results, "Users activated" if bulk_in.is_active else "Users deactivated")
+
+@router.post("/users/bulk/delete", response_model=ResponseModel)
+async def admin_bulk_delete(
+    bulk_in: BulkUserSelection,
+    current_user: UserInDB = Depends(get_current_admin_user),
+):
+    """
+    Delete many users at once (admin only)
+    """
+    user_ids = await _bulk_targets(bulk_in)
+    results = await crud_admin.bulk_delete(user_ids, exclude=str(current_user.id))
+    await user_cleanup.enqueue(*(result["id"] for result in results if result["status"] == "deleted"))
+    return _bulk_response(results, "Users deleted")
+
+@router.get("/users/{user_id}/cleanup", response_model=ResponseModel)
+async def admin_get_user_cleanup(
+    user_id: str,
+    current_user: UserInDB = Depends(get_current_admin_user),
+):
+    """
+    Progress of the background deletion of a deleted user's files (admin only)
+    """
+    job = await cleanup_job.get(user_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No cleanup job for this user"
+        )
+    
+    job.pop("holder", None)
+    return standard_response(True, data=job, message="Cleanup job retrieved successfully")
+
+@router.get("/stats", response_model=ResponseModel)
+async def admin_user_stats(
+    days: int = Query(settings.ADMIN_STATS_DAYS_DEFAULT, ge=1, le=settings.ADMIN_STATS_DAYS_MAX),
+    current_user: UserInDB = Depends(get_current_admin_user),
+):
+    """
+    User totals and signups per day from maintained counters (admin only)
+    """
+    totals = await user_stats.get_totals() or {}
+    signups = await user_stats.get_signups(max(days, 7))
+    
+    return standard_response(
+        True,
+        data={
+            "users": {
+                "total": totals.get("total", 0),
+                "active": totals.get("active", 0),
+                "inactive": totals.get("inactive", 0),
+                "verified": totals.get("verified", 0),
+                "by_role": totals.get("by_role", {}),
+                "new_today": signups[-1]["count"],
+                "new_this_week": sum(day["count"] for day in signups[-7:]),
+            },
+            "signups": signups[-days:],
+            "updated_at": totals.get("updated_at"),
+            "reconciled_at": totals.get("reconciled_at"),
+        },
+        message="Statistics retrieved successfully"
+    )
+
+@router.get("/indexes", response_model=ResponseModel)
+async def admin_index_report(
+    current_user: UserInDB = Depends(get_current_admin_user),
+):
+    """
+    Index usage from $indexStats with unused and hot indexes flagged, and
+    drift from the index registry (admin only)
+    """
+    indexes = await index_usage(settings.INDEX_HOT_OPS_PER_HOUR)
+    drift = await reconcile_indexes(apply=False)
+    
+    return standard_response(
+        True,
+        data={
+            "indexes": indexes,
+            "unused": [f"{row['collection']}.{row['name']}" for row in indexes if row["unused"]],
+            "hot": [f"{row['collection']}.{row['name']}" for row in indexes if row["hot"]],
+            "drift": drift,
+        },
+        message="Index report generated successfully"
+    )
@@ -1,6 +1,5 @@
-from datetime import timedelta, datetime
+from datetime import timedelta
 from fastapi import APIRouter, HTTPException, status, Request
-from typing import Any
 
 from app.core.security import (
     create_access_token,
@@ -13,6 +12,7 @@ from app.schemas.token import (
     RegisterRequest,
 )
 from app.models.user import UserCreate, UserInDB
+from app.core.responses import standard_response
 
 router = APIRouter()
 
@@ -22,14 +22,6 @@ blacklisted_tokens = set()
 def is_token_blacklisted(token: str) -> bool:
     return token in blacklisted_tokens
 
-def standard_response(success: bool, data: Any = None, message: str = "", status_code: int = 200):
-    return {
-        "success": success,
-        "data": data,
-        "message": message,
-        "timestamp": datetime.utcnow().isoformat() + "Z"
-    }
-
 @router.post("/login")
 async def login(login_data: LoginRequest):
     """
@@ -54,12 +46,12 @@ async def login(login_data: LoginRequest):
     # Create access token
     access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     access_token = create_access_token(
-        data={"sub": str(user.id)},
+        data={"sub": str(user.id), "role": user.role},
         expires_delta=access_token_expires
     )
     
     # Create refresh token
-    refresh_token = create_refresh_token(str(user.id))
+    refresh_token = create_refresh_token(str(user.id), user.role)
     
     # Prepare user data for response
     user_data = user.dict(exclude={
@@ -99,12 +91,12 @@ async def register(user_in: RegisterRequest):
         # Create access token
         access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
         access_token = create_access_token(
-            data={"sub": str(user.id)},
+            data={"sub": str(user.id), "role": user.role},
             expires_delta=access_token_expires
         )
         
         # Create refresh token
-        refresh_token = create_refresh_token(str(user.id))
+        refresh_token = create_refresh_token(str(user.id), user.role)
         
         # Prepare user data for response
         user_data = user.dict(exclude={
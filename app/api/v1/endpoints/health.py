@@ -1,23 +1,17 @@
-import os
-import platform
-import psutil
-from datetime import datetime, timezone
 from fastapi import APIRouter, Depends
 from fastapi.responses import JSONResponse
 from app.core.config import settings
+from app.core.lifecycle import lifecycle
 from app.db.session import Database
 from app.services.storage import storage
+from app.services.post_processing import post_processing
+from app.middleware.admission import upload_admission
+from app.services.system_monitor import system_monitor
+from app.services.readiness import readiness
+from app.core.responses import standard_response
 
 router = APIRouter()
 
-def standard_response(success: bool, data: any = None, message: str = "", status_code: int = 200):
-    return {
-        "success": success,
-        "data": data,
-        "message": message,
-        "timestamp": datetime.now(timezone.utc).isoformat()
-    }
-
 @router.get("")
 async def health_check():
     """
@@ -33,6 +27,29 @@ async def health_check():
         message="Health check successful"
     )
 
+@router.get("/live")
+async def liveness_check():
+    """
+    Liveness probe: the process is serving requests. Checks no dependencies.
+    """
+    return standard_response(True, data={"status": "alive"}, message="Alive")
+
+@router.get("/ready")
+async def readiness_check():
+    """
+    Readiness probe: all dependencies checked concurrently with per-check
+    deadlines; results are cached briefly and refreshed single-flight
+    """
+    if lifecycle.draining:
+        # Fail fast so the load balancer stops routing here while requests drain
+        return standard_response(
+            False, data={"ready": False, **lifecycle.state()}, message="Draining", status_code=503
+        )
+    result = await readiness.check()
+    if not result["ready"]:
+        return standard_response(False, data=result, message="Not ready", status_code=503)
+    return standard_response(True, data=result, message="Ready")
+
 @router.get("/db")
 async def db_health_check():
     """
@@ -99,39 +116,31 @@ async def storage_health_check():
             message="Storage unhealthy"
         )
 
+@router.get("/pipeline")
+async def pipeline_health_check():
+    """
+    Post-upload processing queue depth and counters
+    """
+    return standard_response(
+        True,
+        data={"post_processing": post_processing.stats()},
+        message="Pipeline stats fetched successfully"
+    )
+
+@router.get("/uploads")
+async def uploads_health_check():
+    """
+    Upload admission controller gauges for this worker
+    """
+    return standard_response(
+        True,
+        data={"admission": upload_admission.stats()},
+        message="Upload admission stats fetched successfully"
+    )
+
 @router.get("/system")
 async def system_info():
     """
-    System information and resource usage
-    """
-    # Get system information
-    system_info = {
-        "os": {
-            "system": platform.system(),
-            "release": platform.release(),
-            "version": platform.version(),
-            "machine": platform.machine(),
-            "processor": platform.processor(),
-            "python_version": platform.python_version()
-        },
-        "resources": {
-            "cpu_percent": psutil.cpu_percent(interval=1),
-            "cpu_count": psutil.cpu_count(),
-            "memory_total": psutil.virtual_memory().total,
-            "memory_available": psutil.virtual_memory().available,
-            "memory_percent": psutil.virtual_memory().percent,
-            "disk_usage": psutil.disk_usage('/')._asdict() if hasattr(psutil, 'disk_usage') else {}
-        },
-        "process": {
-            "pid": os.getpid(),
-            "name": psutil.Process().name(),
-            "status": psutil.Process().status(),
-            "create_time": datetime.fromtimestamp(psutil.Process().create_time()).isoformat(),
-            "cpu_percent": psutil.Process().cpu_percent(interval=0.1),
-            "memory_info": psutil.Process().memory_info()._asdict(),
-            "open_files": len(psutil.Process().open_files()),
-            "connections": len(psutil.Process().connections())
-        }
-    }
-    
-    return standard_response(True, data=system_info, message="System info fetched successfully")
+    System information and resource usage (latest background sample)
+    """
+    return standard_response(True, data=system_monitor.snapshot(), message="System info fetched successfully")
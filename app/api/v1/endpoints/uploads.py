@@ -1,24 +1,27 @@
 import os
-from fastapi import APIRouter, Depends, File, UploadFile, HTTPException, status
+import asyncio
+from fastapi import APIRouter, BackgroundTasks, Depends, File, Request, UploadFile, HTTPException, status
+from fastapi.responses import StreamingResponse
 from typing import Optional, List
+from slugify import slugify
 from app.core.security import get_current_active_user
 from app.core.config import settings
+from app.core.etag import blob_etag, not_modified
 from app.services.storage import storage
+from app.services.archive import build_entries, stream_zip
+from app.services.post_processing import post_processing
+from app.services.storage_usage import folder_of, quota_for
+from app.crud.crud_storage_usage import storage_usage
 from app.models.user import UserInDB
-from datetime import datetime
+from app.schemas.upload import ArchiveRequest
+from app.core.responses import standard_response
 
 router = APIRouter()
 
-def standard_response(success: bool, data: any = None, message: str = "", status_code: int = 200):
-    return {
-        "success": success,
-        "data": data,
-        "message": message,
-        "timestamp": datetime.utcnow().isoformat() + "Z"
-    }
-
 @router.post("/")
 async def upload_file(
+    request: Request,
+    background_tasks: BackgroundTasks,
     file: UploadFile = File(...),
     folder: Optional[str] = None,
     current_user: dict = Depends(get_current_active_user)
@@ -26,18 +29,31 @@ async def upload_file(
     """
     Upload a file to the storage
     """
-    # Check file size
+    # Check file size against the per-route/per-role limit resolved by
+    # BodySizeLimitMiddleware (which already capped the raw body)
+    max_size = getattr(request.state, "body_limit", settings.MAX_UPLOAD_SIZE)
     file.file.seek(0, 2)  # Move to the end of the file
     file_size = file.file.tell()
     file.file.seek(0)  # Reset file pointer
     
-    if file_size > settings.MAX_UPLOAD_SIZE:
+    if file_size > max_size:
         raise HTTPException(
             status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-            detail=f"File too large. Maximum size is {settings.MAX_UPLOAD_SIZE} bytes"
+            detail=f"File too large. Maximum size is {max_size} bytes"
         )
     
-    # Read the file content (no MIME type detection)
+    # Check the storage quota (a single _id lookup on the usage counters)
+    user_id = str(current_user.id)
+    quota = quota_for(current_user.role)
+    if quota > 0:
+        usage = await storage_usage.get_user_usage(user_id)
+        if usage["bytes"] + file_size > quota:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"Storage quota exceeded. {usage['bytes']} of {quota} bytes used"
+            )
+    
+    # Read the file content (MIME type is sniffed later by post-processing)
     file_content = await file.read()
     
     # Upload the file
@@ -54,11 +70,18 @@ async def upload_file(
             content_type=content_type,
             folder=folder,
             metadata={
-                "uploaded_by": current_user["user_id"],
+                "uploaded_by": user_id,
                 "original_filename": file.filename
-            }
+            },
+            # Indexed, so a deleted user's blobs can be found without a listing
+            tags={"uploaded_by": user_id}
         )
         
+        await storage_usage.record(user_id, folder_of(result["file_id"]), result["size"], 1)
+        
+        # Sniffing, checksums and thumbnails run after the response is sent
+        background_tasks.add_task(post_processing.enqueue, result["file_id"])
+        
         return standard_response(True, data=result, message="File uploaded successfully")
         
     except Exception as e:
@@ -111,8 +134,68 @@ async def list_files(
             detail=f"Error listing files: {str(e)}"
         )
 
+@router.get("/usage")
+async def get_storage_usage(
+    current_user: UserInDB = Depends(get_current_active_user)
+):
+    """
+    Get the current user's storage usage, per folder, and quota
+    """
+    user_id = str(current_user.id)
+    usage = await storage_usage.get_user_usage(user_id)
+    folders = await storage_usage.get_folder_usage(user_id)
+    
+    return standard_response(
+        True,
+        data={
+            "bytes": usage["bytes"],
+            "objects": usage["objects"],
+            "quota": quota_for(current_user.role) or None,
+            "folders": folders
+        },
+        message="Storage usage fetched successfully"
+    )
+
+@router.post("/archive")
+async def download_archive(
+    archive_in: ArchiveRequest,
+    current_user: dict = Depends(get_current_active_user)
+):
+    """
+    Download several files, or a whole folder, as one streamed ZIP archive
+    """
+    if archive_in.folder:
+        blobs = await storage.list_folder(archive_in.folder)
+    else:
+        blobs = await asyncio.gather(*(storage.get_properties(file_id) for file_id in archive_in.file_ids))
+        missing = [file_id for file_id, blob in zip(archive_in.file_ids, blobs) if blob is None]
+        if missing:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Files not found: {', '.join(missing)}"
+            )
+    
+    if not blobs:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No files to archive"
+        )
+    if len(blobs) > settings.ARCHIVE_MAX_FILES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Too many files. Maximum is {settings.ARCHIVE_MAX_FILES} per archive"
+        )
+    
+    archive_name = slugify(archive_in.archive_name or archive_in.folder or "files") or "files"
+    return StreamingResponse(
+        stream_zip(build_entries(blobs, folder=archive_in.folder)),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{archive_name}.zip"'}
+    )
+
 @router.get("/{file_id}")
 async def get_file(
+    request: Request,
     file_id: str,
     current_user: dict = Depends(get_current_active_user)
 ):
@@ -120,15 +203,25 @@ async def get_file(
     Get file information
     """
     try:
-        file_info = await storage.get_file_info(file_id)
-        if not file_info:
+        properties = await storage.get_properties(file_id)
+        if properties is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="File not found"
             )
+        
+        # Answer revalidations before signing a SAS URL or serializing anything
+        expiry = storage.sas_expiry()
+        etag = blob_etag(properties.etag, expiry)
+        cached = not_modified(request, etag)
+        if cached:
+            return cached
             
-        return standard_response(True, data=file_info, message="File info fetched successfully")
+        file_info = storage.describe_file(file_id, properties, expiry)
+        return standard_response(True, data=file_info, message="File info fetched successfully", headers={"ETag": etag})
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -171,15 +264,25 @@ async def delete_file(
     """
     try:
         # In a real app, you would check if the user has permission to delete this file
-        success = await storage.delete_file(file_id)
+        properties = await storage.get_properties(file_id)
+        success = properties is not None and await storage.delete_file(file_id)
         if not success:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="File not found"
             )
+        
+        # Thumbnails are only referenced from the file's metadata
+        await post_processing.delete_variants(properties.metadata)
+        
+        owner_id = properties.metadata.get("uploaded_by")
+        if owner_id:
+            await storage_usage.record(owner_id, folder_of(file_id), -properties.size, -1)
             
         return standard_response(True, message="File deleted successfully")
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -1,61 +1,62 @@
-from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 
 
 from app.core.security import get_current_active_user, get_current_admin_user
-from app.models.user import  UserUpdate
+from app.core.etag import not_modified, required_version, version_etag
+from app.models.user import  UserInDB, UserUpdate
 from app.crud.crud_user import user as crud_user
+from app.core.responses import standard_response
+from app.services.user_cleanup import user_cleanup
 
 router = APIRouter()
 
-def standard_response(success: bool, data: any = None, message: str = "", status_code: int = 200):
-    return {
-        "success": success,
-        "data": data,
-        "message": message,
-        "timestamp": datetime.utcnow().isoformat() + "Z"
-    }
-
 @router.get("/me")
-async def read_user_me(current_user: dict = Depends(get_current_active_user)):
+async def read_user_me(request: Request, current_user: UserInDB = Depends(get_current_active_user)):
     """
     Get current user
     """
-    user = await crud_user.get(current_user["user_id"])
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="User not found"
-        )
-    return standard_response(True, data=user, message="User profile fetched successfully")
+    # The auth dependency has already loaded the user document
+    etag = version_etag(current_user.updated_at)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    return standard_response(
+        True, data=current_user.to_public(), message="User profile fetched successfully", headers={"ETag": etag}
+    )
 
 @router.put("/me")
 async def update_user_me(
+    request: Request,
     user_update: UserUpdate,
-    current_user: dict = Depends(get_current_active_user)
+    current_user: UserInDB = Depends(get_current_active_user)
 ):
     """
-    Update current user
+    Update current user; send If-Match with the ETag from GET to reject lost updates
     """
-    user = await crud_user.update(current_user["user_id"], user_update)
+    user = await crud_user.update(str(current_user.id), user_update, required_version(request))
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
-    return standard_response(True, data=user, message="User profile updated successfully")
+    return standard_response(
+        True, data=user.to_public(), message="User profile updated successfully",
+        headers={"ETag": version_etag(user.updated_at)}
+    )
 
 @router.delete("/me")
 async def delete_user_me(
-    current_user: dict = Depends(get_current_active_user)
+    current_user: UserInDB = Depends(get_current_active_user)
 ):
     """
     Delete current user
     """
-    success = await crud_user.delete(current_user["user_id"])
+    success = await crud_user.delete(str(current_user.id))
     if not success:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="User not found"
         )
+    # Uploaded files are removed in the background
+    await user_cleanup.enqueue(str(current_user.id))
     return standard_response(True, message="User deleted successfully")
@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
-from typing import Optional
+from typing import Dict, List, Optional
 import os
 from dotenv import load_dotenv
 
@@ -23,9 +23,66 @@ class Settings(BaseSettings):
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REFRESH_TOKEN_EXPIRE_DAYS: int = 7
     
+    # Access log: errors and slow requests are always logged, the rest sampled
+    ACCESS_LOG_SAMPLE_RATE: float = 0.1
+    ACCESS_LOG_SLOW_MS: float = 1000.0
+    
+    # Response compression
+    COMPRESSION_MIN_SIZE: int = 1024  # bytes
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 4
+    COMPRESSION_ZSTD_LEVEL: int = 3
+    
+    # Readiness probe
+    READINESS_CHECK_TIMEOUT: float = 2.0  # seconds per dependency
+    READINESS_CACHE_TTL: float = 5.0  # seconds
+    
+    # /health/system background sampler
+    SYSTEM_SAMPLE_INTERVAL: float = 5.0  # seconds
+    
+    # Graceful shutdown: readiness fails for SHUTDOWN_DRAIN_DELAY before the
+    # listener closes, then in-flight work gets up to SHUTDOWN_DRAIN_TIMEOUT
+    SHUTDOWN_DRAIN_DELAY: float = 5.0  # seconds
+    SHUTDOWN_DRAIN_TIMEOUT: float = 20.0  # seconds
+    
+    # Admin user listing
+    ADMIN_PAGE_SIZE_DEFAULT: int = 50
+    ADMIN_PAGE_SIZE_MAX: int = 100
+    
+    # Admin dashboard statistics
+    ADMIN_STATS_DAYS_DEFAULT: int = 30  # days of signups returned
+    ADMIN_STATS_DAYS_MAX: int = 365
+    USER_STATS_RECONCILE_INTERVAL: int = 24 * 60 * 60  # seconds, 0 disables
+    
+    # Bulk admin operations
+    ADMIN_BULK_MAX_USERS: int = 10000  # per request, ids or filter matches
+    ADMIN_BULK_CHUNK_SIZE: int = 500  # operations per bulk_write
+    
+    # Streaming user export
+    EXPORT_BATCH_SIZE: int = 2000  # documents per cursor batch
+    EXPORT_FLUSH_BYTES: int = 64 * 1024  # bytes buffered per streamed chunk
+    
     # Database
     MONGODB_URL: str
     DATABASE_NAME: str = "runtime_traitors"
+    # Read routing for admin listing, search, export and stats; auth reads
+    # always use the primary. "primary", "secondaryPreferred" or "nearest"
+    ANALYTICS_READ_PREFERENCE: str = "secondaryPreferred"
+    ANALYTICS_MAX_STALENESS_SECONDS: int = 90  # MongoDB minimum is 90; 0 = no bound
+    
+    # Index registry (app/db/indexes.py): create missing indexes at startup
+    INDEX_RECONCILE_ON_STARTUP: bool = True
+    INDEX_HOT_OPS_PER_HOUR: float = 1000.0  # admin index report marks indexes above this as hot
+    
+    # Migrations (scripts/migrate.py): backfills update one _id range per batch
+    MIGRATION_BATCH_SIZE: int = 1000
+    MIGRATION_BATCH_SLEEP: float = 0.1  # seconds between batches
+    MIGRATION_MAX_REPLICATION_LAG: float = 10.0  # seconds; wait while secondaries lag more (0 = off)
+    MIGRATION_LOCK_TTL: int = 600  # seconds; renewed after every batch
+    
+    # Lazy schema upgrades: documents upgraded on read are written back in batches
+    SCHEMA_WRITEBACK_BATCH_SIZE: int = 500
+    SCHEMA_WRITEBACK_INTERVAL: float = 2.0  # seconds between flushes
     
     # Azure Blob Storage
     AZURE_STORAGE_ACCOUNT_NAME: str
@@ -34,6 +91,62 @@ class Settings(BaseSettings):
     
     # File upload settings
     MAX_UPLOAD_SIZE: int = 50 * 1024 * 1024  # 50MB
+    STORAGE_DOWNLOAD_CHUNK_SIZE: int = 4 * 1024 * 1024  # 4MB per ranged GET
+    
+    # File info download links: the SAS expiry is rounded up to the end of a
+    # window, so the payload (and its ETag) stays the same within one; a link
+    # is valid for between SAS_URL_TTL and SAS_URL_TTL + SAS_URL_WINDOW
+    SAS_URL_TTL: int = 60 * 60  # seconds
+    SAS_URL_WINDOW: int = 15 * 60  # seconds
+    
+    # Request body limits in bytes, enforced while the body streams in. The
+    # longest matching path prefix wins; role limits override it per prefix,
+    # e.g. {"/api/v1/uploads": {"admin": 500 * 1024 * 1024}}
+    MAX_REQUEST_BODY_SIZE: int = 1024 * 1024  # 1MB
+    BODY_SIZE_LIMITS: Dict[str, int] = {}  # defaults to MAX_UPLOAD_SIZE on /api/v1/uploads
+    BODY_SIZE_LIMITS_BY_ROLE: Dict[str, Dict[str, int]] = {}
+    BODY_SIZE_OVERHEAD: int = 64 * 1024  # multipart boundaries and part headers
+    
+    # Upload admission control (per worker)
+    UPLOAD_ADMISSION_PREFIXES: List[str] = ["/api/v1/uploads"]
+    UPLOAD_MAX_CONCURRENT: int = 8
+    UPLOAD_MAX_QUEUE: int = 32
+    UPLOAD_MAX_INFLIGHT_BYTES: int = 256 * 1024 * 1024  # 256MB
+    UPLOAD_QUEUE_TIMEOUT: float = 10.0  # seconds
+    UPLOAD_RETRY_AFTER: int = 5  # seconds
+    
+    # Periodic jobs (reconciliations): each worker polls whether a job is due;
+    # the last run is stored on the job's lease so restarts don't reset it
+    PERIODIC_JOB_POLL_INTERVAL: int = 300  # seconds
+    PERIODIC_JOB_LEASE_TTL: int = 6 * 60 * 60  # seconds a run may take before another worker may start one
+    
+    # Storage quotas and usage accounting (0 = unlimited)
+    STORAGE_QUOTA_BYTES: int = 1024 * 1024 * 1024  # 1GB
+    STORAGE_QUOTAS_BY_ROLE: Dict[str, int] = {"admin": 0}
+    STORAGE_USAGE_RECONCILE_INTERVAL: int = 24 * 60 * 60  # seconds, 0 disables
+    STORAGE_USAGE_RECONCILE_BATCH_SIZE: int = 1000
+    
+    # Cascade cleanup of deleted users' blobs
+    USER_CLEANUP_BATCH_SIZE: int = 256  # blobs per Blob Batch delete (API maximum)
+    USER_CLEANUP_BATCHES_PER_SECOND: float = 2.0
+    USER_CLEANUP_LIST_PAGE_SIZE: int = 5000  # blobs per listing page in the metadata scan
+    USER_CLEANUP_SCAN_METADATA: bool = True  # also find untagged (pre-tagging) blobs by metadata
+    USER_CLEANUP_POLL_INTERVAL: float = 30.0  # seconds
+    USER_CLEANUP_LEASE_TTL: int = 300  # seconds, renewed after every batch
+    USER_CLEANUP_MAX_ATTEMPTS: int = 5
+    USER_CLEANUP_RETRY_DELAY: int = 300  # seconds
+    
+    # Post-upload processing (MIME sniffing, thumbnails, checksums)
+    POST_PROCESSING_QUEUE_SIZE: int = 1000
+    POST_PROCESSING_WORKERS: int = 4  # concurrent downloads feeding the pool
+    POST_PROCESSING_PROCESSES: int = 2
+    POST_PROCESSING_TEMP_DIR: Optional[str] = None  # blobs are spooled here; None = system temp dir
+    THUMBNAIL_SIZES: List[int] = [128, 512]
+    
+    # Archive downloads
+    ARCHIVE_MAX_FILES: int = 1000
+    ARCHIVE_PREFETCH_FILES: int = 4  # blobs downloaded ahead of the writer
+    ARCHIVE_PREFETCH_CHUNKS: int = 2  # buffered chunks per prefetched blob
     
     # Rate limiting
     RATE_LIMIT: int = 60
@@ -41,6 +154,10 @@ class Settings(BaseSettings):
     
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
     
+    @property
+    def body_size_limits(self) -> Dict[str, int]:
+        return {"/api/v1/uploads": self.MAX_UPLOAD_SIZE, **self.BODY_SIZE_LIMITS}
+    
     @property
     def database_url(self) -> str:
         return f"{self.MONGODB_URL}/{self.DATABASE_NAME}?retryWrites=true&w=majority"
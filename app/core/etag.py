@@ -0,0 +1,97 @@
+from datetime import datetime
+from typing import Optional
+from fastapi import Request, Response, status
+from app.core.exceptions import PreconditionFailedException
+from app.core.utils import from_millis, to_millis
+
+# Appended inside the quotes of a strong ETag by the compression middleware,
+# so each content-coding of a representation has its own tag
+ENCODING_SUFFIXES = ("-zstd", "-br", "-gzip")
+
+
+def version_etag(updated_at: datetime) -> str:
+    """
+    Strong ETag for a document versioned by its ``updated_at``, at the
+    millisecond precision MongoDB stores it with.
+    """
+    return f'"{to_millis(updated_at):x}"'
+
+
+def version_from_etag(etag: str) -> Optional[datetime]:
+    """
+    Inverse of ``version_etag``, also for the tags of compressed variants;
+    None when the tag is not one of ours.
+    """
+    etag = etag.strip()
+    if etag.startswith("W/") or len(etag) < 3 or etag[0] != '"' or etag[-1] != '"':
+        return None
+    try:
+        return from_millis(int(_strip_encoding(etag)[1:-1], 16))
+    except ValueError:
+        return None
+
+
+def blob_etag(etag: str, sas_expiry: datetime) -> str:
+    """
+    Strong ETag for a file info payload: the blob's ETag plus the expiry of
+    the SAS URL it carries, so the tag changes whenever the link does and a
+    304 never keeps an expired link alive.
+    """
+    opaque = etag.strip().strip('"')
+    return f'"{opaque}-{to_millis(sas_expiry):x}"'
+
+
+def encoded_etag(etag: str, encoding: str) -> str:
+    """
+    ETag for the ``encoding``-compressed variant of a response: a strong
+    tag promises byte-identical bodies, so the compressed body gets its
+    own. Weak tags only promise equivalent content and are kept as is.
+    """
+    etag = etag.strip()
+    if etag.startswith("W/") or len(etag) < 2 or etag[-1] != '"':
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+
+def _strip_encoding(tag: str) -> str:
+    for suffix in ENCODING_SUFFIXES:
+        if tag.endswith(f'{suffix}"'):
+            return f'{tag[:-len(suffix) - 1]}"'
+    return tag
+
+
+def _opaque(tag: str) -> str:
+    tag = tag.strip()
+    return _strip_encoding(tag[2:] if tag.startswith("W/") else tag)
+
+
+def not_modified(request: Request, etag: str) -> Optional[Response]:
+    """
+    304 response when ``If-None-Match`` matches ``etag`` (weak comparison,
+    as RFC 9110 prescribes for this header), otherwise None. Tags of the
+    compressed variants match too.
+    """
+    header = request.headers.get("if-none-match")
+    if not header:
+        return None
+    tags = [_opaque(tag) for tag in header.split(",")]
+    if "*" in tags or _opaque(etag) in tags:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    return None
+
+
+def required_version(request: Request) -> Optional[datetime]:
+    """
+    The ``updated_at`` a write must still match, from ``If-Match``.
+
+    None when the header is absent or ``*``. A weak, unknown or
+    multi-valued tag can never match a strong version tag, so it is
+    rejected with 412 straight away.
+    """
+    header = request.headers.get("if-match")
+    if not header or header.strip() == "*":
+        return None
+    version = version_from_etag(header)
+    if version is None:
+        raise PreconditionFailedException()
+    return version
@@ -14,4 +14,16 @@ class ForbiddenException(HTTPException):
 
 class BadRequestException(HTTPException):
     def __init__(self, detail: str = "Bad request"):
-        super().__init__(status_code=status.HTTP_400_BAD_REQUEST, detail=detail) 
\ No newline at end of file
+        super().__init__(status_code=status.HTTP_400_BAD_REQUEST, detail=detail)
+
+class PayloadTooLargeException(HTTPException):
+    def __init__(self, detail: str = "Request body too large"):
+        super().__init__(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=detail,
+            headers={"Connection": "close"},
+        )
+
+class PreconditionFailedException(HTTPException):
+    def __init__(self, detail: str = "Resource has been modified"):
+        super().__init__(status_code=status.HTTP_412_PRECONDITION_FAILED, detail=detail)
@@ -0,0 +1,71 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class Lifecycle:
+    """
+    Serving state of this worker, used to drain it before shutdown.
+
+    Once ``begin_drain`` is called the readiness probe fails, upload
+    admission turns new uploads away and responses ask clients to close
+    their keep-alive connections; requests already in flight carry on.
+    ``DrainMiddleware`` keeps the in-flight count. ``deadline`` bounds the
+    whole shutdown once the listener closes.
+    """
+
+    def __init__(self):
+        self.draining = False
+        self.in_flight = 0
+        self._drain_started: Optional[float] = None
+        self.deadline: Optional[float] = None
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    def begin_drain(self):
+        if self.draining:
+            return
+        self.draining = True
+        self._drain_started = time.monotonic()
+        logger.info(f"Draining: {self.in_flight} requests in flight")
+
+    def start_deadline(self, timeout: float):
+        """Start the shutdown clock; later calls keep the first deadline"""
+        if self.deadline is None:
+            self.deadline = time.monotonic() + timeout
+
+    def time_left(self) -> float:
+        if self.deadline is None:
+            return 0.0
+        return max(0.0, self.deadline - time.monotonic())
+
+    def request_started(self):
+        self.in_flight += 1
+        self._idle.clear()
+
+    def request_finished(self):
+        self.in_flight -= 1
+        if self.in_flight == 0:
+            self._idle.set()
+
+    async def wait_idle(self, timeout: float) -> bool:
+        """Wait until no request is in flight; False if ``timeout`` ran out first."""
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout=max(0.0, timeout))
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def state(self) -> Dict[str, Any]:
+        return {
+            "draining": self.draining,
+            "in_flight": self.in_flight,
+            "draining_for": round(time.monotonic() - self._drain_started, 3) if self._drain_started else None,
+        }
+
+
+# Create a singleton instance
+lifecycle = Lifecycle()
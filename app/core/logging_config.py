@@ -1,13 +1,46 @@
+import atexit
 import logging
+import logging.handlers
+import queue
 import sys
+from typing import Optional
 
 LOG_LEVEL = "INFO"
+LOG_FORMAT = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 
-logging.basicConfig(
-    level=LOG_LEVEL,
-    format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
-    handlers=[logging.StreamHandler(sys.stdout)]
-)
+_listener: Optional[logging.handlers.QueueListener] = None
+
+def setup_logging(level: str = LOG_LEVEL) -> None:
+    """
+    Route all records through a QueueHandler so the event loop only enqueues;
+    a background QueueListener thread formats and writes them to stdout.
+    """
+    global _listener
+    if _listener is not None:
+        return
+    
+    log_queue: queue.Queue = queue.Queue(-1)
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    
+    root = logging.getLogger()
+    root.handlers = [logging.handlers.QueueHandler(log_queue)]
+    root.setLevel(level)
+    
+    _listener = logging.handlers.QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+
+def stop_logging() -> None:
+    """
+    Flush queued records and stop the listener thread; later records are
+    written directly by the listener's handlers
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        logging.getLogger().handlers = list(_listener.handlers)
+        _listener = None
 
 def get_logger(name: str) -> logging.Logger:
-    return logging.getLogger(name) 
\ No newline at end of file
+    return logging.getLogger(name)
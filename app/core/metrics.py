@@ -0,0 +1,158 @@
+import os
+import time
+from typing import Dict, Tuple
+from urllib.parse import parse_qs, urlsplit
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from pymongo import monitoring
+
+# Multi-process mode: when PROMETHEUS_MULTIPROC_DIR is set (before this module
+# is imported) every worker writes its samples to mmap'd files in that
+# directory and the scrape aggregates them, whichever worker serves it.
+MULTIPROCESS = "PROMETHEUS_MULTIPROC_DIR" in os.environ
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+BACKEND_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# HTTP
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "HTTP requests by route template and status",
+    ["method", "route", "status"],
+)
+HTTP_LATENCY = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template",
+    ["method", "route"], buckets=LATENCY_BUCKETS,
+)
+HTTP_IN_FLIGHT = Gauge(
+    "http_requests_in_flight", "HTTP requests currently being served",
+    multiprocess_mode="livesum",
+)
+
+# Backends
+MONGO_COMMAND_DURATION = Histogram(
+    "mongo_command_duration_seconds", "MongoDB command round-trip time",
+    ["command", "outcome"], buckets=BACKEND_BUCKETS,
+)
+AZURE_REQUEST_DURATION = Histogram(
+    "azure_storage_request_duration_seconds", "Azure Blob Storage HTTP request time",
+    ["operation", "status"], buckets=BACKEND_BUCKETS,
+)
+
+# Auth
+AUTH_OUTCOMES = Counter(
+    "auth_requests_total", "Bearer token authentication outcomes",
+    ["outcome"],
+)
+
+# Uploads
+UPLOADS_ACTIVE = Gauge(
+    "upload_admission_active", "Uploads currently admitted", multiprocess_mode="livesum",
+)
+UPLOADS_ACTIVE_BYTES = Gauge(
+    "upload_admission_active_bytes", "Declared bytes of admitted uploads", multiprocess_mode="livesum",
+)
+UPLOADS_WAITING = Gauge(
+    "upload_admission_waiting", "Uploads waiting for a slot", multiprocess_mode="livesum",
+)
+UPLOADS_QUEUE_TIME = Histogram(
+    "upload_admission_queue_seconds", "Time uploads spent waiting for admission",
+    buckets=(0.0, 0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0),
+)
+UPLOADS_REJECTED = Counter(
+    "upload_admission_rejected_total", "Uploads rejected with 503", ["reason"],
+)
+POST_PROCESSING_QUEUE_DEPTH = Gauge(
+    "post_processing_queue_depth", "Uploads waiting for post-processing", multiprocess_mode="livesum",
+)
+POST_PROCESSING_JOBS = Counter(
+    "post_processing_jobs_total", "Post-processing jobs by outcome", ["outcome"],
+)
+
+# Lazy schema upgrades
+SCHEMA_UPGRADES = Counter(
+    "schema_upgrades_total", "Documents upgraded on read and their write-back outcome",
+    ["collection", "outcome"],
+)
+
+# Coalescing
+SINGLEFLIGHT_COLLAPSED = Counter(
+    "singleflight_collapsed_total", "Reads served by joining an identical in-flight call",
+    ["operation"],
+)
+
+
+class HTTPMetricsRecorder:
+    """Caches labelled children so recording a request is two dict lookups."""
+
+    def __init__(self):
+        self._children: Dict[Tuple[str, str, int], Tuple] = {}
+
+    def observe(self, method: str, route: str, status: int, duration: float):
+        key = (method, route, status)
+        children = self._children.get(key)
+        if children is None:
+            children = (
+                HTTP_REQUESTS.labels(method, route, str(status)),
+                HTTP_LATENCY.labels(method, route),
+            )
+            self._children[key] = children
+        children[0].inc()
+        children[1].observe(duration)
+
+
+http_metrics = HTTPMetricsRecorder()
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """pymongo command listener feeding MONGO_COMMAND_DURATION."""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        MONGO_COMMAND_DURATION.labels(event.command_name, "success").observe(event.duration_micros / 1e6)
+
+    def failed(self, event):
+        MONGO_COMMAND_DURATION.labels(event.command_name, "failure").observe(event.duration_micros / 1e6)
+
+
+def azure_request_hook(request):
+    """raw_request_hook for the blob client: stamp the start time."""
+    request.context["metrics_started"] = time.perf_counter()
+
+
+def azure_response_hook(response):
+    """raw_response_hook for the blob client: observe the request time."""
+    started = response.context.get("metrics_started")
+    if started is None:
+        return
+    http_request = response.http_request
+    comp = parse_qs(urlsplit(http_request.url).query).get("comp")
+    operation = f"{http_request.method}:{comp[0]}" if comp else http_request.method
+    AZURE_REQUEST_DURATION.labels(operation, str(response.http_response.status_code)).observe(
+        time.perf_counter() - started
+    )
+
+
+def render_metrics() -> Tuple[bytes, str]:
+    """Prometheus text exposition, aggregated across workers in multi-process mode."""
+    if MULTIPROCESS:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def mark_worker_dead(pid: int):
+    """Drop a dead worker's live gauges; call from the process manager."""
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(pid)
@@ -0,0 +1,47 @@
+import base64
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+from bson import ObjectId
+from app.core.exceptions import BadRequestException
+from app.core.utils import from_millis, to_millis
+
+
+def encode_cursor(created_at: Optional[datetime], _id: ObjectId) -> str:
+    """
+    Opaque cursor pointing just after the (created_at, _id) of the last item
+    on a page. ``created_at`` is None for legacy documents without one.
+    """
+    raw = f"{to_millis(created_at) if created_at else ''}:{_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[Optional[datetime], ObjectId]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        millis, _id = raw.split(":", 1)
+        return (from_millis(int(millis)) if millis else None), ObjectId(_id)
+    except Exception:
+        raise BadRequestException("Invalid pagination cursor")
+
+
+def keyset_after(cursor: str) -> Dict[str, Any]:
+    """
+    Filter for the documents after ``cursor`` in (created_at desc, _id desc)
+    order. Served by the { created_at: -1, _id: -1 } index as a range scan,
+    so every page costs the same no matter how deep it is.
+
+    Legacy documents without ``created_at`` sort last (as null), and
+    ``$lt`` never matches them, so they get their own branch.
+    """
+    created_at, _id = decode_cursor(cursor)
+    if created_at is None:
+        return {"created_at": None, "_id": {"$lt": _id}}
+    return {"$or": [
+        {"created_at": {"$lt": created_at}},
+        {"created_at": created_at, "_id": {"$lt": _id}},
+        {"created_at": None},
+    ]}
+
+
+# Newest first, with _id breaking ties between equal timestamps
+KEYSET_SORT = [("created_at", -1), ("_id", -1)]
@@ -0,0 +1,63 @@
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Mapping, Optional
+import orjson
+from bson import ObjectId
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+# Never serialized, whatever model carries them
+SECRET_FIELDS = {"hashed_password"}
+
+
+def _default(obj: Any) -> Any:
+    """orjson fallback for types it does not serialize natively."""
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    if isinstance(obj, BaseModel):
+        # Nested ObjectIds come back through this hook. The envelope bypasses
+        # response_model filtering, so secrets are dropped here as well
+        return obj.model_dump(by_alias=True, exclude=SECRET_FIELDS)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    if isinstance(obj, Decimal):
+        return str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class APIResponse(JSONResponse):
+    """
+    JSON response rendered with orjson.
+
+    datetime, UUID and enums are encoded natively; ObjectId and pydantic
+    models go through ``_default``, which drops SECRET_FIELDS. Endpoints
+    still pass public models (e.g. ``UserInDB.to_public()``). Used as the app's default response
+    class and by ``standard_response``, which returns it directly so
+    FastAPI skips ``jsonable_encoder``.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def standard_response(
+    success: bool,
+    data: Any = None,
+    message: str = "",
+    status_code: int = 200,
+    headers: Optional[Mapping[str, str]] = None,
+) -> APIResponse:
+    return APIResponse(
+        status_code=status_code,
+        headers=headers,
+        content={
+            "success": success,
+            "data": data,
+            "message": message,
+            "timestamp": datetime.utcnow().isoformat() + "Z"
+        },
+    )
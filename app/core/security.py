@@ -7,6 +7,7 @@ from fastapi.security import OAuth2PasswordBearer, HTTPBearer, HTTPAuthorization
 from app.core.config import settings
 from app.models.user import UserInDB
 from app.crud.crud_user import user as crud_user
+from app.core.metrics import AUTH_OUTCOMES
 
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -28,10 +29,10 @@ def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta]
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
-def create_refresh_token(user_id: str) -> str:
+def create_refresh_token(user_id: str, role: Optional[str] = None) -> str:
     expires = timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
     return create_access_token(
-        data={"sub": str(user_id), "type": "refresh"},
+        data={"sub": str(user_id), "type": "refresh", "role": role},
         expires_delta=expires
     )
 
@@ -56,7 +57,7 @@ def create_access_token_from_refresh_token(refresh_token: str) -> str:
         # Create new access token
         access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
         return create_access_token(
-            data={"sub": user_id}, expires_delta=access_token_expires
+            data={"sub": user_id, "role": payload.get("role")}, expires_delta=access_token_expires
         )
     except JOSEError:
         raise HTTPException(
@@ -83,16 +84,20 @@ async def get_current_user(token: str = Depends(oauth2_scheme)) -> UserInDB:
         )
         user_id: str = payload.get("sub")
         if user_id is None:
+            AUTH_OUTCOMES.labels("invalid_token").inc()
             raise credentials_exception
             
         # Get user from database
         user = await crud_user.get(user_id)
         if user is None:
+            AUTH_OUTCOMES.labels("unknown_user").inc()
             raise credentials_exception
             
+        AUTH_OUTCOMES.labels("success").inc()
         return user
         
     except JOSEError as e:
+        AUTH_OUTCOMES.labels("invalid_token").inc()
         raise credentials_exception
 
 async def get_current_active_user(current_user: UserInDB = Depends(get_current_user)) -> UserInDB:
@@ -100,6 +105,7 @@ async def get_current_active_user(current_user: UserInDB = Depends(get_current_u
     Get the current active user
     """
     if not current_user.is_active:
+        AUTH_OUTCOMES.labels("inactive").inc()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Inactive user"
@@ -0,0 +1,142 @@
+import logging
+import math
+import os
+import signal
+import socket
+import sys
+import time
+from types import FrameType
+from typing import List, Optional
+from gunicorn.arbiter import Arbiter
+from uvicorn.main import Server
+from uvicorn.workers import UvicornWorker
+from app.core.lifecycle import lifecycle
+
+logger = logging.getLogger(__name__)
+
+
+class DrainingServer(Server):
+    """
+    Uvicorn server that drains before it stops listening.
+
+    The first SIGTERM/SIGINT only flips the worker to draining (readiness
+    fails, new uploads are refused) and keeps serving for
+    SHUTDOWN_DRAIN_DELAY seconds so load balancers can deregister it. Then
+    the listener closes and requests in flight get up to
+    SHUTDOWN_DRAIN_TIMEOUT to finish before uvicorn closes the connections
+    and runs the lifespan shutdown. A second signal, or SIGQUIT, skips the
+    delay; any signal once shutdown has begun forces the exit (no further
+    waiting, no lifespan shutdown).
+    """
+
+    def __init__(self, config, drain_delay: float, drain_timeout: float):
+        super().__init__(config=config)
+        self.drain_delay = drain_delay
+        self.drain_timeout = drain_timeout
+        self.drain_requested_at: Optional[float] = None
+
+    def handle_exit(self, sig: int, frame: Optional[FrameType]) -> None:
+        # May run as a plain signal handler: only set flags, on_tick acts on them
+        if self.should_exit:
+            # Uvicorn only forces on a repeated SIGINT; do it for SIGTERM too
+            self.force_exit = True
+            return
+        if self.drain_requested_at is not None or sig == signal.SIGQUIT or self.drain_delay <= 0:
+            super().handle_exit(sig, frame)
+            return
+        self.drain_requested_at = time.monotonic()
+
+    async def on_tick(self, counter: int) -> bool:
+        if self.drain_requested_at is not None:
+            lifecycle.begin_drain()
+            if time.monotonic() - self.drain_requested_at >= self.drain_delay:
+                self.should_exit = True
+        return await super().on_tick(counter)
+
+    async def shutdown(self, sockets: Optional[List[socket.socket]] = None) -> None:
+        lifecycle.begin_drain()
+        lifecycle.start_deadline(self.drain_timeout)
+        # Stop accepting, but leave open connections alone until their requests finish
+        for server in self.servers:
+            server.close()
+        for sock in sockets or []:
+            sock.close()
+        while lifecycle.in_flight and not self.force_exit:
+            if await lifecycle.wait_idle(min(0.1, lifecycle.time_left())) or not lifecycle.time_left():
+                break
+        if lifecycle.in_flight:
+            logger.warning(f"Drain deadline reached with {lifecycle.in_flight} requests in flight")
+        # Whatever is left of the deadline bounds uvicorn's own wait
+        self.config.timeout_graceful_shutdown = lifecycle.time_left()
+        await super().shutdown(sockets)
+
+
+class ProductionWorker(UvicornWorker):
+    """
+    Gunicorn worker running the app on uvloop and httptools.
+
+    Request recycling (max_requests, max_requests_jitter) comes from the
+    Gunicorn config; see gunicorn.conf.py. Shutdown drains first, see
+    DrainingServer.
+    """
+
+    CONFIG_KWARGS = {
+        "loop": "uvloop",
+        "http": "httptools",
+        "lifespan": "on",
+        "server_header": False,
+    }
+
+    async def _serve(self) -> None:
+        # Runs after fork with the app imported, so settings are loaded
+        from app.core.config import settings
+
+        self.config.app = self.wsgi
+        server = DrainingServer(
+            config=self.config,
+            drain_delay=settings.SHUTDOWN_DRAIN_DELAY,
+            drain_timeout=settings.SHUTDOWN_DRAIN_TIMEOUT,
+        )
+        self._install_sigquit_handler()
+        await server.serve(sockets=self.sockets)
+        if not server.started:
+            sys.exit(Arbiter.WORKER_BOOT_ERROR)
+
+
+def cgroup_cpu_limit() -> Optional[float]:
+    """
+    CPU quota of the container in cores, or None when unlimited.
+
+    Reads cgroup v2 ``cpu.max`` first, then the v1 CFS quota and period.
+    """
+    try:
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()[:2]
+        if quota != "max":
+            return int(quota) / int(period)
+        return None
+    except (OSError, ValueError):
+        pass
+
+    try:
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as f:
+            quota = int(f.read())
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as f:
+            period = int(f.read())
+        if quota > 0 and period > 0:
+            return quota / period
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def available_cpus() -> int:
+    """Cores this process may actually use: affinity mask capped by the cgroup quota."""
+    if hasattr(os, "sched_getaffinity"):
+        cpus = len(os.sched_getaffinity(0))
+    else:
+        cpus = os.cpu_count() or 1
+    limit = cgroup_cpu_limit()
+    if limit:
+        cpus = min(cpus, math.ceil(limit))
+    return max(1, cpus)
@@ -0,0 +1,41 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, TypeVar
+from app.core.metrics import SINGLEFLIGHT_COLLAPSED
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Coalesce concurrent identical reads into one backend call.
+
+    The first caller for a key starts the call as a task; callers arriving
+    while it is in flight await the same task instead of issuing their own.
+    Each caller awaits through ``asyncio.shield``, so a cancelled caller
+    (e.g. a client disconnect) never cancels the call for the others. The
+    key is forgotten as soon as the call finishes, so nothing is cached.
+
+    Results are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+        self._collapsed = SINGLEFLIGHT_COLLAPSED.labels(name)
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        else:
+            self._collapsed.inc()
+        return await asyncio.shield(task)
+
+    def _forget(self, key: Hashable, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Mark the error as retrieved in case every caller was cancelled
+        if not task.cancelled():
+            task.exception()
@@ -1,5 +1,28 @@
 # Common utility functions for the application
+from datetime import datetime, timedelta, timezone
+
+EPOCH = datetime(1970, 1, 1)
+
+def to_millis(dt: datetime) -> int:
+    """
+    Milliseconds since the epoch, the precision MongoDB stores dates at
+    """
+    if dt.tzinfo is not None:
+        dt = dt.astimezone(timezone.utc).replace(tzinfo=None)
+    return (dt - EPOCH) // timedelta(milliseconds=1)
+
+def from_millis(ms: int) -> datetime:
+    return EPOCH + timedelta(milliseconds=ms)
 
 def to_camel_case(snake_str: str) -> str:
     components = snake_str.split('_')
-    return components[0] + ''.join(x.title() for x in components[1:]) 
\ No newline at end of file
+    return components[0] + ''.join(x.title() for x in components[1:]) 
+
+def route_template(scope) -> str:
+    """
+    Path template of the matched route (e.g. /api/v1/users/{user_id}), so
+    logs and metrics do not get one series per id. Only available once the
+    router has run; unmatched requests are grouped together.
+    """
+    route = scope.get("route")
+    return getattr(route, "path", None) or "<unmatched>"
@@ -1,23 +1,121 @@
-from app.models.user import User
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from bson import ObjectId
+from pymongo import DeleteOne, UpdateOne
+from pymongo.errors import BulkWriteError
+from app.core.config import settings
+from app.crud.crud_user import user as crud_user
+from app.crud.crud_user_stats import STATS_PROJECTION
 from app.models.enums import UserRole
-from app.crud.base import CRUDBase
-
-class CRUDAdmin(CRUDBase):
-    async def list_users(self, skip: int = 0, limit: int = 100, role: str = None) -> list:
-        query = {}
-        if role:
-            query["role"] = role
-        return await User.find(query).skip(skip).limit(limit).to_list()
-
-    async def update_user_role(self, user_id: str, new_role: UserRole):
-        user = await User.get(user_id)
-        if user:
-            user.role = new_role
-            await user.save()
-        return user
-
-    async def delete_user(self, user_id: str):
-        user = await User.get(user_id)
-        if user:
-            await user.delete()
-        return user 
\ No newline at end of file
+
+class CRUDAdmin:
+    """
+    Administrative user operations applied to many users at once.
+
+    Every operation goes through unordered ``bulk_write`` calls of at most
+    ADMIN_BULK_CHUNK_SIZE operations, and reports a status per user id:
+    updated / deleted, not_found, invalid_id, skipped or error. The counted
+    fields of each chunk are read first so the dashboard counters
+    (``user_stats``) move by what actually changed.
+    """
+
+    @property
+    def collection(self):
+        return crud_user.collection
+
+    async def resolve_filter(self, query: Dict[str, Any], limit: int) -> List[str]:
+        """
+        Ids of the users matching ``query``, at most ``limit`` of them
+        """
+        cursor = self.collection.find(query, {"_id": 1}).limit(limit).batch_size(settings.ADMIN_BULK_CHUNK_SIZE)
+        return [str(doc["_id"]) async for doc in cursor]
+
+    async def bulk_update(
+        self, user_ids: List[str], fields: Dict[str, Any], exclude: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        fields = {**fields, "updated_at": datetime.utcnow()}
+        return await self._bulk(
+            user_ids, lambda oid: UpdateOne({"_id": oid}, {"$set": fields}), "updated", exclude,
+            lambda before: {**before, **fields},
+        )
+
+    async def bulk_delete(self, user_ids: List[str], exclude: Optional[str] = None) -> List[Dict[str, Any]]:
+        return await self._bulk(
+            user_ids, lambda oid: DeleteOne({"_id": oid}), "deleted", exclude, lambda before: None
+        )
+
+    async def update_user_role(self, user_id: str, new_role: UserRole) -> Dict[str, Any]:
+        return (await self.bulk_update([user_id], {"role": new_role.value}))[0]
+
+    async def delete_user(self, user_id: str) -> Dict[str, Any]:
+        return (await self.bulk_delete([user_id]))[0]
+
+    @staticmethod
+    def summarize(results: List[Dict[str, Any]]) -> Dict[str, int]:
+        return dict(Counter(result["status"] for result in results))
+
+    async def _bulk(self, user_ids, make_op, done_status: str, exclude: Optional[str], after) -> List[Dict[str, Any]]:
+        results: Dict[str, Dict[str, Any]] = {}
+        targets: List[Tuple[str, ObjectId]] = []
+        for user_id in dict.fromkeys(user_ids):
+            if not ObjectId.is_valid(user_id):
+                results[user_id] = {"id": user_id, "status": "invalid_id"}
+            elif user_id == exclude:
+                results[user_id] = {"id": user_id, "status": "skipped", "error": "Cannot apply to your own account"}
+            else:
+                targets.append((user_id, ObjectId(user_id)))
+
+        chunk_size = settings.ADMIN_BULK_CHUNK_SIZE
+        for start in range(0, len(targets), chunk_size):
+            chunk = targets[start:start + chunk_size]
+            results.update(await self._apply_chunk(chunk, make_op, done_status, after))
+
+        return [results[user_id] for user_id in dict.fromkeys(user_ids)]
+
+    async def _existing(self, oids: List[ObjectId]) -> set:
+        return {doc["_id"] async for doc in self.collection.find({"_id": {"$in": oids}}, {"_id": 1})}
+
+    async def _current(self, oids: List[ObjectId]) -> Dict[ObjectId, Dict[str, Any]]:
+        return {doc["_id"]: doc async for doc in self.collection.find({"_id": {"$in": oids}}, STATS_PROJECTION)}
+
+    async def _apply_chunk(self, chunk, make_op, done_status: str, after) -> Dict[str, Dict[str, Any]]:
+        results: Dict[str, Dict[str, Any]] = {}
+        deleting = done_status == "deleted"
+        # Counted fields before the write; this also tells a removed id from
+        # an unknown one, which look the same once deleted
+        current = await self._current([oid for _, oid in chunk])
+        for user_id, oid in chunk:
+            if oid not in current:
+                results[user_id] = {"id": user_id, "status": "not_found"}
+        chunk = [(user_id, oid) for user_id, oid in chunk if oid in current]
+        if not chunk:
+            return results
+
+        failed = set()
+        try:
+            result = await self.collection.bulk_write([make_op(oid) for _, oid in chunk], ordered=False)
+            applied = result.deleted_count if deleting else result.matched_count
+        except BulkWriteError as e:
+            # Unordered: the other operations still ran; errors carry the op index
+            for error in e.details.get("writeErrors", []):
+                user_id = chunk[error["index"]][0]
+                failed.add(user_id)
+                results[user_id] = {"id": user_id, "status": "error", "error": error.get("errmsg", "Write failed")}
+            applied = e.details.get("nRemoved" if deleting else "nMatched", 0)
+
+        pending = [(user_id, oid) for user_id, oid in chunk if user_id not in failed]
+        missing = set()
+        if not deleting and applied < len(pending):
+            # Deleted since it was read; only a short match count needs to know which
+            missing = {oid for _, oid in pending} - await self._existing([oid for _, oid in pending])
+
+        for user_id, oid in pending:
+            results[user_id] = {"id": user_id, "status": "not_found" if oid in missing else done_status}
+        await crud_user.record_stats([
+            (current[oid], after(current[oid])) for _, oid in pending if oid not in missing
+        ])
+        return results
+
+# Create a default instance for easy importing
+admin = CRUDAdmin()
@@ -0,0 +1,124 @@
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from pymongo import ReturnDocument, UpdateOne
+from app.db.session import get_collection
+
+class CRUDCleanupJob:
+    """
+    Resumable jobs deleting a removed user's blobs, one document per user.
+
+    A worker claims a job with an expiring lease and checkpoints its phase
+    and listing continuation token after every batch, so a job whose worker
+    died is picked up again where it stopped once the lease runs out.
+    """
+
+    def __init__(self):
+        self._collection = None
+
+    @property
+    def collection(self):
+        if self._collection is None:
+            self._collection = get_collection("user_cleanup_jobs")
+        return self._collection
+
+    async def enqueue_many(self, user_ids: List[str]):
+        if not user_ids:
+            return
+        now = datetime.utcnow()
+        await self.collection.bulk_write([
+            UpdateOne(
+                {"_id": user_id},
+                {
+                    "$set": {"status": "pending", "phase": None, "continuation_token": None, "retry_at": None, "updated_at": now},
+                    "$setOnInsert": {"created_at": now, "deleted": 0, "failed": 0, "attempts": 0},
+                },
+                upsert=True,
+            )
+            for user_id in user_ids
+        ], ordered=False)
+
+    async def get(self, user_id: str) -> Optional[Dict[str, Any]]:
+        return await self.collection.find_one({"_id": user_id})
+
+    async def claim(self, holder: str, ttl: timedelta) -> Optional[Dict[str, Any]]:
+        """
+        Take the oldest pending job, or a running one whose lease expired.
+        Only the latter counts as a failed attempt: its worker died without
+        reporting back. A job handed back at shutdown does not.
+        """
+        now = datetime.utcnow()
+        return await self.collection.find_one_and_update(
+            {"$or": [
+                {"status": "pending", "retry_at": {"$not": {"$gt": now}}},
+                {"status": "running", "lease_until": {"$lt": now}},
+            ]},
+            [{"$set": {
+                "attempts": {"$add": [
+                    {"$ifNull": ["$attempts", 0]},
+                    {"$cond": [{"$eq": ["$status", "running"]}, 1, 0]},
+                ]},
+                "status": "running",
+                "holder": holder,
+                "lease_until": now + ttl,
+                "started_at": {"$ifNull": ["$started_at", now]},
+                "updated_at": now,
+            }}],
+            sort=[("created_at", 1)],
+            return_document=ReturnDocument.AFTER,
+        )
+
+    async def checkpoint(
+        self,
+        user_id: str,
+        holder: str,
+        ttl: timedelta,
+        phase: str,
+        continuation_token: Optional[str],
+        deleted: int,
+        failed: int,
+    ) -> bool:
+        """Record progress and extend the lease; False if the job was taken over"""
+        now = datetime.utcnow()
+        result = await self.collection.update_one(
+            {"_id": user_id, "holder": holder, "status": "running"},
+            {
+                "$set": {
+                    "phase": phase,
+                    "continuation_token": continuation_token,
+                    "lease_until": now + ttl,
+                    "updated_at": now,
+                },
+                "$inc": {"deleted": deleted, "failed": failed},
+            },
+        )
+        return result.matched_count == 1
+
+    async def finish(
+        self,
+        user_id: str,
+        holder: str,
+        status: str,
+        error: Optional[str] = None,
+        retry_at: Optional[datetime] = None,
+        failed_attempt: bool = False,
+    ):
+        """
+        Close a job as done/failed, or hand it back as pending (after
+        ``retry_at``); ``failed_attempt`` counts the run towards the retry cap
+        """
+        now = datetime.utcnow()
+        await self.collection.update_one(
+            {"_id": user_id, "holder": holder},
+            {"$inc": {"attempts": 1 if failed_attempt else 0}, "$set": {
+                "status": status,
+                "last_error": error,
+                "retry_at": retry_at,
+                "holder": None,
+                "lease_until": None,
+                "finished_at": now if status in ("done", "failed") else None,
+                "updated_at": now,
+            }},
+        )
+
+# Create a default instance for easy importing
+cleanup_job = CRUDCleanupJob()
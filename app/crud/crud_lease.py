@@ -0,0 +1,65 @@
+from datetime import datetime, timedelta
+from pymongo.errors import DuplicateKeyError
+from app.db.session import get_collection
+
+class CRUDLease:
+    """
+    Named, expiring leases so that only one worker runs a periodic job.
+    """
+
+    def __init__(self):
+        self._collection = None
+
+    @property
+    def collection(self):
+        if self._collection is None:
+            self._collection = get_collection("leases")
+        return self._collection
+
+    async def acquire(self, name: str, holder: str, ttl: timedelta) -> bool:
+        now = datetime.utcnow()
+        try:
+            await self.collection.update_one(
+                {"_id": name, "$or": [{"expires_at": {"$lt": now}}, {"holder": holder}]},
+                {"$set": {"holder": holder, "expires_at": now + ttl}},
+                upsert=True,
+            )
+        except DuplicateKeyError:
+            # Another holder has an unexpired lease
+            return False
+        return True
+
+    async def release(self, name: str, holder: str):
+        await self.collection.delete_one({"_id": name, "holder": holder})
+
+    async def acquire_due(self, name: str, holder: str, interval: timedelta, ttl: timedelta) -> bool:
+        """
+        Take the lease of a periodic job only if its last successful run
+        (``last_run_at``, kept on the lease document) is ``interval`` ago.
+        The schedule survives process restarts because it lives here.
+        """
+        now = datetime.utcnow()
+        try:
+            await self.collection.update_one(
+                {"_id": name, "$and": [
+                    {"$or": [{"expires_at": {"$lt": now}}, {"holder": holder}]},
+                    {"$or": [{"last_run_at": {"$exists": False}}, {"last_run_at": {"$lte": now - interval}}]},
+                ]},
+                {"$set": {"holder": holder, "expires_at": now + ttl}},
+                upsert=True,
+            )
+        except DuplicateKeyError:
+            # Held by another worker, or not due yet
+            return False
+        return True
+
+    async def complete(self, name: str, holder: str, succeeded: bool):
+        """Give the lease of a periodic job back, recording a successful run"""
+        now = datetime.utcnow()
+        update = {"holder": None, "expires_at": now}
+        if succeeded:
+            update["last_run_at"] = now
+        await self.collection.update_one({"_id": name, "holder": holder}, {"$set": update})
+
+# Create a default instance for easy importing
+lease = CRUDLease()
@@ -0,0 +1,105 @@
+from typing import Optional, Dict, Any, List
+from datetime import datetime
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+from app.db.session import get_collection
+
+def user_key(user_id: str) -> str:
+    return f"user:{user_id}"
+
+def folder_key(user_id: str, folder: str) -> str:
+    return f"folder:{user_id}:{folder}"
+
+class CRUDStorageUsage:
+    """
+    Per-user and per-folder byte/object counters.
+
+    Each user has one ``user:<id>`` document with their totals and one
+    ``folder:<id>:<folder>`` document per folder ("" is the container root),
+    so a quota check is a single ``_id`` lookup.
+    """
+
+    def __init__(self):
+        self._collection = None
+
+    @property
+    def collection(self):
+        if self._collection is None:
+            self._collection = get_collection("storage_usage")
+        return self._collection
+
+    async def get_user_usage(self, user_id: str) -> Dict[str, int]:
+        usage = await self.collection.find_one({"_id": user_key(user_id)}, {"bytes": 1, "objects": 1})
+        return {"bytes": usage.get("bytes", 0), "objects": usage.get("objects", 0)} if usage else {"bytes": 0, "objects": 0}
+
+    async def get_folder_usage(self, user_id: str) -> List[Dict[str, Any]]:
+        cursor = self.collection.find(
+            {"user_id": user_id, "kind": "folder"},
+            {"_id": 0, "folder": 1, "bytes": 1, "objects": 1}
+        )
+        return await cursor.to_list(length=None)
+
+    async def record(self, user_id: str, folder: Optional[str], bytes_delta: int, objects_delta: int):
+        """
+        Apply an upload (positive deltas) or delete (negative deltas) to the
+        user's and folder's counters in one round trip.
+        """
+        now = datetime.utcnow()
+        folder = folder or ""
+        inc = {"bytes": bytes_delta, "objects": objects_delta}
+        await self.collection.bulk_write([
+            UpdateOne(
+                {"_id": user_key(user_id)},
+                {"$inc": inc, "$set": {"updated_at": now}, "$setOnInsert": {"user_id": user_id, "kind": "user"}},
+                upsert=True,
+            ),
+            UpdateOne(
+                {"_id": folder_key(user_id, folder)},
+                {"$inc": inc, "$set": {"updated_at": now}, "$setOnInsert": {"user_id": user_id, "kind": "folder", "folder": folder}},
+                upsert=True,
+            ),
+        ], ordered=False)
+
+    async def apply_snapshot(self, totals: Dict[str, Dict[str, Any]], started_at: datetime, batch_size: int = 500) -> int:
+        """
+        Overwrite counters with totals computed from the blob inventory and
+        zero the ones no blob backs any more. Counters updated after
+        ``started_at`` changed mid-scan and keep their live value.
+        Returns the number of counters corrected.
+        """
+        now = datetime.utcnow()
+        operations = [
+            UpdateOne(
+                {"_id": key, "updated_at": {"$lt": started_at}},
+                {"$set": {**doc, "updated_at": now, "reconciled_at": now}},
+                upsert=True,
+            )
+            for key, doc in totals.items()
+        ]
+        cursor = self.collection.find({"updated_at": {"$lt": started_at}}, {"_id": 1}).batch_size(batch_size)
+        async for doc in cursor:
+            if doc["_id"] not in totals:
+                operations.append(UpdateOne(
+                    {"_id": doc["_id"], "updated_at": {"$lt": started_at}},
+                    {"$set": {"bytes": 0, "objects": 0, "updated_at": now, "reconciled_at": now}},
+                ))
+
+        corrected = 0
+        for start in range(0, len(operations), batch_size):
+            try:
+                result = await self.collection.bulk_write(operations[start:start + batch_size], ordered=False)
+                corrected += result.modified_count + result.upserted_count
+            except BulkWriteError as e:
+                # A duplicate key means the filter skipped a counter that moved
+                # on during the scan and the upsert collided with it
+                if any(error["code"] != 11000 for error in e.details["writeErrors"]):
+                    raise
+                corrected += e.details["nModified"] + e.details["nUpserted"]
+        return corrected
+
+    async def delete_user(self, user_id: str) -> int:
+        result = await self.collection.delete_many({"user_id": user_id})
+        return result.deleted_count
+
+# Create a default instance for easy importing
+storage_usage = CRUDStorageUsage()
@@ -1,13 +1,33 @@
-from typing import Optional, Dict, Any
+import logging
+import re
+from typing import Optional, Dict, Any, List, Tuple
 from datetime import datetime
 from bson import ObjectId
 from fastapi import HTTPException, status
+from pymongo import ReturnDocument
+from app.core.exceptions import PreconditionFailedException
+from app.core.pagination import KEYSET_SORT, encode_cursor, keyset_after
+from app.core.singleflight import SingleFlight
 from app.models.user import UserInDB, UserCreate, UserUpdate, User
-from app.db.session import get_collection
+from app.models.user_schema import USER_SCHEMA_VERSION, normalized_fields, upgrade_user
+from app.db.session import get_analytics_collection, get_collection
+from app.db.writeback import user_write_back
+from app.crud.crud_user_stats import STATS_FIELDS, STATS_PROJECTION, user_stats
+
+logger = logging.getLogger(__name__)
+
+# Fields returned by list endpoints; never the password hash
+LIST_PROJECTION = {"hashed_password": 0}
+SEARCH_PROJECTION = {
+    "email": 1, "first_name": 1, "last_name": 1, "role": 1,
+    "is_active": 1, "is_verified": 1, "created_at": 1,
+}
 
 class CRUDUser:
     def __init__(self):
         self._collection = None
+        self._analytics_collection = None
+        self._get_flight = SingleFlight("user_get")
     
     @property
     def collection(self):
@@ -15,20 +35,135 @@ class CRUDUser:
             self._collection = get_collection("users")
         return self._collection
 
+    @property
+    def analytics_collection(self):
+        """Admin listing, search, export and counts; may lag the primary slightly"""
+        if self._analytics_collection is None:
+            self._analytics_collection = get_analytics_collection("users")
+        return self._analytics_collection
+
+    def _upgrade(self, user_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Bring a user document read with every field (except, at most, the
+        password hash) to the current schema; the change is written back
+        in the background.
+        """
+        original = {key: user_data[key] for key in ("_id", "schema_version", "updated_at") if key in user_data}
+        user_write_back.add(original, upgrade_user(user_data))
+        return user_data
+
+    @staticmethod
+    def _version_filter(oid: ObjectId, expected_updated_at: datetime) -> Dict[str, Any]:
+        """
+        Match the stored version an ETag was computed from. For a legacy
+        document that version may exist only in the upgraded copy
+        (updated_at defaults to created_at, created_at to the ObjectId
+        time) until the write-back lands, so match those defaults too.
+        """
+        clauses: List[Dict[str, Any]] = [
+            {"updated_at": expected_updated_at},
+            {"updated_at": {"$exists": False}, "created_at": expected_updated_at},
+        ]
+        if oid.generation_time.replace(tzinfo=None) == expected_updated_at:
+            clauses.append({"updated_at": {"$exists": False}, "created_at": {"$exists": False}})
+        return {"$or": clauses}
+
+    async def record_stats(self, changes):
+        """Move the dashboard counters by (before, after) user pairs"""
+        # A lost increment is drift the nightly reconciliation corrects;
+        # it must not fail the write it describes
+        try:
+            await user_stats.record_changes(changes)
+        except Exception as e:
+            logger.error(f"Updating user stats failed: {str(e)}")
+
     async def get_by_email(self, email: str) -> Optional[UserInDB]:
         user_data = await self.collection.find_one({"email": email})
         if user_data:
-            return UserInDB(**user_data)
+            return UserInDB(**self._upgrade(user_data))
         return None
 
     async def get(self, user_id: str) -> Optional[UserInDB]:
         if not ObjectId.is_valid(user_id):
             return None
-        user_data = await self.collection.find_one({"_id": ObjectId(user_id)})
+        # Fan-out from the frontend asks for the same user many times at once
+        user_data = await self._get_flight.do(
+            user_id, lambda: self.collection.find_one({"_id": ObjectId(user_id)})
+        )
         if user_data:
-            return UserInDB(**user_data)
+            # The document is shared with every caller of the flight; upgrade a copy
+            return UserInDB(**self._upgrade(dict(user_data)))
         return None
 
+    async def list_page(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        query: Optional[Dict[str, Any]] = None,
+        projection: Optional[Dict[str, Any]] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """
+        One page of users, newest first, and the cursor of the next page
+        (None on the last page). One extra document is fetched to tell.
+        """
+        filters = query or {}
+        if cursor:
+            after = keyset_after(cursor)
+            filters = {"$and": [filters, after]} if filters else after
+        docs = await self.analytics_collection.find(filters, projection or LIST_PROJECTION) \
+            .sort(KEYSET_SORT).limit(limit + 1).to_list(length=limit + 1)
+        next_cursor = None
+        if len(docs) > limit:
+            docs = docs[:limit]
+            # The stored sort key, before any upgrade fills in a missing created_at
+            next_cursor = encode_cursor(docs[-1].get("created_at"), docs[-1]["_id"])
+        if projection is None:
+            # Partial projections can't tell a missing field from an unselected one
+            for doc in docs:
+                self._upgrade(doc)
+        return docs, next_cursor
+
+    @staticmethod
+    def build_search_query(
+        q: Optional[str] = None,
+        prefix: Optional[str] = None,
+        prefix_field: str = "email",
+        role: Optional[str] = None,
+        is_active: Optional[bool] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+    ) -> Dict[str, Any]:
+        """
+        Filter for the admin user search. ``q`` uses the text index; ``prefix``
+        is an anchored regex on the normalized lowercase field(s), which
+        MongoDB turns into a range scan of their indexes.
+        """
+        query: Dict[str, Any] = {}
+        if q:
+            query["$text"] = {"$search": q}
+        if prefix:
+            pattern = {"$regex": f"^{re.escape(prefix.lower())}"}
+            if prefix_field == "name":
+                query["$or"] = [{"first_name_lower": pattern}, {"last_name_lower": pattern}]
+            else:
+                query["email_lower"] = pattern
+        if role:
+            query["role"] = role
+        if is_active is not None:
+            query["is_active"] = is_active
+        if created_from or created_to:
+            created: Dict[str, datetime] = {}
+            if created_from:
+                created["$gte"] = created_from
+            if created_to:
+                created["$lt"] = created_to
+            query["created_at"] = created
+        return query
+
+    async def estimated_count(self) -> int:
+        # Collection metadata, not a scan
+        return await self.analytics_collection.estimated_document_count()
+
     async def create(self, user_in: UserCreate) -> UserInDB:
         # Check if user with email already exists
         existing_user = await self.get_by_email(user_in.email)
@@ -45,27 +180,32 @@ class CRUDUser:
         # Create user data
         user_data = user_in.dict(exclude={"password"}, exclude_unset=True)
         user_data["hashed_password"] = hashed_password
+        user_data.update(normalized_fields(user_data))
+        user_data["schema_version"] = USER_SCHEMA_VERSION
         user_data["created_at"] = datetime.utcnow()
         user_data["updated_at"] = datetime.utcnow()
         
         # Insert into database
         result = await self.collection.insert_one(user_data)
+        await self.record_stats([(None, user_data)])
         
         # Return the created user
         created_user = await self.get(str(result.inserted_id))
         return created_user
 
     async def update(
-        self, user_id: str, user_in: UserUpdate
+        self, user_id: str, user_in: UserUpdate, expected_updated_at: Optional[datetime] = None
     ) -> Optional[UserInDB]:
+        """
+        Apply a partial update in one round trip.
+
+        With ``expected_updated_at`` (from If-Match) the write only applies
+        while the stored version is unchanged; a lost race raises
+        PreconditionFailedException instead of overwriting.
+        """
         if not ObjectId.is_valid(user_id):
             return None
             
-        # Get existing user
-        existing_user = await self.get(user_id)
-        if not existing_user:
-            return None
-            
         # Prepare update data
         update_data = user_in.dict(exclude_unset=True)
         
@@ -77,16 +217,32 @@ class CRUDUser:
             update_data["hashed_password"] = hashed_password
         
         # Update the user
+        update_data.update(normalized_fields(update_data))
         update_data["updated_at"] = datetime.utcnow()
         
-        # Perform the update
-        result = await self.collection.update_one(
-            {"_id": ObjectId(user_id)},
-            {"$set": update_data}
+        query: Dict[str, Any] = {"_id": ObjectId(user_id)}
+        if expected_updated_at is not None:
+            query.update(self._version_filter(ObjectId(user_id), expected_updated_at))
+        
+        # Perform the update and read back the new document; when a counted
+        # field changes, read the old one instead to know what to count
+        counted = any(field in update_data for field in STATS_FIELDS)
+        user_data = await self.collection.find_one_and_update(
+            query,
+            {"$set": update_data},
+            return_document=ReturnDocument.BEFORE if counted else ReturnDocument.AFTER
         )
+        if user_data and counted:
+            before, user_data = user_data, {**user_data, **update_data}
+            await self.record_stats([(before, user_data)])
+        if user_data:
+            return UserInDB(**self._upgrade(user_data))
         
-        if result.modified_count == 1:
-            return await self.get(user_id)
+        # Only a failed conditional write needs to tell "gone" from "changed"
+        if expected_updated_at is not None and await self.collection.count_documents(
+            {"_id": ObjectId(user_id)}, limit=1
+        ):
+            raise PreconditionFailedException()
         return None
 
     async def authenticate(self, email: str, password: str) -> Optional[UserInDB]:
@@ -102,8 +258,10 @@ class CRUDUser:
         if not ObjectId.is_valid(user_id):
             return False
             
-        result = await self.collection.delete_one({"_id": ObjectId(user_id)})
-        return result.deleted_count > 0
+        deleted = await self.collection.find_one_and_delete({"_id": ObjectId(user_id)}, projection=STATS_PROJECTION)
+        if deleted:
+            await self.record_stats([(deleted, None)])
+        return deleted is not None
 
 # Create a default instance for easy importing
 user = CRUDUser()
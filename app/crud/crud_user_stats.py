@@ -0,0 +1,156 @@
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from pymongo import UpdateOne
+from app.db.session import get_analytics_collection, get_collection
+
+TOTALS_ID = "totals"
+
+# User fields the counters depend on
+STATS_FIELDS = ("role", "is_active", "is_verified", "created_at")
+STATS_PROJECTION = {field: 1 for field in STATS_FIELDS}
+
+def signup_key(day: datetime) -> str:
+    return f"signups:{day:%Y-%m-%d}"
+
+def signup_day(user: Dict[str, Any]) -> datetime:
+    created_at = user.get("created_at")
+    if created_at is None:
+        oid = user.get("_id")
+        created_at = oid.generation_time.replace(tzinfo=None) if hasattr(oid, "generation_time") else datetime.utcnow()
+    return datetime(created_at.year, created_at.month, created_at.day)
+
+def user_counts(user: Dict[str, Any], sign: int) -> Counter:
+    """The counters one user contributes to, times ``sign``"""
+    counts = Counter(total=sign)
+    counts["active" if user.get("is_active", True) else "inactive"] += sign
+    if user.get("is_verified", False):
+        counts["verified"] += sign
+    counts[f"by_role.{user.get('role') or 'user'}"] += sign
+    return counts
+
+class CRUDUserStats:
+    """
+    Dashboard counters for users, kept up to date with ``$inc``.
+
+    One ``totals`` document holds total, active, inactive, verified and
+    per-role counts; one ``signups:<YYYY-MM-DD>`` document per day counts
+    the users registered that day (deleted accounts drop out). Reading the
+    dashboard is a couple of ``_id`` lookups whatever the number of users;
+    ``reconcile`` rebuilds everything from ``users`` to correct any drift.
+    """
+
+    def __init__(self):
+        self._collection = None
+        self._analytics_collection = None
+
+    @property
+    def collection(self):
+        if self._collection is None:
+            self._collection = get_collection("user_stats")
+        return self._collection
+
+    @property
+    def analytics_collection(self):
+        if self._analytics_collection is None:
+            self._analytics_collection = get_analytics_collection("user_stats")
+        return self._analytics_collection
+
+    async def record_created(self, user: Dict[str, Any]):
+        await self.record_changes([(None, user)])
+
+    async def record_changes(self, changes: Iterable[Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]]):
+        """
+        Apply (before, after) pairs in one write: ``before`` None is a
+        create, ``after`` None a delete. Both need the STATS_FIELDS.
+        """
+        counts = Counter()
+        signups = Counter()
+        for before, after in changes:
+            if before is not None:
+                counts.update(user_counts(before, -1))
+                signups[signup_day(before)] -= 1
+            if after is not None:
+                counts.update(user_counts(after, 1))
+                signups[signup_day(after)] += 1
+
+        now = datetime.utcnow()
+        operations = []
+        counts = Counter({key: value for key, value in counts.items() if value})
+        if counts:
+            operations.append(UpdateOne({"_id": TOTALS_ID}, {"$inc": dict(counts), "$set": {"updated_at": now}}, upsert=True))
+        for day, delta in signups.items():
+            if delta:
+                operations.append(UpdateOne(
+                    {"_id": signup_key(day)},
+                    {"$inc": {"count": delta}, "$setOnInsert": {"kind": "signups", "day": day}},
+                    upsert=True,
+                ))
+        if operations:
+            await self.collection.bulk_write(operations, ordered=False)
+
+    async def get_totals(self) -> Optional[Dict[str, Any]]:
+        return await self.analytics_collection.find_one({"_id": TOTALS_ID}, {"_id": 0})
+
+    async def get_signups(self, days: int) -> List[Dict[str, Any]]:
+        """Signups per day for the last ``days`` days (today included), oldest first"""
+        today = datetime.utcnow()
+        keys = [signup_key(today - timedelta(days=offset)) for offset in range(days - 1, -1, -1)]
+        found = {doc["_id"]: doc["count"] async for doc in self.analytics_collection.find({"_id": {"$in": keys}})}
+        return [{"day": key.split(":", 1)[1], "count": found.get(key, 0)} for key in keys]
+
+    async def reconcile(self, users_collection) -> Dict[str, Any]:
+        """
+        Recompute every counter from ``users_collection`` and overwrite the
+        stored values. Increments landing while the aggregation runs may be
+        overwritten; the next run corrects them.
+        """
+        facets = await users_collection.aggregate([
+            {"$project": {
+                "role": {"$ifNull": ["$role", "user"]},
+                "is_active": {"$ifNull": ["$is_active", True]},
+                "is_verified": {"$ifNull": ["$is_verified", False]},
+                "day": {"$dateToString": {
+                    "format": "%Y-%m-%d", "date": {"$ifNull": ["$created_at", {"$toDate": "$_id"}]},
+                }},
+            }},
+            {"$facet": {
+                "by_role": [{"$group": {
+                    "_id": "$role",
+                    "total": {"$sum": 1},
+                    "active": {"$sum": {"$cond": ["$is_active", 1, 0]}},
+                    "verified": {"$sum": {"$cond": ["$is_verified", 1, 0]}},
+                }}],
+                "signups": [{"$group": {"_id": "$day", "count": {"$sum": 1}}}],
+            }},
+        ], allowDiskUse=True).to_list(length=1)
+        by_role, signups = facets[0]["by_role"], facets[0]["signups"]
+
+        now = datetime.utcnow()
+        total = sum(row["total"] for row in by_role)
+        active = sum(row["active"] for row in by_role)
+        totals = {
+            "total": total,
+            "active": active,
+            "inactive": total - active,
+            "verified": sum(row["verified"] for row in by_role),
+            "by_role": {row["_id"]: row["total"] for row in by_role},
+            "updated_at": now,
+            "reconciled_at": now,
+        }
+        operations = [UpdateOne({"_id": TOTALS_ID}, {"$set": totals}, upsert=True)]
+        # Days whose users have all been deleted
+        keys = [signup_key(datetime.strptime(row["_id"], "%Y-%m-%d")) for row in signups]
+        await self.collection.delete_many({"kind": "signups", "_id": {"$nin": keys}})
+        for row in signups:
+            day = datetime.strptime(row["_id"], "%Y-%m-%d")
+            operations.append(UpdateOne(
+                {"_id": signup_key(day)},
+                {"$set": {"kind": "signups", "day": day, "count": row["count"]}},
+                upsert=True,
+            ))
+        await self.collection.bulk_write(operations, ordered=False)
+        return {"total": total, "signup_days": len(signups)}
+
+# Create a default instance for easy importing
+user_stats = CRUDUserStats()
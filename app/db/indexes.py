@@ -0,0 +1,148 @@
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+from app.db.session import get_collection
+
+logger = logging.getLogger(__name__)
+
+# Every index the application relies on, per collection. Reconciliation
+# creates the missing ones and reports anything else it finds.
+INDEXES: Dict[str, List[IndexModel]] = {
+    "users": [
+        IndexModel([("email", ASCENDING)], unique=True),
+        # Role and status filters on the admin list
+        IndexModel([("role", ASCENDING)]),
+        IndexModel([("is_active", ASCENDING)]),
+        # Keyset pagination of the admin user list (newest first); also
+        # serves created_at range filters
+        IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)]),
+        # Case-insensitive prefix search (autocomplete) on normalized fields
+        IndexModel([("email_lower", ASCENDING)]),
+        IndexModel([("first_name_lower", ASCENDING)]),
+        IndexModel([("last_name_lower", ASCENDING)]),
+        # Full-text search
+        IndexModel([("email", TEXT), ("first_name", TEXT), ("last_name", TEXT)]),
+    ],
+    "storage_usage": [
+        # Per-folder listing for a user
+        IndexModel([("user_id", ASCENDING), ("kind", ASCENDING)]),
+    ],
+    "user_cleanup_jobs": [
+        # Oldest claimable job first
+        IndexModel([("status", ASCENDING), ("created_at", ASCENDING)]),
+    ],
+}
+
+# Options that change what an index does; two indexes with the same name
+# but different values here are a mismatch
+COMPARED_OPTIONS = ("unique", "sparse", "expireAfterSeconds", "partialFilterExpression")
+
+
+def _signature(spec: Dict[str, Any]) -> Dict[str, Any]:
+    """Key and behavioural options of an index, as reported by listIndexes"""
+    key = dict(spec["key"])
+    if "_fts" in key:
+        # Text indexes are listed as {_fts: "text", _ftsx: 1} with the fields in weights
+        key = {field: "text" for field in sorted(spec.get("weights", {}))}
+    signature = {"key": key}
+    for option in COMPARED_OPTIONS:
+        if spec.get(option) not in (None, False):
+            signature[option] = spec[option]
+    return signature
+
+
+def _declared_signature(model: IndexModel) -> Dict[str, Any]:
+    document = dict(model.document)
+    if TEXT in document["key"].values():
+        document["weights"] = {field: 1 for field, kind in document["key"].items() if kind == TEXT}
+        document["key"] = {"_fts": "text", "_ftsx": 1}
+    return _signature(document)
+
+
+async def reconcile_indexes(
+    apply: bool = True,
+    drop_extra: bool = False,
+    collections: Optional[List[str]] = None,
+) -> Dict[str, Dict[str, List[str]]]:
+    """
+    Compare the registry with the indexes that exist.
+
+    Missing indexes are created when ``apply`` is set (index builds do not
+    block reads or writes on the collection). Indexes that exist but are
+    not declared are reported as ``extra`` and only dropped with
+    ``drop_extra``; an index whose options differ from its declaration is
+    reported as ``mismatched`` and never changed automatically.
+    """
+    report: Dict[str, Dict[str, List[str]]] = {}
+    for name in collections or list(INDEXES):
+        collection = get_collection(name)
+        declared = {model.document["name"]: model for model in INDEXES.get(name, [])}
+        existing = {spec["name"]: spec async for spec in collection.list_indexes()}
+
+        missing = [index for index in declared if index not in existing]
+        mismatched = [
+            index for index in declared
+            if index in existing and _signature(existing[index]) != _declared_signature(declared[index])
+        ]
+        extra = [index for index in existing if index not in declared and index != "_id_"]
+
+        if apply and missing:
+            await collection.create_indexes([declared[index] for index in missing])
+            logger.info(f"Created indexes on {name}: {', '.join(missing)}")
+        if drop_extra:
+            for index in extra:
+                await collection.drop_index(index)
+                logger.info(f"Dropped index {name}.{index}")
+        for index in mismatched:
+            logger.warning(f"Index {name}.{index} does not match its declaration")
+        if extra and not drop_extra:
+            logger.warning(f"Undeclared indexes on {name}: {', '.join(extra)}")
+
+        report[name] = {"missing": missing, "mismatched": mismatched, "extra": extra}
+    return report
+
+
+async def index_usage(hot_ops_per_hour: float) -> List[Dict[str, Any]]:
+    """
+    Per-index usage from ``$indexStats``, summed over the members that
+    reported it. Counters start when the index was built or the server
+    last restarted (``since``).
+    """
+    now = datetime.utcnow()
+    rows = []
+    for name in INDEXES:
+        declared = {model.document["name"]: model for model in INDEXES[name]}
+        usage: Dict[str, Dict[str, Any]] = {}
+        async for stats in get_collection(name).aggregate([{"$indexStats": {}}]):
+            row = usage.setdefault(stats["name"], {
+                "collection": name,
+                "name": stats["name"],
+                "key": dict(stats["key"]),
+                "ops": 0,
+                "since": stats["accesses"]["since"],
+                "declared": stats["name"] in declared or stats["name"] == "_id_",
+                "unique": bool(stats.get("spec", {}).get("unique")),
+            })
+            row["ops"] += stats["accesses"]["ops"]
+            row["since"] = min(row["since"], stats["accesses"]["since"])
+        for row in usage.values():
+            hours = max((now - row["since"]).total_seconds() / 3600, 1 / 60)
+            row["ops_per_hour"] = round(row["ops"] / hours, 2)
+            # Unique indexes enforce a constraint even when no query uses them
+            row["unused"] = row["ops"] == 0 and row["name"] != "_id_" and not row["unique"]
+            row["hot"] = row["ops_per_hour"] >= hot_ops_per_hour
+            rows.append(row)
+    rows.sort(key=lambda row: row["ops_per_hour"], reverse=True)
+    return rows
+
+
+async def ensure_indexes():
+    """Startup reconciliation: never fails startup, only logs"""
+    try:
+        report = await reconcile_indexes()
+    except Exception as e:
+        logger.error(f"Index reconciliation failed: {str(e)}")
+        return
+    if not any(any(changes.values()) for changes in report.values()):
+        logger.info("Indexes match the registry")
@@ -0,0 +1,126 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Union
+from pymongo.errors import OperationFailure
+from app.core.config import settings
+from app.db.session import Database, get_collection
+
+logger = logging.getLogger(__name__)
+
+Update = Union[Dict[str, Any], List[Dict[str, Any]]]
+
+
+class MigrationContext:
+    """
+    What a migration step gets to work with: dry-run flag, batching and
+    throttle settings, and a ``checkpoint`` callback that records progress
+    in the ledger so an interrupted step resumes where it stopped.
+    """
+
+    def __init__(
+        self,
+        dry_run: bool = False,
+        batch_size: Optional[int] = None,
+        batch_sleep: Optional[float] = None,
+        max_lag: Optional[float] = None,
+        checkpoint: Optional[Dict[str, Any]] = None,
+        save_checkpoint: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None,
+    ):
+        self.dry_run = dry_run
+        self.batch_size = batch_size or settings.MIGRATION_BATCH_SIZE
+        self.batch_sleep = settings.MIGRATION_BATCH_SLEEP if batch_sleep is None else batch_sleep
+        self.max_lag = settings.MIGRATION_MAX_REPLICATION_LAG if max_lag is None else max_lag
+        self.checkpoint = checkpoint or {}
+        self._save_checkpoint = save_checkpoint
+        self._lag_supported = True
+
+    async def save(self, **progress):
+        self.checkpoint.update(progress)
+        if self._save_checkpoint and not self.dry_run:
+            await self._save_checkpoint(self.checkpoint)
+
+    async def replication_lag(self) -> Optional[float]:
+        """Seconds the slowest secondary is behind the primary, None if unknown"""
+        if not self._lag_supported:
+            return None
+        try:
+            status = await Database.client.admin.command("replSetGetStatus")
+        except OperationFailure as e:
+            # Standalone server, or no clusterMonitor privilege
+            logger.info(f"Replication lag throttle disabled: {str(e)}")
+            self._lag_supported = False
+            return None
+        members = status.get("members", [])
+        primary = next((m["optimeDate"] for m in members if m.get("stateStr") == "PRIMARY"), None)
+        secondaries = [m["optimeDate"] for m in members if m.get("stateStr") == "SECONDARY"]
+        if primary is None or not secondaries:
+            return None
+        return max((primary - optime).total_seconds() for optime in secondaries)
+
+    async def throttle(self):
+        """Pause between batches, and longer while secondaries are lagging"""
+        if self.batch_sleep > 0:
+            await asyncio.sleep(self.batch_sleep)
+        if self.max_lag <= 0 or self.dry_run:
+            return
+        while True:
+            lag = await self.replication_lag()
+            if lag is None or lag <= self.max_lag:
+                return
+            logger.info(f"Replication lag {lag:.1f}s above {self.max_lag:.1f}s, waiting")
+            await asyncio.sleep(min(lag, 5.0))
+
+    async def backfill(
+        self, collection_name: str, filters: Dict[str, Any], update: Update, step: str = "backfill"
+    ) -> int:
+        """
+        Apply ``update`` to the documents matching ``filters``, one ``_id``
+        range of ``batch_size`` documents at a time, checkpointing the last
+        ``_id`` under ``step`` after every batch. In a dry run the matching
+        documents are only counted. Returns the number of documents
+        modified (or, in a dry run, matched).
+        """
+        collection = get_collection(collection_name)
+        progress = self.checkpoint.get(step, {})
+        last_id = progress.get("last_id")
+        processed = progress.get("processed", 0)
+        while True:
+            range_filter = {"_id": {"$gt": last_id}} if last_id is not None else {}
+            ids = await collection.find({**filters, **range_filter}, {"_id": 1}) \
+                .sort("_id", 1).limit(self.batch_size).to_list(length=self.batch_size)
+            if not ids:
+                break
+
+            batch_filter = {**filters, "_id": {"$gte": ids[0]["_id"], "$lte": ids[-1]["_id"]}}
+            if self.dry_run:
+                processed += len(ids)
+            else:
+                result = await collection.update_many(batch_filter, update)
+                processed += result.modified_count
+            last_id = ids[-1]["_id"]
+            await self.save(**{step: {"last_id": last_id, "processed": processed}})
+            logger.info(f"Backfill {collection_name}: {processed} documents, last _id {last_id}")
+
+            if len(ids) < self.batch_size:
+                break
+            await self.throttle()
+        return processed
+
+
+class Migration:
+    """
+    One versioned schema change. ``version`` orders migrations and is the
+    ledger key; ``up`` applies the change and ``down`` reverts it. Both must
+    be safe to run again after an interruption (backfills resume from
+    their checkpoint).
+    """
+
+    version: int
+    description: str = ""
+
+    async def up(self, ctx: MigrationContext):
+        raise NotImplementedError
+
+    async def down(self, ctx: MigrationContext):
+        raise NotImplementedError(f"Migration {self.version} cannot be reverted")
+
@@ -0,0 +1,25 @@
+from app.models.user_schema import SEARCH_FIELDS
+from app.db.migrations.base import Migration, MigrationContext
+
+LOWER_FIELDS = [f"{field}_lower" for field in SEARCH_FIELDS]
+
+
+class UserSearchFields(Migration):
+    """Normalized lowercase fields for prefix search on users created before them"""
+
+    version = 1
+    description = "Backfill users.*_lower search fields"
+
+    async def up(self, ctx: MigrationContext):
+        await ctx.backfill(
+            "users",
+            {"email_lower": {"$exists": False}},
+            [{"$set": {f"{field}_lower": {"$toLower": f"${field}"} for field in SEARCH_FIELDS}}],
+        )
+
+    async def down(self, ctx: MigrationContext):
+        await ctx.backfill(
+            "users",
+            {"email_lower": {"$exists": True}},
+            {"$unset": {field: "" for field in LOWER_FIELDS}},
+        )
@@ -0,0 +1,139 @@
+import logging
+import os
+import socket
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+from app.core.config import settings
+from app.crud.crud_lease import lease
+from app.db.migrations.base import Migration, MigrationContext
+from app.db.migrations.m0001_user_search_fields import UserSearchFields
+from app.db.session import get_collection
+
+logger = logging.getLogger(__name__)
+
+# Every migration, in any order; versions must be unique
+MIGRATIONS: List[Migration] = [
+    UserSearchFields(),
+]
+
+LOCK_NAME = "migrations"
+
+
+class MigrationRunner:
+    """
+    Applies and reverts migrations, recording each in the
+    ``schema_migrations`` ledger (one document per version).
+
+    A migration's ledger entry is ``running`` / ``reverting`` while a step
+    is in progress, with the step's checkpoint, so a rerun after a crash
+    resumes it. A lease keeps two runners from working at the same time.
+    Dry runs write nothing, neither data nor ledger.
+    """
+
+    def __init__(self, migrations: Optional[List[Migration]] = None):
+        self.migrations = sorted(migrations or MIGRATIONS, key=lambda migration: migration.version)
+        versions = [migration.version for migration in self.migrations]
+        if len(set(versions)) != len(versions):
+            raise ValueError(f"Duplicate migration versions: {versions}")
+        self.holder = f"{socket.gethostname()}:{os.getpid()}"
+        self._collection = None
+
+    @property
+    def collection(self):
+        if self._collection is None:
+            self._collection = get_collection("schema_migrations")
+        return self._collection
+
+    async def ledger(self) -> Dict[int, Dict[str, Any]]:
+        return {doc["_id"]: doc async for doc in self.collection.find()}
+
+    async def status(self) -> List[Dict[str, Any]]:
+        ledger = await self.ledger()
+        return [
+            {
+                "version": migration.version,
+                "description": migration.description,
+                "status": ledger.get(migration.version, {}).get("status", "pending"),
+                "applied_at": ledger.get(migration.version, {}).get("applied_at"),
+            }
+            for migration in self.migrations
+        ]
+
+    async def upgrade(self, target: Optional[int] = None, dry_run: bool = False, **options) -> List[int]:
+        """Apply every migration not yet applied, up to and including ``target``"""
+        ledger = await self.ledger()
+        todo = [
+            migration for migration in self.migrations
+            if (target is None or migration.version <= target)
+            and ledger.get(migration.version, {}).get("status") != "applied"
+        ]
+        return await self._run_all(todo, "up", ledger, dry_run, options)
+
+    async def downgrade(self, target: int, dry_run: bool = False, **options) -> List[int]:
+        """Revert every applied migration above ``target``, newest first"""
+        ledger = await self.ledger()
+        todo = [
+            migration for migration in reversed(self.migrations)
+            if migration.version > target and migration.version in ledger
+        ]
+        return await self._run_all(todo, "down", ledger, dry_run, options)
+
+    async def _run_all(self, todo, direction, ledger, dry_run, options) -> List[int]:
+        if not todo:
+            return []
+        if not dry_run and not await self._renew_lock():
+            raise RuntimeError("Another migration runner holds the lock")
+        try:
+            for migration in todo:
+                await self._run(migration, direction, ledger.get(migration.version), dry_run, options)
+        finally:
+            if not dry_run:
+                await lease.release(LOCK_NAME, self.holder)
+        return [migration.version for migration in todo]
+
+    async def _run(self, migration: Migration, direction: str, entry, dry_run: bool, options):
+        in_progress = "running" if direction == "up" else "reverting"
+        # Resume only a step interrupted in the same direction
+        checkpoint = entry.get("checkpoint") if entry and entry.get("status") == in_progress else None
+        verb = "Dry run of" if dry_run else ("Resuming" if checkpoint else "Running")
+        logger.info(f"{verb} migration {migration.version} {direction}: {migration.description}")
+
+        async def save_checkpoint(progress: Dict[str, Any]):
+            await self.collection.update_one(
+                {"_id": migration.version},
+                {"$set": {"checkpoint": progress, "updated_at": datetime.utcnow()}},
+            )
+            if not await self._renew_lock():
+                raise RuntimeError("Migration lock lost to another runner")
+
+        ctx = MigrationContext(dry_run=dry_run, checkpoint=checkpoint, save_checkpoint=save_checkpoint, **options)
+        now = datetime.utcnow()
+        if not dry_run:
+            await self.collection.update_one(
+                {"_id": migration.version},
+                {
+                    "$set": {
+                        "description": migration.description,
+                        "status": in_progress,
+                        "checkpoint": ctx.checkpoint,
+                        "updated_at": now,
+                    },
+                    "$setOnInsert": {"started_at": now},
+                },
+                upsert=True,
+            )
+
+        await getattr(migration, direction)(ctx)
+
+        if dry_run:
+            logger.info(f"Dry run of migration {migration.version} {direction}: {ctx.checkpoint}")
+        elif direction == "up":
+            await self.collection.update_one(
+                {"_id": migration.version},
+                {"$set": {"status": "applied", "applied_at": datetime.utcnow(), "checkpoint": None}},
+            )
+        else:
+            await self.collection.delete_one({"_id": migration.version})
+
+    async def _renew_lock(self) -> bool:
+        return await lease.acquire(LOCK_NAME, self.holder, timedelta(seconds=settings.MIGRATION_LOCK_TTL))
@@ -1,5 +1,8 @@
+from functools import lru_cache
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.read_preferences import Nearest, Primary, SecondaryPreferred
 from app.core.config import settings
+from app.core.metrics import MongoCommandMetrics
 
 class Database:
     client: AsyncIOMotorClient = None
@@ -16,7 +19,8 @@ class Database:
                 "retryWrites": True,
                 "w": "majority",
                 "tls": True,
-                "tlsAllowInvalidCertificates": True
+                "tlsAllowInvalidCertificates": True,
+                "event_listeners": [MongoCommandMetrics()]
             }
             
             cls.client = AsyncIOMotorClient(settings.MONGODB_URL, **connection_params)
@@ -35,7 +39,8 @@ class Database:
                     settings.MONGODB_URL,
                     serverSelectionTimeoutMS=30000,
                     connectTimeoutMS=30000,
-                    socketTimeoutMS=30000
+                    socketTimeoutMS=30000,
+                    event_listeners=[MongoCommandMetrics()]
                 )
                 cls.db = cls.client[settings.DATABASE_NAME]
                 await cls.db.command('ping')
@@ -45,7 +50,7 @@ class Database:
                 # Try basic connection without any SSL parameters
                 try:
                     print("Attempting basic connection...")
-                    cls.client = AsyncIOMotorClient(settings.MONGODB_URL)
+                    cls.client = AsyncIOMotorClient(settings.MONGODB_URL, event_listeners=[MongoCommandMetrics()])
                     cls.db = cls.client[settings.DATABASE_NAME]
                     await cls.db.command('ping')
                     print("Connected to MongoDB with basic method!")
@@ -60,10 +65,29 @@ class Database:
             print("MongoDB connection closed.")
 
     @classmethod
-    def get_collection(cls, collection_name: str):
+    def get_collection(cls, collection_name: str, read_preference=None):
         if cls.db is None:
             raise RuntimeError("Database is not initialized. Call connect_to_mongo() first.")
-        return cls.db[collection_name]
+        collection = cls.db[collection_name]
+        if read_preference is not None:
+            collection = collection.with_options(read_preference=read_preference)
+        return collection
+
+@lru_cache(maxsize=None)
+def analytics_read_preference():
+    """
+    Read preference for reads that tolerate bounded staleness, so they are
+    served by secondaries instead of competing with logins on the primary
+    """
+    mode = settings.ANALYTICS_READ_PREFERENCE
+    if mode == "primary":
+        return Primary()
+    staleness = settings.ANALYTICS_MAX_STALENESS_SECONDS or -1
+    if mode == "secondaryPreferred":
+        return SecondaryPreferred(max_staleness=staleness)
+    if mode == "nearest":
+        return Nearest(max_staleness=staleness)
+    raise ValueError(f"Unsupported ANALYTICS_READ_PREFERENCE: {mode}")
 
 # Initialize database connection
 async def init_db():
@@ -76,3 +100,7 @@ async def close_db():
 # Dependency to get database collection
 def get_collection(collection_name: str):
     return Database.get_collection(collection_name)
+
+# Collection whose reads follow ANALYTICS_READ_PREFERENCE
+def get_analytics_collection(collection_name: str):
+    return Database.get_collection(collection_name, analytics_read_preference())
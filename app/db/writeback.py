@@ -0,0 +1,82 @@
+import asyncio
+import logging
+from typing import Any, Dict, Optional, Tuple
+from pymongo import UpdateOne
+from app.core.config import settings
+from app.core.metrics import SCHEMA_UPGRADES
+from app.db.session import get_collection
+
+logger = logging.getLogger(__name__)
+
+
+class SchemaWriteBack:
+    """
+    Persists documents upgraded on read, in the background and in batches.
+
+    Reads hand over the fields an upgrade changed; they are written with
+    one unordered ``bulk_write`` every SCHEMA_WRITEBACK_INTERVAL seconds,
+    or sooner once SCHEMA_WRITEBACK_BATCH_SIZE documents are pending. Each
+    write only applies while the stored document still has the version and
+    ``updated_at`` that were read, so it never overwrites a newer write;
+    a skipped document is simply upgraded again on its next read.
+    """
+
+    def __init__(self, collection_name: str):
+        self.collection_name = collection_name
+        self._pending: Dict[Any, Tuple[Dict[str, Any], Dict[str, Any]]] = {}
+        self._full = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        self._task = asyncio.create_task(self._run(), name=f"{self.collection_name}-writeback")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        # Persist what is left rather than redo the upgrades after restart
+        await self.flush()
+
+    def add(self, original: Dict[str, Any], changes: Dict[str, Any]):
+        """Queue ``changes`` for the document read as ``original``"""
+        if not changes or self._task is None:
+            return
+        guard = {
+            "schema_version": original.get("schema_version", {"$exists": False}),
+            "updated_at": original.get("updated_at", {"$exists": False}),
+        }
+        self._pending[original["_id"]] = (guard, changes)
+        SCHEMA_UPGRADES.labels(self.collection_name, "upgraded").inc()
+        if len(self._pending) >= settings.SCHEMA_WRITEBACK_BATCH_SIZE:
+            self._full.set()
+
+    async def flush(self):
+        if not self._pending:
+            return
+        batch, self._pending = self._pending, {}
+        self._full.clear()
+        operations = [
+            UpdateOne({"_id": _id, **guard}, {"$set": changes})
+            for _id, (guard, changes) in batch.items()
+        ]
+        try:
+            result = await get_collection(self.collection_name).bulk_write(operations, ordered=False)
+        except Exception as e:
+            logger.warning(f"Writing back {len(operations)} upgraded {self.collection_name} documents failed: {str(e)}")
+            SCHEMA_UPGRADES.labels(self.collection_name, "failed").inc(len(operations))
+            return
+        SCHEMA_UPGRADES.labels(self.collection_name, "written").inc(result.modified_count)
+        SCHEMA_UPGRADES.labels(self.collection_name, "skipped").inc(len(operations) - result.modified_count)
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._full.wait(), timeout=settings.SCHEMA_WRITEBACK_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            await self.flush()
+
+
+# Create a singleton instance
+user_write_back = SchemaWriteBack("users")
@@ -1,19 +1,34 @@
 import os
-from fastapi import FastAPI, Request, status
+import asyncio
+from fastapi import FastAPI, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.exceptions import RequestValidationError
-from fastapi.responses import JSONResponse
+from app.core.responses import APIResponse, dumps
 from contextlib import asynccontextmanager
 from app.core.config import settings
 from app.db.session import init_db, close_db
+from app.db.indexes import ensure_indexes
+from app.db.writeback import user_write_back
+from app.services.post_processing import post_processing
+from app.services.storage_usage import run_periodic_reconciliation
+from app.services.storage import storage
+from app.services.system_monitor import system_monitor
+from app.services.user_cleanup import user_cleanup
+from app.services.user_stats import run_periodic_user_stats_reconciliation
 from app.api.v1.router import api_router
+from app.core.lifecycle import lifecycle
+from app.core.logging_config import setup_logging, stop_logging
+from app.core.metrics import render_metrics
+from app.middleware.access_log import AccessLogMiddleware
+from app.middleware.admission import UploadAdmissionMiddleware
+from app.middleware.body_limit import BodySizeLimitMiddleware
+from app.middleware.compression import CompressionMiddleware, precompressed
+from app.middleware.drain import DrainMiddleware
+from app.middleware.metrics import MetricsMiddleware
 import logging
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-)
+# Configure logging (records are written by a background listener thread)
+setup_logging()
 logger = logging.getLogger(__name__)
 
 @asynccontextmanager
@@ -22,13 +37,44 @@ async def lifespan(app: FastAPI):
     logger.info("Starting up...")
     await init_db()
     logger.info("Database connection initialized")
+    await user_write_back.start()
+    await post_processing.start()
+    await user_cleanup.start()
+    await system_monitor.start()
+    # Serve the OpenAPI document pre-serialized and pre-compressed
+    precompressed.put(app.openapi_url, dumps(app.openapi()), "application/json")
+    background_tasks = []
+    if settings.INDEX_RECONCILE_ON_STARTUP:
+        # Index builds can take a while on large collections; don't hold up startup
+        background_tasks.append(asyncio.create_task(ensure_indexes()))
+    if settings.STORAGE_USAGE_RECONCILE_INTERVAL > 0:
+        background_tasks.append(asyncio.create_task(run_periodic_reconciliation()))
+    if settings.USER_STATS_RECONCILE_INTERVAL > 0:
+        background_tasks.append(asyncio.create_task(run_periodic_user_stats_reconciliation()))
     
     yield
     
-    # Shutdown: Close database connection
+    # Shutdown: in-flight requests were drained by the server before it
+    # closed connections (DrainingServer); finish queued work, close clients last
     logger.info("Shutting down...")
+    lifecycle.begin_drain()
+    # Starts the clock when not run by DrainingServer (e.g. plain uvicorn)
+    lifecycle.start_deadline(settings.SHUTDOWN_DRAIN_TIMEOUT)
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    if not await post_processing.drain(lifecycle.time_left()):
+        logger.warning(f"Drain deadline reached with {post_processing.stats()['queue_depth']} post-processing jobs queued")
+    await post_processing.stop()
+    # An unfinished cleanup job is handed back and resumed from its checkpoint
+    await user_cleanup.stop()
+    await system_monitor.stop()
+    await user_write_back.stop()
     await close_db()
-    logger.info("Database connection closed")
+    storage.close()
+    logger.info("Database and storage connections closed")
+    # Flush buffered log records before the process exits
+    stop_logging()
 
 # Create FastAPI app
 app = FastAPI(
@@ -39,8 +85,13 @@ app = FastAPI(
     redoc_url="/redoc",
     openapi_url="/openapi.json",
     lifespan=lifespan,
+    default_response_class=APIResponse,
 )
 
+# Negotiated gzip/br/zstd compression for larger, compressible responses;
+# added before CORS so CORS wraps it, including the precompressed OpenAPI document
+app.add_middleware(CompressionMiddleware)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -50,6 +101,21 @@ app.add_middleware(
     allow_headers=["*"],  # Allow all headers
 )
 
+# Bound concurrent uploads and their in-flight bytes per worker
+app.add_middleware(UploadAdmissionMiddleware)
+
+# Reject oversized bodies while they stream in, before multipart spooling
+app.add_middleware(BodySizeLimitMiddleware)
+
+# Per-route request counts, latency histograms and in-flight gauge
+app.add_middleware(MetricsMiddleware)
+
+# Structured, sampled access log (times the whole stack)
+app.add_middleware(AccessLogMiddleware)
+
+# In-flight request tracking for the shutdown drain (outermost)
+app.add_middleware(DrainMiddleware)
+
 # Include API router
 app.include_router(api_router, prefix="/api/v1")
 
@@ -66,7 +132,7 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
             "type": error["type"],
         })
     
-    return JSONResponse(
+    return APIResponse(
         status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
         content={
             "success": False,
@@ -83,7 +149,7 @@ async def global_exception_handler(request: Request, exc: Exception):
     """Handle all other exceptions"""
     logger.error(f"Unhandled exception: {str(exc)}", exc_info=True)
     
-    return JSONResponse(
+    return APIResponse(
         status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
         content={
             "success": False,
@@ -94,19 +160,6 @@ async def global_exception_handler(request: Request, exc: Exception):
         },
     )
 
-# Middleware for request/response logging
-@app.middleware("http")
-async def log_requests(request: Request, call_next):
-    logger.info(f"Request: {request.method} {request.url}")
-    
-    try:
-        response = await call_next(request)
-        logger.info(f"Response: {response.status_code}")
-        return response
-    except Exception as e:
-        logger.error(f"Error processing request: {str(e)}", exc_info=True)
-        raise
-
 # Root endpoint
 @app.get("/")
 async def root():
@@ -116,3 +169,9 @@ async def root():
         "environment": settings.ENVIRONMENT,
         "docs": "/docs"
     }
+
+# Prometheus metrics (aggregated across workers when PROMETHEUS_MULTIPROC_DIR is set)
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
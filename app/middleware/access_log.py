@@ -0,0 +1,77 @@
+import logging
+import random
+import time
+import uuid
+import orjson
+from app.core.config import settings
+from app.core.utils import route_template
+
+logger = logging.getLogger("app.access")
+
+
+class AccessLogMiddleware:
+    """
+    Pure ASGI structured access log.
+
+    Records method, route template, status, duration and request id as one
+    JSON line per request. Errors (status >= 400) and requests slower than
+    ACCESS_LOG_SLOW_MS are always logged; other requests are sampled at
+    ACCESS_LOG_SAMPLE_RATE. The request id is taken from ``X-Request-ID``
+    or generated, stored in ``request.state`` and echoed on the response.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = None
+        for name, value in scope["headers"]:
+            if name == b"x-request-id":
+                request_id = value.decode("latin-1")[:128]
+                break
+        request_id = request_id or uuid.uuid4().hex
+        scope.setdefault("state", {})["request_id"] = request_id
+
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = [*message.get("headers", []), (b"x-request-id", request_id.encode("latin-1"))]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self._log(scope, request_id, status_code, (time.perf_counter() - started) * 1000)
+
+    @staticmethod
+    def _log(scope, request_id: str, status_code: int, duration_ms: float):
+        slow = duration_ms >= settings.ACCESS_LOG_SLOW_MS
+        if status_code < 400 and not slow and random.random() >= settings.ACCESS_LOG_SAMPLE_RATE:
+            return
+
+        if status_code >= 500:
+            level = logging.ERROR
+        elif status_code >= 400 or slow:
+            level = logging.WARNING
+        else:
+            level = logging.INFO
+        if not logger.isEnabledFor(level):
+            return
+
+        logger.log(level, orjson.dumps({
+            "request_id": request_id,
+            "method": scope["method"],
+            "route": route_template(scope),
+            "status": status_code,
+            "duration_ms": round(duration_ms, 2),
+            "slow": slow,
+            "client": scope["client"][0] if scope.get("client") else None,
+        }).decode())
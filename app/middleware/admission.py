@@ -0,0 +1,199 @@
+import asyncio
+import json
+import time
+from collections import deque
+from typing import Deque, Dict, Tuple
+from app.core.config import settings
+from app.core.lifecycle import lifecycle
+from app.core.metrics import (
+    UPLOADS_ACTIVE,
+    UPLOADS_ACTIVE_BYTES,
+    UPLOADS_QUEUE_TIME,
+    UPLOADS_REJECTED,
+    UPLOADS_WAITING,
+)
+
+
+class AdmissionRejected(Exception):
+    pass
+
+
+class UploadAdmissionController:
+    """
+    Per-worker bulkhead for upload bodies.
+
+    A request is admitted while fewer than UPLOAD_MAX_CONCURRENT uploads are
+    active and its declared size fits in the UPLOAD_MAX_INFLIGHT_BYTES
+    budget (a single upload larger than the budget is admitted only when
+    nothing else is in flight). Otherwise it waits in a FIFO queue of at
+    most UPLOAD_MAX_QUEUE entries for up to UPLOAD_QUEUE_TIMEOUT seconds.
+    New uploads are refused outright once the worker is draining.
+    """
+
+    def __init__(self):
+        self.max_concurrent = settings.UPLOAD_MAX_CONCURRENT
+        self.max_queue = settings.UPLOAD_MAX_QUEUE
+        self.max_inflight_bytes = settings.UPLOAD_MAX_INFLIGHT_BYTES
+        self.queue_timeout = settings.UPLOAD_QUEUE_TIMEOUT
+        self._waiters: Deque[Tuple[int, asyncio.Future]] = deque()
+        self.active = 0
+        self.active_bytes = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.queue_time_total = 0.0
+        self.queue_time_max = 0.0
+
+    def _can_admit(self, size: int) -> bool:
+        if self.active >= self.max_concurrent:
+            return False
+        return self.active == 0 or self.active_bytes + size <= self.max_inflight_bytes
+
+    def _admit(self, size: int):
+        self.active += 1
+        self.active_bytes += size
+        self.admitted += 1
+        UPLOADS_ACTIVE.inc()
+        UPLOADS_ACTIVE_BYTES.inc(size)
+
+    def _wake_waiters(self):
+        while self._waiters and self._can_admit(self._waiters[0][0]):
+            size, future = self._waiters.popleft()
+            if not future.done():
+                self._admit(size)
+                future.set_result(None)
+        UPLOADS_WAITING.set(len(self._waiters))
+
+    async def acquire(self, size: int) -> float:
+        """Wait for a slot; returns the time spent queued, in seconds."""
+        if lifecycle.draining:
+            self.rejected += 1
+            UPLOADS_REJECTED.labels("draining").inc()
+            raise AdmissionRejected("Server is shutting down")
+        if not self._waiters and self._can_admit(size):
+            self._admit(size)
+            UPLOADS_QUEUE_TIME.observe(0.0)
+            return 0.0
+        if len(self._waiters) >= self.max_queue:
+            self.rejected += 1
+            UPLOADS_REJECTED.labels("queue_full").inc()
+            raise AdmissionRejected("Upload queue is full")
+
+        started = time.monotonic()
+        future = asyncio.get_running_loop().create_future()
+        waiter = (size, future)
+        self._waiters.append(waiter)
+        UPLOADS_WAITING.set(len(self._waiters))
+        try:
+            await asyncio.wait({future}, timeout=self.queue_timeout)
+        except asyncio.CancelledError:
+            if future.done():
+                self.release(size)
+            else:
+                self._waiters.remove(waiter)
+                self._wake_waiters()
+            raise
+
+        if not future.done():
+            self._waiters.remove(waiter)
+            future.cancel()
+            self._wake_waiters()
+            self.rejected += 1
+            UPLOADS_REJECTED.labels("timeout").inc()
+            raise AdmissionRejected("Timed out waiting for an upload slot")
+
+        waited = time.monotonic() - started
+        self.queue_time_total += waited
+        self.queue_time_max = max(self.queue_time_max, waited)
+        UPLOADS_QUEUE_TIME.observe(waited)
+        return waited
+
+    def release(self, size: int):
+        self.active -= 1
+        self.active_bytes -= size
+        UPLOADS_ACTIVE.dec()
+        UPLOADS_ACTIVE_BYTES.dec(size)
+        self._wake_waiters()
+
+    def stats(self) -> Dict[str, float]:
+        return {
+            "active": self.active,
+            "active_bytes": self.active_bytes,
+            "waiting": len(self._waiters),
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "queue_time_avg": self.queue_time_total / self.admitted if self.admitted else 0.0,
+            "queue_time_max": self.queue_time_max,
+        }
+
+
+# Create a singleton instance
+upload_admission = UploadAdmissionController()
+
+
+class UploadAdmissionMiddleware:
+    """
+    Pure ASGI gate in front of multipart uploads on UPLOAD_ADMISSION_PREFIXES.
+
+    The body size is taken from Content-Length, or from the limit resolved by
+    BodySizeLimitMiddleware when the body is chunked. Requests that cannot be
+    admitted fail fast with 503 and ``Retry-After``.
+    """
+
+    def __init__(self, app, controller: UploadAdmissionController = upload_admission):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._is_upload(scope):
+            await self.app(scope, receive, send)
+            return
+
+        size = self._declared_size(scope)
+        try:
+            await self.controller.acquire(size)
+        except AdmissionRejected as e:
+            await self._reject(send, str(e))
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(size)
+
+    @staticmethod
+    def _is_upload(scope) -> bool:
+        if scope["method"] not in ("POST", "PUT"):
+            return False
+        if not scope["path"].startswith(tuple(settings.UPLOAD_ADMISSION_PREFIXES)):
+            return False
+        for name, value in scope["headers"]:
+            if name == b"content-type":
+                return value.startswith(b"multipart/form-data")
+        return False
+
+    @staticmethod
+    def _declared_size(scope) -> int:
+        for name, value in scope["headers"]:
+            if name == b"content-length" and value.isdigit():
+                return int(value)
+        return scope.get("state", {}).get("body_limit", settings.MAX_UPLOAD_SIZE)
+
+    @staticmethod
+    async def _reject(send, message: str):
+        body = json.dumps({
+            "success": False,
+            "error": {
+                "code": "SERVICE_UNAVAILABLE",
+                "message": message,
+            }
+        }).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 503,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(settings.UPLOAD_RETRY_AFTER).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,112 @@
+import json
+from typing import Optional
+from jose import JOSEError, jwt
+from app.core.config import settings
+from app.core.exceptions import PayloadTooLargeException
+
+BODYLESS_METHODS = {"GET", "HEAD", "OPTIONS", "DELETE"}
+
+
+def _role_from_headers(headers) -> Optional[str]:
+    """Read the role claim from the bearer token, if there is a valid one."""
+    for name, value in headers:
+        if name == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            if scheme.lower() != "bearer" or not token:
+                return None
+            try:
+                payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+            except JOSEError:
+                return None
+            return payload.get("role")
+    return None
+
+
+def resolve_body_limit(path: str, headers) -> int:
+    """
+    Body limit for a request: the longest matching route prefix, overridden
+    by a role limit for that prefix when the caller's token carries a role.
+    """
+    prefix, limit = "", settings.MAX_REQUEST_BODY_SIZE
+    for candidate, candidate_limit in settings.body_size_limits.items():
+        if path.startswith(candidate) and len(candidate) > len(prefix):
+            prefix, limit = candidate, candidate_limit
+
+    role_limits = settings.BODY_SIZE_LIMITS_BY_ROLE.get(prefix)
+    if role_limits:
+        role = _role_from_headers(headers)
+        if role in role_limits:
+            limit = role_limits[role]
+    return limit
+
+
+class BodySizeLimitMiddleware:
+    """
+    Reject oversized request bodies before they are spooled.
+
+    A declared Content-Length over the limit is answered with 413 without
+    reading the body. Otherwise bytes are counted as they are received and
+    the read fails with PayloadTooLargeException the moment the limit is
+    crossed; the 413 carries ``Connection: close`` so the server drops the
+    rest of the upload. The resolved limit is left in ``request.state``.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] in BODYLESS_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        headers = scope["headers"]
+        limit = resolve_body_limit(scope["path"], headers)
+        scope.setdefault("state", {})["body_limit"] = limit
+        allowed = limit + settings.BODY_SIZE_OVERHEAD
+
+        content_length = next((value for name, value in headers if name == b"content-length"), None)
+        if content_length is not None and content_length.isdigit() and int(content_length) > allowed:
+            await self._reject(send, limit)
+            return
+
+        received = 0
+        response_started = False
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > allowed:
+                    raise PayloadTooLargeException(self._detail(limit))
+            return message
+
+        async def tracking_send(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracking_send)
+        except PayloadTooLargeException:
+            if response_started:
+                raise
+            await self._reject(send, limit)
+
+    @staticmethod
+    def _detail(limit: int) -> str:
+        return f"Request body too large. Maximum size is {limit} bytes"
+
+    async def _reject(self, send, limit: int):
+        body = json.dumps({"detail": self._detail(limit)}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"connection", b"close"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,229 @@
+import zlib
+from typing import Dict, List, Optional, Tuple
+from app.core.config import settings
+from app.core.etag import encoded_etag
+
+try:
+    import brotli
+except ImportError:  # br is only offered when the package is installed
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # zstd is only offered when the package is installed
+    zstandard = None
+
+# Preference order when the client weights several encodings equally
+SUPPORTED_ENCODINGS = [name for name, module in (("zstd", zstandard), ("br", brotli), ("gzip", zlib)) if module]
+
+INCOMPRESSIBLE_PREFIXES = (
+    "image/", "video/", "audio/", "font/woff",
+    "application/zip", "application/gzip", "application/x-gzip", "application/zstd",
+    "application/x-7z-compressed", "application/x-rar-compressed", "application/x-bzip2",
+    "application/x-xz", "application/pdf", "application/octet-stream", "text/event-stream",
+)
+COMPRESSIBLE_IMAGES = ("image/svg+xml",)
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick the best supported encoding from an Accept-Encoding header."""
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        token, _, params = item.strip().partition(";")
+        token = token.strip().lower()
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        weights[token] = quality
+
+    best, best_quality = None, 0.0
+    for encoding in SUPPORTED_ENCODINGS:
+        quality = weights.get(encoding, weights.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class _Compressor:
+    """Incremental compressor with a flush per chunk, so streams stay live."""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "gzip":
+            self._obj = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+        elif encoding == "br":
+            self._obj = brotli.Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+        else:
+            self._obj = zstandard.ZstdCompressor(level=settings.COMPRESSION_ZSTD_LEVEL).compressobj()
+
+    def compress(self, data: bytes) -> bytes:
+        if self.encoding == "gzip":
+            return self._obj.compress(data) + self._obj.flush(zlib.Z_SYNC_FLUSH)
+        if self.encoding == "br":
+            return self._obj.process(data) + self._obj.flush()
+        return self._obj.compress(data) + self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self, data: bytes = b"") -> bytes:
+        if self.encoding == "gzip":
+            return self._obj.compress(data) + self._obj.flush()
+        if self.encoding == "br":
+            return self._obj.process(data) + self._obj.finish()
+        return self._obj.compress(data) + self._obj.flush()
+
+
+class PrecompressedCache:
+    """Static responses compressed once, e.g. the OpenAPI document at startup."""
+
+    def __init__(self):
+        self._entries: Dict[str, Tuple[str, Dict[str, bytes]]] = {}
+
+    def put(self, path: str, body: bytes, content_type: str):
+        variants = {"identity": body}
+        for encoding in SUPPORTED_ENCODINGS:
+            variants[encoding] = _Compressor(encoding).finish(body)
+        self._entries[path] = (content_type, variants)
+
+    def get(self, path: str) -> Optional[Tuple[str, Dict[str, bytes]]]:
+        return self._entries.get(path)
+
+
+precompressed = PrecompressedCache()
+
+
+class CompressionMiddleware:
+    """
+    Pure ASGI response compression negotiated from Accept-Encoding
+    (zstd, br or gzip, whichever are installed).
+
+    Bodies under COMPRESSION_MIN_SIZE, already-compressed content types,
+    responses that already carry a Content-Encoding and downloads
+    (Content-Disposition: attachment) are passed through untouched.
+    Streamed bodies are compressed chunk by chunk with a flush after each,
+    so nothing is buffered. Compressed responses get ``Vary:
+    Accept-Encoding`` and a strong ETag suffixed with the encoding.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = ""
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+                break
+        encoding = negotiate_encoding(accept_encoding) if accept_encoding else None
+
+        if scope["method"] in ("GET", "HEAD"):
+            cached = precompressed.get(scope["path"])
+            if cached is not None:
+                await self._send_cached(scope, send, cached, encoding)
+                return
+
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        compressor: Optional[_Compressor] = None
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, compressor, passthrough
+            if message["type"] == "http.response.start":
+                if self._should_skip(message):
+                    passthrough = True
+                    if message["status"] == 304:
+                        # Revalidation of a body this middleware would have compressed
+                        headers = message["headers"] = list(message.get("headers", []))
+                        headers.append((b"vary", b"Accept-Encoding"))
+                        self._tag_encoded(headers, encoding)
+                    await send(message)
+                else:
+                    # Held back until the first body chunk shows the size
+                    start_message = message
+                return
+
+            if passthrough or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+
+            if start_message is not None:
+                headers = start_message["headers"] = list(start_message.get("headers", []))
+                headers.append((b"vary", b"Accept-Encoding"))
+                if not more_body and len(body) < settings.COMPRESSION_MIN_SIZE:
+                    passthrough = True
+                    await send(start_message)
+                    await send(message)
+                    return
+                compressor = _Compressor(encoding)
+                headers[:] = [(k, v) for k, v in headers if k.lower() != b"content-length"]
+                headers.append((b"content-encoding", encoding.encode()))
+                self._tag_encoded(headers, encoding)
+                if not more_body:
+                    body = compressor.finish(body)
+                    headers.append((b"content-length", str(len(body)).encode()))
+                    await send(start_message)
+                    await send({"type": "http.response.body", "body": body})
+                    return
+                await send(start_message)
+                start_message = None
+
+            if more_body:
+                await send({"type": "http.response.body", "body": compressor.compress(body), "more_body": True})
+            else:
+                await send({"type": "http.response.body", "body": compressor.finish(body)})
+
+        await self.app(scope, receive, send_wrapper)
+
+    @staticmethod
+    def _tag_encoded(headers: List[Tuple[bytes, bytes]], encoding: str):
+        """Give the compressed variant its own ETag (see ``encoded_etag``)"""
+        for index, (name, value) in enumerate(headers):
+            if name.lower() == b"etag":
+                headers[index] = (name, encoded_etag(value.decode("latin-1"), encoding).encode("latin-1"))
+
+    @staticmethod
+    def _should_skip(message) -> bool:
+        if message["status"] in (204, 304) or message["status"] < 200:
+            return True
+        content_type = b""
+        for name, value in message.get("headers", []):
+            name = name.lower()
+            if name == b"content-encoding":
+                return True
+            if name == b"content-disposition" and value.lower().startswith(b"attachment"):
+                return True
+            if name == b"content-type":
+                content_type = value.lower()
+        content_type = content_type.decode("latin-1").split(";", 1)[0].strip()
+        if content_type.startswith(COMPRESSIBLE_IMAGES):
+            return False
+        return not content_type or content_type.startswith(INCOMPRESSIBLE_PREFIXES)
+
+    @staticmethod
+    async def _send_cached(scope, send, cached, encoding: Optional[str]):
+        content_type, variants = cached
+        body = variants.get(encoding) if encoding else None
+        headers: List[Tuple[bytes, bytes]] = [
+            (b"content-type", content_type.encode()),
+            (b"vary", b"Accept-Encoding"),
+        ]
+        if body is None:
+            body = variants["identity"]
+        else:
+            headers.append((b"content-encoding", encoding.encode()))
+        headers.append((b"content-length", str(len(body)).encode()))
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        await send({"type": "http.response.body", "body": b"" if scope["method"] == "HEAD" else body})
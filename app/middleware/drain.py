@@ -0,0 +1,29 @@
+from app.core.lifecycle import lifecycle
+
+
+class DrainMiddleware:
+    """
+    Pure ASGI in-flight request counter for the shutdown drain.
+
+    While the worker is draining, responses carry ``Connection: close`` so
+    keep-alive clients reconnect to an instance that is staying up.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and lifecycle.draining:
+                message["headers"] = [*message.get("headers", []), (b"connection", b"close")]
+            await send(message)
+
+        lifecycle.request_started()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            lifecycle.request_finished()
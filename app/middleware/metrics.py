@@ -0,0 +1,34 @@
+import time
+from app.core.metrics import HTTP_IN_FLIGHT, http_metrics
+from app.core.utils import route_template
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI request metrics: count and latency per route template and
+    status, plus an in-flight gauge.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            http_metrics.observe(scope["method"], route_template(scope), status_code, time.perf_counter() - started)
@@ -41,6 +41,10 @@ class UserInDB(UserBase):
         "arbitrary_types_allowed": True
     }
 
+    def to_public(self) -> "User":
+        """The user without credentials, for responses"""
+        return User.model_validate(self.model_dump(exclude={"hashed_password"}))
+
 class User(UserBase):
     id: Optional[PyObjectId] = Field(default=None, alias="_id")
 
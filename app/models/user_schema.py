@@ -0,0 +1,47 @@
+from typing import Any, Callable, Dict
+from app.core.utils import EPOCH
+
+# Version of the user document layout written by CRUDUser. Documents with
+# an older (or no) ``schema_version`` are upgraded when read.
+USER_SCHEMA_VERSION = 2
+
+# Lowercased copies (<field>_lower) back indexed, case-insensitive prefix search
+SEARCH_FIELDS = ("email", "first_name", "last_name")
+
+def normalized_fields(data: Dict[str, Any]) -> Dict[str, str]:
+    return {f"{field}_lower": str(data[field]).lower() for field in SEARCH_FIELDS if data.get(field)}
+
+def _v1_defaults(doc: Dict[str, Any]):
+    """Fields added after the first users were created"""
+    doc.setdefault("is_active", True)
+    doc.setdefault("is_verified", False)
+    doc.setdefault("role", "user")
+    if "created_at" not in doc:
+        oid = doc.get("_id")
+        doc["created_at"] = oid.generation_time.replace(tzinfo=None) if hasattr(oid, "generation_time") else EPOCH
+    # A stable value, so the ETag doesn't change on every read
+    doc.setdefault("updated_at", doc["created_at"])
+
+def _v2_search_fields(doc: Dict[str, Any]):
+    for field, value in normalized_fields(doc).items():
+        doc.setdefault(field, value)
+
+# UPGRADES[n] turns a version n-1 document into a version n document, in place
+UPGRADES: Dict[int, Callable[[Dict[str, Any]], None]] = {
+    1: _v1_defaults,
+    2: _v2_search_fields,
+}
+
+def upgrade_user(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Bring ``doc`` to USER_SCHEMA_VERSION in place. Returns the fields that
+    changed (including ``schema_version``), empty if it was current.
+    """
+    version = doc.get("schema_version", 0)
+    if version >= USER_SCHEMA_VERSION:
+        return {}
+    before = dict(doc)
+    for step in range(version + 1, USER_SCHEMA_VERSION + 1):
+        UPGRADES[step](doc)
+    doc["schema_version"] = USER_SCHEMA_VERSION
+    return {key: value for key, value in doc.items() if key not in before or before[key] != value}
@@ -1,7 +1,9 @@
 from typing import List, Optional, Generic, TypeVar, Any
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from datetime import datetime
 from bson import ObjectId
+from app.core.config import settings
+from app.models.enums import UserRole
 
 class AdminUserResponse(BaseModel):
     id: str = Field(..., alias="_id")
@@ -16,7 +18,7 @@ class AdminUserResponse(BaseModel):
 
     class Config:
         json_encoders = {ObjectId: str}
-        allow_population_by_field_name = True
+        populate_by_name = True
         json_schema_extra = {
             "example": {
                 "id": "507f1f77bcf86cd799439011",
@@ -58,3 +60,35 @@ class AdminUserListResponse(BaseModel):
                 "limit": 10
             }
         }
+
+
+class BulkUserFilter(BaseModel):
+    """Selects users the same way as the admin user search filters"""
+    role: Optional[UserRole] = None
+    is_active: Optional[bool] = None
+    created_from: Optional[datetime] = None
+    created_to: Optional[datetime] = None
+
+    @model_validator(mode="after")
+    def check_not_empty(self):
+        # An empty filter would select every user
+        if all(value is None for value in (self.role, self.is_active, self.created_from, self.created_to)):
+            raise ValueError("Filter needs at least one criterion")
+        return self
+
+class BulkUserSelection(BaseModel):
+    """Target either an explicit id list or every user matching a filter"""
+    user_ids: Optional[List[str]] = Field(default=None, max_length=settings.ADMIN_BULK_MAX_USERS)
+    filter: Optional[BulkUserFilter] = None
+
+    @model_validator(mode="after")
+    def check_selection(self):
+        if bool(self.user_ids) == (self.filter is not None):
+            raise ValueError("Provide either user_ids or filter")
+        return self
+
+class BulkRoleUpdate(BulkUserSelection):
+    role: UserRole
+
+class BulkActivationUpdate(BulkUserSelection):
+    is_active: bool
@@ -0,0 +1,13 @@
+from pydantic import BaseModel, model_validator
+from typing import List, Optional
+
+class ArchiveRequest(BaseModel):
+    file_ids: Optional[List[str]] = None
+    folder: Optional[str] = None
+    archive_name: Optional[str] = None
+
+    @model_validator(mode="after")
+    def check_source(self):
+        if bool(self.file_ids) == bool(self.folder):
+            raise ValueError("Provide either file_ids or folder")
+        return self
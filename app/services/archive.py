@@ -0,0 +1,165 @@
+import asyncio
+import os
+import posixpath
+import zipfile
+from collections import deque
+from dataclasses import dataclass
+from datetime import datetime
+from typing import AsyncIterator, Deque, Iterable, List, Optional, Set, Tuple
+from app.core.config import settings
+from app.services.storage import storage
+
+# Content types that are already compressed; deflating them again burns CPU
+# for (at best) a few bytes, so they are written with ZIP_STORED.
+COMPRESSED_CONTENT_TYPES = {
+    "application/zip",
+    "application/gzip",
+    "application/x-gzip",
+    "application/x-7z-compressed",
+    "application/x-rar-compressed",
+    "application/x-bzip2",
+    "application/x-xz",
+    "application/zstd",
+    "application/pdf",
+    "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "application/vnd.openxmlformats-officedocument.presentationml.presentation",
+}
+COMPRESSED_CONTENT_PREFIXES = ("image/", "video/", "audio/")
+UNCOMPRESSED_IMAGE_TYPES = {"image/svg+xml", "image/bmp", "image/x-ms-bmp", "image/tiff"}
+
+
+@dataclass
+class ArchiveEntry:
+    file_id: str
+    arcname: str
+    content_type: str
+    size: int
+    last_modified: Optional[datetime] = None
+
+
+def is_compressed_type(content_type: Optional[str]) -> bool:
+    content_type = (content_type or "").split(";", 1)[0].strip().lower()
+    if content_type in UNCOMPRESSED_IMAGE_TYPES:
+        return False
+    return content_type in COMPRESSED_CONTENT_TYPES or content_type.startswith(COMPRESSED_CONTENT_PREFIXES)
+
+
+def _unique_name(name: str, used: Set[str]) -> str:
+    if name not in used:
+        used.add(name)
+        return name
+    base, ext = posixpath.splitext(name)
+    counter = 1
+    while f"{base} ({counter}){ext}" in used:
+        counter += 1
+    unique = f"{base} ({counter}){ext}"
+    used.add(unique)
+    return unique
+
+
+def build_entries(blobs: Iterable, folder: Optional[str] = None) -> List[ArchiveEntry]:
+    """
+    Turn blob properties into archive entries.
+
+    Files are named after their original filename; in folder mode the path
+    relative to the folder is kept. Clashing names get a " (n)" suffix.
+    """
+    used: Set[str] = set()
+    entries = []
+    for blob in blobs:
+        metadata = blob.metadata or {}
+        name = metadata.get("original_filename") or os.path.basename(blob.name)
+        if folder:
+            relative_dir = posixpath.dirname(blob.name[len(folder.rstrip("/")) + 1:])
+            name = posixpath.join(relative_dir, name) if relative_dir else name
+        entries.append(ArchiveEntry(
+            file_id=blob.name,
+            arcname=_unique_name(name.lstrip("/"), used),
+            content_type=blob.content_settings.content_type or "application/octet-stream",
+            size=blob.size,
+            last_modified=blob.last_modified,
+        ))
+    return entries
+
+
+class _ZipSink:
+    """Write-only, unseekable file object that buffers until drained."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+async def _prefetch(file_id: str, queue: asyncio.Queue):
+    try:
+        async for chunk in storage.iter_file_chunks(file_id):
+            await queue.put(chunk)
+        await queue.put(None)
+    except Exception as e:
+        await queue.put(e)
+
+
+async def stream_zip(entries: List[ArchiveEntry]) -> AsyncIterator[bytes]:
+    """
+    Stream a ZIP64 archive of the given blobs.
+
+    Because the sink is unseekable, zipfile writes each member with a data
+    descriptor, so nothing has to be rewritten once a member is complete.
+    Up to ARCHIVE_PREFETCH_FILES blobs are downloaded ahead of the writer,
+    each through a queue of ARCHIVE_PREFETCH_CHUNKS chunks, which bounds
+    memory regardless of the archive size.
+    """
+    sink = _ZipSink()
+    pending: Deque[Tuple[ArchiveEntry, asyncio.Queue, asyncio.Task]] = deque()
+    remaining = deque(entries)
+
+    def fill_window():
+        while remaining and len(pending) < settings.ARCHIVE_PREFETCH_FILES:
+            entry = remaining.popleft()
+            queue = asyncio.Queue(maxsize=settings.ARCHIVE_PREFETCH_CHUNKS)
+            pending.append((entry, queue, asyncio.create_task(_prefetch(entry.file_id, queue))))
+
+    try:
+        with zipfile.ZipFile(sink, mode="w", allowZip64=True) as archive:
+            fill_window()
+            while pending:
+                entry, queue, _ = pending[0]
+
+                zinfo = zipfile.ZipInfo(entry.arcname, date_time=(entry.last_modified or datetime.utcnow()).timetuple()[:6])
+                zinfo.compress_type = zipfile.ZIP_STORED if is_compressed_type(entry.content_type) else zipfile.ZIP_DEFLATED
+                zinfo.file_size = entry.size
+
+                with archive.open(zinfo, mode="w", force_zip64=True) as member:
+                    while True:
+                        chunk = await queue.get()
+                        if chunk is None:
+                            break
+                        if isinstance(chunk, Exception):
+                            raise chunk
+                        member.write(chunk)
+                        data = sink.drain()
+                        if data:
+                            yield data
+                # Flushes the compressor tail and the data descriptor
+                data = sink.drain()
+                if data:
+                    yield data
+                pending.popleft()
+                fill_window()
+        # Central directory and ZIP64 end records are written on close
+        yield sink.drain()
+    finally:
+        for _, _, task in pending:
+            task.cancel()
@@ -0,0 +1,42 @@
+import asyncio
+import logging
+import os
+import socket
+from datetime import timedelta
+from typing import Any, Awaitable, Callable
+from app.core.config import settings
+from app.crud.crud_lease import lease
+
+logger = logging.getLogger(__name__)
+
+
+async def run_periodic(name: str, interval: int, job: Callable[[], Awaitable[Any]]):
+    """
+    Run ``job`` about every ``interval`` seconds across all workers.
+
+    Every PERIODIC_JOB_POLL_INTERVAL seconds each worker asks the ``name``
+    lease whether the job is due; the last successful run is stored on the
+    lease, so a worker started (or recycled) long after the previous run
+    picks an overdue job up instead of waiting a full interval. A failed
+    run is retried at the next poll.
+    """
+    holder = f"{socket.gethostname()}:{os.getpid()}"
+    ttl = timedelta(seconds=settings.PERIODIC_JOB_LEASE_TTL)
+    while True:
+        try:
+            if await lease.acquire_due(name, holder, timedelta(seconds=interval), ttl):
+                succeeded = False
+                try:
+                    await job()
+                    succeeded = True
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    logger.error(f"Periodic job {name} failed: {str(e)}", exc_info=True)
+                finally:
+                    await asyncio.shield(lease.complete(name, holder, succeeded))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"Scheduling periodic job {name} failed: {str(e)}")
+        await asyncio.sleep(settings.PERIODIC_JOB_POLL_INTERVAL)
@@ -0,0 +1,256 @@
+import asyncio
+import base64
+import hashlib
+import io
+import logging
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+from azure.core.exceptions import ResourceNotFoundError
+from app.core.config import settings
+from app.core.metrics import POST_PROCESSING_JOBS, POST_PROCESSING_QUEUE_DEPTH
+from app.services.storage import storage
+
+try:
+    import magic
+except ImportError:  # libmagic is not available on every platform
+    magic = None
+
+try:
+    from PIL import Image
+except ImportError:  # thumbnails are skipped without Pillow
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+VARIANTS_PREFIX = "_variants"
+THUMBNAIL_SOURCE_TYPES = {"image/jpeg", "image/png", "image/gif", "image/webp", "image/bmp", "image/tiff"}
+
+
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def analyze_content(path: str, declared_type: str, sizes: List[int]) -> Dict[str, Any]:
+    """
+    CPU-bound analysis of an uploaded file spooled to ``path``, run in a
+    worker process.
+
+    Returns the sniffed MIME type, size, checksums and, for images, JPEG
+    variants whose longest side is at most each of ``sizes`` pixels. The
+    file is read in blocks; only image decoding needs the whole picture.
+    """
+    sha256 = hashlib.sha256()
+    md5 = hashlib.md5()
+    size = 0
+    with open(path, "rb") as f:
+        head = f.read(8192)
+        block = head
+        while block:
+            sha256.update(block)
+            md5.update(block)
+            size += len(block)
+            block = f.read(HASH_BLOCK_SIZE)
+    result = {
+        "detected_content_type": magic.from_buffer(head, mime=True) if magic else declared_type,
+        "size": size,
+        "sha256": sha256.hexdigest(),
+        "md5": md5.digest(),
+        "variants": [],
+    }
+    if Image is None or result["detected_content_type"] not in THUMBNAIL_SOURCE_TYPES:
+        return result
+
+    try:
+        with Image.open(path) as image:
+            image = image.convert("RGB")
+            for size in sorted(sizes):
+                if max(image.size) <= size:
+                    continue
+                variant = image.copy()
+                variant.thumbnail((size, size))
+                buffer = io.BytesIO()
+                variant.save(buffer, format="JPEG", quality=85, optimize=True)
+                result["variants"].append({"name": f"{size}.jpg", "size": size, "data": buffer.getvalue()})
+    except Exception as e:
+        result["variant_error"] = str(e)
+    return result
+
+
+class PostProcessingPipeline:
+    """
+    Post-upload processing queue.
+
+    Uploads enqueue their file id once the response has been sent; a few
+    asyncio workers stream the blob to a temporary file and hand its path
+    to a process pool for the CPU-heavy part, then store the results as blob metadata and derived
+    blobs under ``_variants/<file_id>/``.
+    """
+
+    def __init__(self):
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: List[asyncio.Task] = []
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self.in_progress = 0
+        self.processed = 0
+        self.failed = 0
+        self.dropped = 0
+
+    async def start(self):
+        self._queue = asyncio.Queue(maxsize=settings.POST_PROCESSING_QUEUE_SIZE)
+        self._executor = ProcessPoolExecutor(max_workers=settings.POST_PROCESSING_PROCESSES)
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"post-processing-{i}")
+            for i in range(settings.POST_PROCESSING_WORKERS)
+        ]
+
+    async def stop(self):
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        if self._executor:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def drain(self, timeout: float) -> bool:
+        """Wait for queued jobs to finish; False if ``timeout`` ran out first."""
+        if self._queue is None:
+            return True
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=max(0.0, timeout))
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def enqueue(self, file_id: str) -> bool:
+        if self._queue is None:
+            return False
+        try:
+            self._queue.put_nowait(file_id)
+            POST_PROCESSING_QUEUE_DEPTH.inc()
+            return True
+        except asyncio.QueueFull:
+            self.dropped += 1
+            POST_PROCESSING_JOBS.labels("dropped").inc()
+            logger.warning(f"Post-processing queue full, skipping {file_id}")
+            return False
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "queue_capacity": settings.POST_PROCESSING_QUEUE_SIZE,
+            "in_progress": self.in_progress,
+            "processed": self.processed,
+            "failed": self.failed,
+            "dropped": self.dropped,
+        }
+
+    async def _worker(self):
+        while True:
+            file_id = await self._queue.get()
+            POST_PROCESSING_QUEUE_DEPTH.dec()
+            self.in_progress += 1
+            try:
+                await self.process(file_id)
+                self.processed += 1
+                POST_PROCESSING_JOBS.labels("processed").inc()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.failed += 1
+                POST_PROCESSING_JOBS.labels("failed").inc()
+                logger.error(f"Post-processing failed for {file_id}: {str(e)}", exc_info=True)
+            finally:
+                self.in_progress -= 1
+                self._queue.task_done()
+
+    async def process(self, file_id: str):
+        properties = await storage.get_properties(file_id)
+        if properties is None:
+            return
+        declared_type = properties.content_settings.content_type or "application/octet-stream"
+
+        path = await self._spool(file_id)
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(
+                self._executor, analyze_content, path, declared_type, settings.THUMBNAIL_SIZES
+            )
+        finally:
+            await asyncio.to_thread(os.unlink, path)
+
+        # Azure stores Content-MD5 for single-shot uploads; compare against it
+        stored_md5 = properties.content_settings.content_md5
+        if result["size"] != properties.size or (stored_md5 and bytes(stored_md5) != result["md5"]):
+            checksum_status = "mismatch"
+            logger.warning(f"Checksum mismatch for {file_id}")
+        else:
+            checksum_status = "verified" if stored_md5 else "unverified"
+
+        variant_names = []
+        # Variants carry the owner tag too, so account cleanup removes them
+        owner = properties.metadata.get("uploaded_by")
+        owner_tags = {"uploaded_by": owner} if owner else None
+        for variant in result["variants"]:
+            variant_id = f"{VARIANTS_PREFIX}/{file_id}/{variant['name']}"
+            await storage.put_derived(
+                variant_id,
+                variant["data"],
+                content_type="image/jpeg",
+                metadata={"variant_of": file_id, "max_side": str(variant["size"])},
+                tags=owner_tags,
+            )
+            variant_names.append(variant_id)
+
+        metadata = dict(properties.metadata)
+        metadata.update({
+            "detected_content_type": result["detected_content_type"],
+            "content_type_mismatch": str(result["detected_content_type"] != declared_type.split(";")[0].strip()).lower(),
+            "sha256": result["sha256"],
+            "md5": base64.b64encode(result["md5"]).decode(),
+            "checksum_status": checksum_status,
+            "variants": ",".join(variant_names),
+            "processed_at": datetime.utcnow().isoformat(),
+        })
+        try:
+            await storage.set_metadata(file_id, metadata)
+        except ResourceNotFoundError:
+            # Deleted while it was being processed; nothing lists these variants now
+            await self.delete_variants(metadata)
+            raise
+
+    @staticmethod
+    async def delete_variants(metadata: Dict[str, str]):
+        """Delete the derived blobs listed in a file's ``variants`` metadata"""
+        variant_ids = [variant_id for variant_id in metadata.get("variants", "").split(",") if variant_id]
+        if not variant_ids:
+            return
+        try:
+            failed = await storage.delete_batch(variant_ids)
+        except Exception as e:
+            failed = variant_ids
+            logger.warning(f"Deleting variants failed: {str(e)}")
+        if failed:
+            logger.warning(f"Variants left behind: {', '.join(failed)}")
+
+    @staticmethod
+    async def _spool(file_id: str) -> str:
+        """Download a blob chunk by chunk into a temporary file; returns its path"""
+        f = await asyncio.to_thread(
+            tempfile.NamedTemporaryFile, dir=settings.POST_PROCESSING_TEMP_DIR, prefix="post-processing-", delete=False
+        )
+        try:
+            async for chunk in storage.iter_file_chunks(file_id):
+                await asyncio.to_thread(f.write, chunk)
+        except BaseException:
+            await asyncio.to_thread(f.close)
+            await asyncio.to_thread(os.unlink, f.name)
+            raise
+        await asyncio.to_thread(f.close)
+        return f.name
+
+
+# Create a singleton instance
+post_processing = PostProcessingPipeline()
@@ -0,0 +1,71 @@
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Optional
+from app.core.config import settings
+from app.db.session import Database
+from app.services.storage import storage
+
+
+async def check_mongo():
+    await Database.db.command("ping", maxTimeMS=int(settings.READINESS_CHECK_TIMEOUT * 1000))
+
+
+async def check_storage():
+    await asyncio.to_thread(
+        storage.container_client.get_container_properties,
+        timeout=max(1, int(settings.READINESS_CHECK_TIMEOUT)),
+    )
+
+
+class ReadinessChecker:
+    """
+    Runs every dependency check concurrently, each bounded by
+    READINESS_CHECK_TIMEOUT, and caches the combined result for
+    READINESS_CACHE_TTL seconds. Concurrent probes during a refresh share
+    the same in-flight run instead of piling up on a slow dependency.
+    """
+
+    def __init__(self, checks: Dict[str, Callable[[], Awaitable[Any]]]):
+        self.checks = checks
+        self._result: Optional[Dict[str, Any]] = None
+        self._expires_at = 0.0
+        self._refresh: Optional[asyncio.Task] = None
+
+    async def check(self) -> Dict[str, Any]:
+        if self._result is not None and time.monotonic() < self._expires_at:
+            return {**self._result, "cached": True}
+        if self._refresh is None or self._refresh.done():
+            self._refresh = asyncio.create_task(self._run_checks())
+        # Shielded so a probe that disconnects does not cancel the shared run
+        return {**await asyncio.shield(self._refresh), "cached": False}
+
+    async def _run_checks(self) -> Dict[str, Any]:
+        names = list(self.checks)
+        outcomes = await asyncio.gather(*(self._run_one(self.checks[name]) for name in names))
+        checks = dict(zip(names, outcomes))
+        result = {
+            "ready": all(outcome["status"] == "ok" for outcome in outcomes),
+            "checks": checks,
+            "checked_at": datetime.utcnow().isoformat() + "Z",
+        }
+        self._result = result
+        self._expires_at = time.monotonic() + settings.READINESS_CACHE_TTL
+        return result
+
+    @staticmethod
+    async def _run_one(check: Callable[[], Awaitable[Any]]) -> Dict[str, Any]:
+        started = time.perf_counter()
+        outcome: Dict[str, Any] = {"status": "ok"}
+        try:
+            await asyncio.wait_for(check(), timeout=settings.READINESS_CHECK_TIMEOUT)
+        except asyncio.TimeoutError:
+            outcome = {"status": "timeout"}
+        except Exception as e:
+            outcome = {"status": "error", "error": str(e)}
+        outcome["latency_ms"] = round((time.perf_counter() - started) * 1000, 2)
+        return outcome
+
+
+# Create a singleton instance
+readiness = ReadinessChecker({"mongodb": check_mongo, "storage": check_storage})
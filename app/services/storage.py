@@ -1,9 +1,13 @@
 import os
+import asyncio
 from datetime import datetime, timedelta
-from typing import Optional, BinaryIO, Dict, Any
-from azure.storage.blob import BlobServiceClient, BlobSasPermissions, generate_blob_sas
+from typing import Optional, BinaryIO, Dict, Any, List, AsyncIterator, Tuple
+from azure.storage.blob import BlobServiceClient, BlobProperties, BlobSasPermissions, ContentSettings, generate_blob_sas
 from azure.core.exceptions import ResourceExistsError, ResourceNotFoundError
 from app.core.config import settings
+from app.core.metrics import azure_request_hook, azure_response_hook
+from app.core.singleflight import SingleFlight
+from app.core.utils import from_millis, to_millis
 
 class AzureBlobStorage:
     def __init__(self):
@@ -14,8 +18,15 @@ class AzureBlobStorage:
             f"EndpointSuffix=core.windows.net"
         )
         self.container_name = settings.AZURE_STORAGE_CONTAINER
-        self.blob_service_client = BlobServiceClient.from_connection_string(self.connection_string)
+        self.blob_service_client = BlobServiceClient.from_connection_string(
+            self.connection_string,
+            max_single_get_size=settings.STORAGE_DOWNLOAD_CHUNK_SIZE,
+            max_chunk_get_size=settings.STORAGE_DOWNLOAD_CHUNK_SIZE,
+            raw_request_hook=azure_request_hook,
+            raw_response_hook=azure_response_hook,
+        )
         self.container_client = self.blob_service_client.get_container_client(self.container_name)
+        self._properties_flight = SingleFlight("blob_properties")
         
         # Create container if it doesn't exist
         try:
@@ -29,10 +40,11 @@ class AzureBlobStorage:
         filename: str,
         content_type: str,
         folder: Optional[str] = None,
-        metadata: Optional[Dict[str, str]] = None
+        metadata: Optional[Dict[str, str]] = None,
+        tags: Optional[Dict[str, str]] = None
     ) -> Dict[str, Any]:
         """
-        Upload a file to Azure Blob Storage
+        Upload a file to Azure Blob Storage; ``tags`` become blob index tags
         """
         # Generate a unique filename to avoid collisions
         file_extension = os.path.splitext(filename)[1].lower()
@@ -61,6 +73,7 @@ class AzureBlobStorage:
             file_data,
             content_type=content_type,
             metadata=blob_metadata,
+            tags=tags,
             overwrite=True
         )
         
@@ -103,33 +116,186 @@ class AzureBlobStorage:
         """
         Get information about a file
         """
+        properties = await self.get_properties(file_id)
+        if properties is None:
+            return None
+        return self.describe_file(file_id, properties)
+
+    @staticmethod
+    def sas_expiry(now: Optional[datetime] = None) -> datetime:
+        """
+        Expiry for file info SAS URLs signed at ``now``: SAS_URL_TTL after
+        the end of the current SAS_URL_WINDOW, so every request in a window
+        gets the same URL.
+        """
+        window = settings.SAS_URL_WINDOW * 1000
+        millis = to_millis(now or datetime.utcnow())
+        return from_millis(millis - millis % window + window) + timedelta(seconds=settings.SAS_URL_TTL)
+
+    def describe_file(
+        self, file_id: str, properties: BlobProperties, expiry: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        """
+        Build the file info payload, including a SAS URL valid until
+        ``expiry`` (default ``sas_expiry()``), from blob properties
+        """
+        sas_token = generate_blob_sas(
+            account_name=settings.AZURE_STORAGE_ACCOUNT_NAME,
+            account_key=settings.AZURE_STORAGE_ACCOUNT_KEY,
+            container_name=self.container_name,
+            blob_name=file_id,
+            permission=BlobSasPermissions(read=True),
+            expiry=expiry or self.sas_expiry()
+        )
+        
+        return {
+            "file_id": file_id,
+            "filename": os.path.basename(file_id),
+            "original_filename": properties.metadata.get("original_filename", ""),
+            "url": f"https://{settings.AZURE_STORAGE_ACCOUNT_NAME}.blob.core.windows.net/{self.container_name}/{file_id}?{sas_token}",
+            "content_type": properties.content_settings.content_type,
+            "size": properties.size,
+            "etag": properties.etag,
+            "created_at": properties.creation_time,
+            "last_modified": properties.last_modified,
+            "metadata": dict(properties.metadata)
+        }
+
+    async def get_properties(self, file_id: str) -> Optional[BlobProperties]:
+        """
+        Get the raw blob properties (size, content settings, metadata) of a file
+        """
+        blob_client = self.container_client.get_blob_client(file_id)
         try:
-            blob_client = self.container_client.get_blob_client(file_id)
-            properties = blob_client.get_blob_properties()
-            
-            # Generate a SAS URL for the file (valid for 1 hour)
-            sas_token = generate_blob_sas(
-                account_name=settings.AZURE_STORAGE_ACCOUNT_NAME,
-                account_key=settings.AZURE_STORAGE_ACCOUNT_KEY,
-                container_name=self.container_name,
-                blob_name=file_id,
-                permission=BlobSasPermissions(read=True),
-                expiry=datetime.utcnow() + timedelta(hours=1)
+            # Concurrent lookups of the same blob share one Azure request
+            return await self._properties_flight.do(
+                file_id, lambda: asyncio.to_thread(blob_client.get_blob_properties)
             )
-            
-            return {
-                "file_id": file_id,
-                "filename": os.path.basename(file_id),
-                "original_filename": properties.metadata.get("original_filename", ""),
-                "url": f"https://{settings.AZURE_STORAGE_ACCOUNT_NAME}.blob.core.windows.net/{self.container_name}/{file_id}?{sas_token}",
-                "content_type": properties.content_settings.content_type,
-                "size": properties.size,
-                "created_at": properties.creation_time.isoformat() if properties.creation_time else None,
-                "last_modified": properties.last_modified.isoformat() if properties.last_modified else None,
-                "metadata": dict(properties.metadata)
-            }
         except ResourceNotFoundError:
             return None
 
+    async def list_folder(self, folder: str) -> List[BlobProperties]:
+        """
+        List the blobs under a folder, including their metadata
+        """
+        prefix = folder.rstrip("/") + "/"
+        return await asyncio.to_thread(
+            lambda: list(self.container_client.list_blobs(name_starts_with=prefix, include=["metadata"]))
+        )
+
+    async def put_derived(
+        self,
+        file_id: str,
+        data: bytes,
+        content_type: str,
+        metadata: Optional[Dict[str, str]] = None,
+        tags: Optional[Dict[str, str]] = None
+    ):
+        """
+        Store a blob derived from an upload (e.g. a thumbnail) at a fixed path
+        """
+        blob_client = self.container_client.get_blob_client(file_id)
+        await asyncio.to_thread(
+            blob_client.upload_blob,
+            data,
+            content_settings=ContentSettings(content_type=content_type),
+            metadata=metadata,
+            tags=tags,
+            overwrite=True,
+        )
+
+    async def set_metadata(self, file_id: str, metadata: Dict[str, str]):
+        """
+        Replace a blob's metadata
+        """
+        blob_client = self.container_client.get_blob_client(file_id)
+        await asyncio.to_thread(blob_client.set_blob_metadata, metadata)
+
+    async def iter_blob_pages(self, page_size: int, prefix: Optional[str] = None) -> AsyncIterator[List[BlobProperties]]:
+        """
+        Walk the container one listing page (with metadata) at a time
+        """
+        pages = self.container_client.list_blobs(
+            name_starts_with=prefix, include=["metadata"], results_per_page=page_size
+        ).by_page()
+        while True:
+            page = await asyncio.to_thread(next, pages, None)
+            if page is None:
+                break
+            blobs = list(page)
+            if blobs:
+                yield blobs
+
+    async def find_page_by_tag(
+        self, key: str, value: str, page_size: int, continuation_token: Optional[str] = None
+    ) -> Tuple[List[str], Optional[str]]:
+        """
+        One page of blob names whose index tag ``key`` equals ``value``, and
+        the token of the next page (None when done)
+        """
+        expression = f"\"{key}\" = '{value}'"
+
+        def fetch():
+            pager = self.container_client.find_blobs_by_tags(expression, results_per_page=page_size) \
+                .by_page(continuation_token=continuation_token)
+            page = next(pager, None)
+            return [blob.name for blob in page or []], pager.continuation_token
+
+        return await asyncio.to_thread(fetch)
+
+    async def list_page(
+        self, page_size: int, continuation_token: Optional[str] = None, prefix: Optional[str] = None
+    ) -> Tuple[List[BlobProperties], Optional[str]]:
+        """
+        One listing page (with metadata) and the token of the next page
+        """
+        def fetch():
+            pager = self.container_client.list_blobs(
+                name_starts_with=prefix, include=["metadata"], results_per_page=page_size
+            ).by_page(continuation_token=continuation_token)
+            page = next(pager, None)
+            return list(page or []), pager.continuation_token
+
+        return await asyncio.to_thread(fetch)
+
+    async def delete_batch(self, file_ids: List[str]) -> List[str]:
+        """
+        Delete up to 256 blobs (with their snapshots) in one Blob Batch
+        request; returns the ids that could not be deleted
+        """
+        def delete():
+            responses = self.container_client.delete_blobs(
+                *file_ids, delete_snapshots="include", raise_on_any_failure=False
+            )
+            # Already gone counts as deleted
+            return [
+                file_id for file_id, response in zip(file_ids, responses)
+                if response.status_code not in (202, 404)
+            ]
+
+        return await asyncio.to_thread(delete)
+
+    async def iter_file_chunks(self, file_id: str) -> AsyncIterator[bytes]:
+        """
+        Stream a blob's content in STORAGE_DOWNLOAD_CHUNK_SIZE chunks.
+
+        The SDK client is synchronous, so every ranged GET runs in a worker
+        thread and only one chunk is held in memory at a time.
+        """
+        blob_client = self.container_client.get_blob_client(file_id)
+        downloader = await asyncio.to_thread(blob_client.download_blob, max_concurrency=1)
+        chunks = downloader.chunks()
+        while True:
+            chunk = await asyncio.to_thread(next, chunks, None)
+            if chunk is None:
+                break
+            yield chunk
+
+    def close(self):
+        """
+        Close the underlying HTTP transport
+        """
+        self.blob_service_client.close()
+
 # Create a singleton instance
 storage = AzureBlobStorage()
@@ -0,0 +1,64 @@
+import logging
+import posixpath
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Any, Optional
+from app.core.config import settings
+from app.crud.crud_storage_usage import storage_usage, user_key, folder_key
+from app.services.storage import storage
+from app.services.periodic import run_periodic
+
+logger = logging.getLogger(__name__)
+
+LEASE_NAME = "storage_usage_reconcile"
+
+
+def folder_of(file_id: str) -> str:
+    return posixpath.dirname(file_id)
+
+
+def quota_for(role: Optional[str]) -> int:
+    """Storage quota in bytes for a role; 0 means unlimited."""
+    return settings.STORAGE_QUOTAS_BY_ROLE.get(role, settings.STORAGE_QUOTA_BYTES)
+
+
+async def reconcile_storage_usage(batch_size: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Recompute every counter from the blob inventory.
+
+    The container is listed one page at a time and only per-user/per-folder
+    sums are kept in memory; corrections are then written in bulk batches.
+    """
+    batch_size = batch_size or settings.STORAGE_USAGE_RECONCILE_BATCH_SIZE
+    started_at = datetime.utcnow()
+    totals: Dict[str, Dict[str, Any]] = defaultdict(lambda: {"bytes": 0, "objects": 0})
+    scanned = 0
+
+    async for page in storage.iter_blob_pages(batch_size):
+        for blob in page:
+            scanned += 1
+            user_id = (blob.metadata or {}).get("uploaded_by")
+            if not user_id:
+                continue
+            folder = folder_of(blob.name)
+            for key, extra in (
+                (user_key(user_id), {"user_id": user_id, "kind": "user"}),
+                (folder_key(user_id, folder), {"user_id": user_id, "kind": "folder", "folder": folder}),
+            ):
+                counter = totals[key]
+                counter.update(extra)
+                counter["bytes"] += blob.size
+                counter["objects"] += 1
+
+    corrected = await storage_usage.apply_snapshot(dict(totals), started_at, batch_size)
+    result = {"blobs_scanned": scanned, "counters": len(totals), "corrected": corrected}
+    logger.info(f"Storage usage reconciled: {result}")
+    return result
+
+
+async def run_periodic_reconciliation():
+    """
+    Reconcile every STORAGE_USAGE_RECONCILE_INTERVAL seconds, in one worker
+    at a time; see ``run_periodic``.
+    """
+    await run_periodic(LEASE_NAME, settings.STORAGE_USAGE_RECONCILE_INTERVAL, reconcile_storage_usage)
@@ -0,0 +1,119 @@
+import asyncio
+import logging
+import os
+import platform
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+import psutil
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class SystemMonitor:
+    """
+    Background resource sampler for /health/system.
+
+    Every SYSTEM_SAMPLE_INTERVAL seconds a sample of CPU, memory, file
+    descriptors, connections and disk is taken in a worker thread, and the
+    event-loop lag is measured as the sleep overshoot. The endpoint only
+    returns the latest snapshot. CPU percentages are psutil's non-blocking
+    form, i.e. usage since the previous sample.
+    """
+
+    def __init__(self):
+        self._process: Optional[psutil.Process] = None
+        self._static: Dict[str, Any] = {}
+        self._task: Optional[asyncio.Task] = None
+        self._snapshot: Dict[str, Any] = {}
+        self._loop_lag_ms = 0.0
+        self._loop_lag_max_ms = 0.0
+
+    async def start(self):
+        # Bound to the serving process, so this runs after any fork
+        self._process = psutil.Process()
+        self._static = {
+            "os": {
+                "system": platform.system(),
+                "release": platform.release(),
+                "version": platform.version(),
+                "machine": platform.machine(),
+                "processor": platform.processor(),
+                "python_version": platform.python_version()
+            },
+            "process": {
+                "pid": os.getpid(),
+                "name": self._process.name(),
+                "create_time": datetime.fromtimestamp(self._process.create_time()).isoformat(),
+            },
+        }
+
+        # Prime the CPU counters so the first interval has a baseline
+        psutil.cpu_percent(interval=None)
+        self._process.cpu_percent(interval=None)
+        await self._refresh()
+        self._task = asyncio.create_task(self._run(), name="system-monitor")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        return self._snapshot
+
+    async def _run(self):
+        interval = settings.SYSTEM_SAMPLE_INTERVAL
+        while True:
+            expected = time.monotonic() + interval
+            await asyncio.sleep(interval)
+            lag_ms = max(0.0, (time.monotonic() - expected) * 1000)
+            self._loop_lag_ms = lag_ms
+            self._loop_lag_max_ms = max(self._loop_lag_max_ms, lag_ms)
+            try:
+                await self._refresh()
+            except Exception as e:
+                logger.warning(f"System sample failed: {str(e)}")
+
+    async def _refresh(self):
+        sample = await asyncio.to_thread(self._sample)
+        sample["event_loop"] = {
+            "lag_ms": round(self._loop_lag_ms, 3),
+            "lag_max_ms": round(self._loop_lag_max_ms, 3),
+            "tasks": len(asyncio.all_tasks()),
+        }
+        sample["sampled_at"] = datetime.utcnow().isoformat() + "Z"
+        self._snapshot = sample
+
+    def _sample(self) -> Dict[str, Any]:
+        process = self._process
+        memory = psutil.virtual_memory()
+        with process.oneshot():
+            connections: List = getattr(process, "net_connections", process.connections)()
+            process_info = {
+                **self._static["process"],
+                "status": process.status(),
+                "cpu_percent": process.cpu_percent(interval=None),
+                "memory_info": process.memory_info()._asdict(),
+                "num_threads": process.num_threads(),
+                "open_fds": process.num_fds() if hasattr(process, "num_fds") else process.num_handles(),
+                "connections": len(connections),
+            }
+        return {
+            "os": self._static["os"],
+            "resources": {
+                "cpu_percent": psutil.cpu_percent(interval=None),
+                "cpu_count": psutil.cpu_count(),
+                "memory_total": memory.total,
+                "memory_available": memory.available,
+                "memory_percent": memory.percent,
+                "disk_usage": psutil.disk_usage('/')._asdict()
+            },
+            "process": process_info,
+        }
+
+
+# Create a singleton instance
+system_monitor = SystemMonitor()
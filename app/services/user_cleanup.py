@@ -0,0 +1,177 @@
+import asyncio
+import logging
+import os
+import socket
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+from azure.core.exceptions import HttpResponseError
+from app.core.config import settings
+from app.crud.crud_cleanup_job import cleanup_job
+from app.crud.crud_storage_usage import storage_usage
+from app.services.storage import storage
+
+logger = logging.getLogger(__name__)
+
+OWNER_TAG = "uploaded_by"
+
+
+class _LeaseLost(Exception):
+    pass
+
+
+class UserCleanupWorker:
+    """
+    Deletes the blobs of deleted users in the background.
+
+    Deleting a user only enqueues a job (see ``CRUDCleanupJob``); this
+    worker claims jobs and removes the user's blobs in Blob Batch requests
+    of USER_CLEANUP_BATCH_SIZE, paced to USER_CLEANUP_BATCHES_PER_SECOND.
+    Blobs are found through the ``uploaded_by`` index tag and, with
+    USER_CLEANUP_SCAN_METADATA (or when tag queries are unsupported), by a
+    container listing filtered on metadata, which also catches blobs
+    uploaded before tagging. Progress is checkpointed after every batch.
+    """
+
+    def __init__(self):
+        self.holder = ""
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+        self._next_batch_at = 0.0
+
+    async def start(self):
+        self.holder = f"{socket.gethostname()}:{os.getpid()}"
+        self._task = asyncio.create_task(self._run(), name="user-cleanup")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def enqueue(self, *user_ids: str):
+        await cleanup_job.enqueue_many(list(user_ids))
+        self._wakeup.set()
+
+    async def _run(self):
+        ttl = timedelta(seconds=settings.USER_CLEANUP_LEASE_TTL)
+        while True:
+            job = None
+            try:
+                job = await cleanup_job.claim(self.holder, ttl)
+            except Exception as e:
+                logger.error(f"Claiming a cleanup job failed: {str(e)}")
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=settings.USER_CLEANUP_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            try:
+                await self._run_job(job)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                # Never let one job end the loop; an unfinished job's lease expires and it is claimed again
+                logger.error(f"Blob cleanup bookkeeping for user {job['_id']} failed: {str(e)}", exc_info=True)
+
+    async def _run_job(self, job: Dict[str, Any]):
+        user_id = job["_id"]
+        if job.get("attempts", 0) >= settings.USER_CLEANUP_MAX_ATTEMPTS:
+            # Reclaimed after workers repeatedly died on it
+            await self._finish(user_id, "failed", error="Worker stopped without reporting back")
+            return
+        try:
+            await self.process(job)
+            await storage_usage.delete_user(user_id)
+        except asyncio.CancelledError:
+            # Hand the job back so the next worker resumes from the checkpoint
+            await asyncio.shield(self._finish(user_id, "pending"))
+            raise
+        except _LeaseLost:
+            logger.warning(f"Blob cleanup for user {user_id} was taken over by another worker")
+            return
+        except Exception as e:
+            logger.error(f"Blob cleanup for user {user_id} failed: {str(e)}", exc_info=True)
+            if job.get("attempts", 0) + 1 >= settings.USER_CLEANUP_MAX_ATTEMPTS:
+                await self._finish(user_id, "failed", error=str(e), failed_attempt=True)
+            else:
+                retry_at = datetime.utcnow() + timedelta(seconds=settings.USER_CLEANUP_RETRY_DELAY)
+                await self._finish(user_id, "pending", error=str(e), retry_at=retry_at, failed_attempt=True)
+            return
+        await self._finish(user_id, "done")
+        logger.info(f"Blob cleanup for user {user_id} finished")
+
+    async def _finish(self, user_id: str, status: str, **kwargs):
+        """Record the outcome; if that fails the lease expires and the job is claimed again"""
+        try:
+            await cleanup_job.finish(user_id, self.holder, status, **kwargs)
+        except Exception as e:
+            logger.error(f"Recording cleanup job {user_id} as {status} failed: {str(e)}")
+
+    async def process(self, job: Dict[str, Any]):
+        user_id = job["_id"]
+        ttl = timedelta(seconds=settings.USER_CLEANUP_LEASE_TTL)
+        phases = ["tags"] + (["metadata"] if settings.USER_CLEANUP_SCAN_METADATA else [])
+        phase = job.get("phase") or phases[0]
+        index = phases.index(phase) if phase in phases else 0
+        token = job.get("continuation_token")
+
+        while index < len(phases):
+            phase = phases[index]
+            try:
+                names, next_token = await self._find_page(phase, user_id, token)
+            except HttpResponseError as e:
+                if phase != "tags":
+                    raise
+                # e.g. accounts with a hierarchical namespace have no blob index
+                logger.warning(f"Blob tag query unavailable, scanning metadata instead: {str(e)}")
+                if "metadata" not in phases:
+                    phases.append("metadata")
+                index, token = index + 1, None
+                continue
+
+            deleted, failed = await self._delete(names)
+            if not await cleanup_job.checkpoint(user_id, self.holder, ttl, phase, next_token, deleted, failed):
+                raise _LeaseLost()
+            if next_token:
+                token = next_token
+            else:
+                index, token = index + 1, None
+
+    async def _find_page(self, phase: str, user_id: str, token: Optional[str]) -> Tuple[List[str], Optional[str]]:
+        if phase == "tags":
+            return await storage.find_page_by_tag(OWNER_TAG, user_id, settings.USER_CLEANUP_BATCH_SIZE, token)
+
+        blobs, next_token = await storage.list_page(settings.USER_CLEANUP_LIST_PAGE_SIZE, token)
+        names = []
+        for blob in blobs:
+            metadata = blob.metadata or {}
+            if metadata.get(OWNER_TAG) == user_id:
+                names.append(blob.name)
+                names.extend(variant for variant in metadata.get("variants", "").split(",") if variant)
+        return names, next_token
+
+    async def _delete(self, names: List[str]) -> Tuple[int, int]:
+        deleted = failed = 0
+        batch_size = settings.USER_CLEANUP_BATCH_SIZE
+        for start in range(0, len(names), batch_size):
+            batch = names[start:start + batch_size]
+            await self._pace()
+            failures = await storage.delete_batch(batch)
+            deleted += len(batch) - len(failures)
+            failed += len(failures)
+            for name in failures:
+                logger.warning(f"Could not delete blob {name}")
+        return deleted, failed
+
+    async def _pace(self):
+        now = time.monotonic()
+        if now < self._next_batch_at:
+            await asyncio.sleep(self._next_batch_at - now)
+        self._next_batch_at = max(now, self._next_batch_at) + 1 / settings.USER_CLEANUP_BATCHES_PER_SECOND
+
+
+# Create a singleton instance
+user_cleanup = UserCleanupWorker()
@@ -0,0 +1,69 @@
+import csv
+import io
+from datetime import datetime
+from typing import Any, AsyncIterable, AsyncIterator, Dict, Optional
+from app.core.config import settings
+from app.core.responses import dumps
+from app.crud.crud_user import user as crud_user
+
+EXPORT_FIELDS = [
+    "_id", "email", "first_name", "last_name", "role",
+    "is_active", "is_verified", "created_at", "updated_at",
+]
+EXPORT_PROJECTION = {field: 1 for field in EXPORT_FIELDS}
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+
+
+def export_cursor(query: Dict[str, Any], collection=None):
+    """
+    Cursor over the export fields of the matching users. Rows are raw
+    documents straight off the wire: no model validation per row.
+    """
+    collection = collection if collection is not None else crud_user.analytics_collection
+    return collection.find(query, EXPORT_PROJECTION, batch_size=settings.EXPORT_BATCH_SIZE)
+
+
+async def stream_ndjson(docs: AsyncIterable[Dict[str, Any]]) -> AsyncIterator[bytes]:
+    """One JSON object per line, flushed every EXPORT_FLUSH_BYTES."""
+    buffer = bytearray()
+    async for doc in docs:
+        buffer += dumps(doc)
+        buffer += b"\n"
+        if len(buffer) >= settings.EXPORT_FLUSH_BYTES:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+def _csv_value(value: Optional[Any]) -> Any:
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+async def stream_csv(docs: AsyncIterable[Dict[str, Any]]) -> AsyncIterator[bytes]:
+    """CSV with a header row, flushed every EXPORT_FLUSH_BYTES."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    async for doc in docs:
+        writer.writerow([_csv_value(doc.get(field)) for field in EXPORT_FIELDS])
+        if buffer.tell() >= settings.EXPORT_FLUSH_BYTES:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+EXPORT_STREAMS = {
+    "ndjson": stream_ndjson,
+    "csv": stream_csv,
+}
@@ -0,0 +1,28 @@
+import logging
+from typing import Any, Dict
+from app.core.config import settings
+from app.crud.crud_user import user as crud_user
+from app.crud.crud_user_stats import user_stats
+from app.services.periodic import run_periodic
+
+logger = logging.getLogger(__name__)
+
+LEASE_NAME = "user_stats_reconcile"
+
+
+async def reconcile_user_stats() -> Dict[str, Any]:
+    """
+    Rebuild the dashboard counters from ``users``. Reads the primary: a
+    lagging secondary would undo increments it has not replicated yet.
+    """
+    result = await user_stats.reconcile(crud_user.collection)
+    logger.info(f"User stats reconciled: {result}")
+    return result
+
+
+async def run_periodic_user_stats_reconciliation():
+    """
+    Reconcile every USER_STATS_RECONCILE_INTERVAL seconds, in one worker at
+    a time; see ``run_periodic``.
+    """
+    await run_periodic(LEASE_NAME, settings.USER_STATS_RECONCILE_INTERVAL, reconcile_user_stats)
@@ -0,0 +1,58 @@
+"""
+Production server configuration.
+
+    gunicorn -c gunicorn.conf.py app.main:app
+
+One uvloop/httptools worker per available core (cgroup quota aware),
+override with WEB_CONCURRENCY. The app is imported in each worker after
+fork (preload_app is off), so the MongoDB client, the Azure client and the
+post-processing pool are never shared across processes.
+
+Send SIGHUP to the master for a zero-downtime rolling restart: new workers
+are started with freshly imported code and the old ones drain gracefully.
+"""
+import glob
+import os
+
+# Every worker writes Prometheus samples here; must be set before the app imports
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/prometheus_multiproc")
+
+from app.core.metrics import mark_worker_dead  # noqa: E402
+from app.core.server import available_cpus  # noqa: E402
+
+bind = f"{os.getenv('HOST', '0.0.0.0')}:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", available_cpus()))
+worker_class = "app.core.server.ProductionWorker"
+preload_app = False
+
+# Recycle workers to contain heap fragmentation; jitter avoids synchronized restarts
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", 10000))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", 1000))
+
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 60))
+# Must cover SHUTDOWN_DRAIN_DELAY + SHUTDOWN_DRAIN_TIMEOUT plus closing clients
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", 35))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", 5))
+
+# Heartbeat files on tmpfs; a disk-backed /tmp can stall workers in containers
+worker_tmp_dir = "/dev/shm" if os.path.isdir("/dev/shm") else None
+forwarded_allow_ips = os.getenv("FORWARDED_ALLOW_IPS", "127.0.0.1")
+
+# The app writes its own structured access log
+accesslog = None
+errorlog = "-"
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
+
+
+def on_starting(server):
+    # Samples from a previous run would be aggregated into the new one
+    multiproc_dir = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    os.makedirs(multiproc_dir, exist_ok=True)
+    for path in glob.glob(os.path.join(multiproc_dir, "*.db")):
+        os.remove(path)
+    server.log.info(f"Starting {workers} workers on {bind}")
+
+
+def child_exit(server, worker):
+    # Imported at the top: this runs inside the master's SIGCHLD handler
+    mark_worker_dead(worker.pid)
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark admin user list page latency at increasing depths.
+Compares the previous path (count_documents + skip/limit) with keyset
+pagination on (created_at, _id), on a scratch collection seeded with
+synthetic users (kept between runs unless --drop is given).
+Usage: python -m scripts.bench_admin_pagination [--docs 1000100] [--limit 50] [--rounds 5]
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add the project root to the Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.core.pagination import KEYSET_SORT, encode_cursor, keyset_after
+from app.crud.crud_user import LIST_PROJECTION
+from app.db.session import Database, get_collection
+
+OFFSETS = (0, 10_000, 1_000_000)
+SEED_BATCH = 10_000
+
+async def seed(collection, docs: int):
+    existing = await collection.estimated_document_count()
+    if existing >= docs:
+        return
+    print(f"Seeding {docs - existing} users...")
+    start = datetime.utcnow() - timedelta(days=3650)
+    for base in range(existing, docs, SEED_BATCH):
+        await collection.insert_many([
+            {
+                "email": f"bench{i}@example.com",
+                "first_name": f"First{i}",
+                "last_name": f"Last{i}",
+                "is_active": i % 10 != 0,
+                "is_verified": i % 3 == 0,
+                "role": "admin" if i % 500 == 0 else "user",
+                "hashed_password": "$2b$12$" + "x" * 53,
+                # Seconds apart, with duplicates so _id has to break ties
+                "created_at": start + timedelta(seconds=i // 2),
+                "updated_at": start + timedelta(seconds=i // 2),
+            }
+            for i in range(base, min(base + SEED_BATCH, docs))
+        ], ordered=False)
+    await collection.create_index([("created_at", -1), ("_id", -1)])
+
+async def timed(func, rounds: int) -> float:
+    samples = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        await func()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples)
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark admin user list pagination")
+    parser.add_argument("--docs", type=int, default=1_000_100, help="Users in the scratch collection")
+    parser.add_argument("--limit", type=int, default=50, help="Page size")
+    parser.add_argument("--rounds", type=int, default=5, help="Measurements per offset (median reported)")
+    parser.add_argument("--collection", default="bench_users", help="Scratch collection name")
+    parser.add_argument("--drop", action="store_true", help="Drop the scratch collection afterwards")
+    args = parser.parse_args()
+
+    # Initialize database connection
+    await Database.connect_to_mongo()
+    collection = get_collection(args.collection)
+
+    try:
+        await seed(collection, args.docs)
+        print(f"{args.docs} users, page size {args.limit}, median of {args.rounds}")
+        print(f"  {'offset':>9}  {'skip + count':>14}  {'keyset':>10}")
+        for offset in OFFSETS:
+            if offset >= args.docs:
+                continue
+
+            async def skip_page():
+                await collection.count_documents({})
+                await collection.find().skip(offset).limit(args.limit).to_list(length=args.limit)
+
+            # Cursor of the item just before the offset (not timed)
+            cursor = None
+            if offset:
+                last = await collection.find({}, {"created_at": 1}).sort(KEYSET_SORT) \
+                    .skip(offset - 1).limit(1).to_list(length=1)
+                cursor = encode_cursor(last[0]["created_at"], last[0]["_id"])
+
+            async def keyset_page():
+                filters = keyset_after(cursor) if cursor else {}
+                await collection.find(filters, LIST_PROJECTION).sort(KEYSET_SORT) \
+                    .limit(args.limit + 1).to_list(length=args.limit + 1)
+
+            skip_ms = await timed(skip_page, args.rounds)
+            keyset_ms = await timed(keyset_page, args.rounds)
+            print(f"  {offset:>9}  {skip_ms:>11.1f} ms  {keyset_ms:>7.1f} ms")
+    finally:
+        if args.drop:
+            await collection.drop()
+        # Close database connection
+        await Database.close_mongo_connection()
+
+if __name__ == "__main__":
+    # Load environment variables
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    # Run the async main function
+    asyncio.run(main())
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Benchmark response compression: output bytes and CPU time per response size
+for each encoding CompressionMiddleware can negotiate, at the configured levels.
+Usage: python -m scripts.bench_compression [--rounds 50]
+"""
+import argparse
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add the project root to the Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from bson import ObjectId
+from app.core.responses import dumps
+from app.middleware.compression import SUPPORTED_ENCODINGS, _Compressor
+
+SIZES = [512, 4 * 1024, 32 * 1024, 256 * 1024, 2 * 1024 * 1024]
+
+def admin_page_json(target_size: int) -> bytes:
+    """Admin user-list JSON of roughly target_size bytes"""
+    now = datetime.utcnow()
+    
+    def item(i: int) -> dict:
+        return {
+            "_id": ObjectId(),
+            "email": f"user{i}@example.com",
+            "first_name": f"First{i}",
+            "last_name": f"Last{i}",
+            "is_active": True,
+            "is_verified": i % 3 == 0,
+            "role": "user",
+            "created_at": now - timedelta(minutes=i),
+            "updated_at": now,
+        }
+    
+    count = max(1, target_size // len(dumps(item(0))))
+    return dumps({"success": True, "data": {"items": [item(i) for i in range(count)]}})
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark response compression")
+    parser.add_argument("--rounds", type=int, default=50, help="Compressions per measurement")
+    args = parser.parse_args()
+    
+    print(f"{'size':>10} {'encoding':>8} {'out bytes':>10} {'ratio':>7} {'cpu us':>10}")
+    for size in SIZES:
+        body = admin_page_json(size)
+        for encoding in SUPPORTED_ENCODINGS:
+            started = time.process_time()
+            for _ in range(args.rounds):
+                compressed = _Compressor(encoding).finish(body)
+            cpu = (time.process_time() - started) / args.rounds
+            print(f"{len(body):>10} {encoding:>8} {len(compressed):>10} {len(body) / len(compressed):>7.1f} {cpu * 1e6:>10.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Benchmark response serialization for a 100-user admin page.
+Compares the previous path (jsonable_encoder + stdlib json via JSONResponse)
+with APIResponse (orjson with native ObjectId/datetime/pydantic handling).
+Usage: python -m scripts.bench_serialization [--users 100] [--rounds 2000]
+"""
+import argparse
+import sys
+import timeit
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add the project root to the Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from bson import ObjectId
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from app.core.responses import APIResponse
+from app.models.user import UserInDB
+
+def build_page(count: int) -> dict:
+    now = datetime.utcnow()
+    users = [
+        UserInDB(
+            _id=ObjectId(),
+            email=f"user{i}@example.com",
+            first_name=f"First{i}",
+            last_name=f"Last{i}",
+            role="admin" if i % 20 == 0 else "user",
+            is_verified=i % 3 == 0,
+            hashed_password="$2b$12$" + "x" * 53,
+            created_at=now - timedelta(days=i),
+            updated_at=now,
+        )
+        for i in range(count)
+    ]
+    return {
+        "success": True,
+        "data": {"items": users, "total": count, "skip": 0, "limit": count},
+        "message": "Users retrieved successfully",
+        "timestamp": now.isoformat() + "Z",
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark response serialization")
+    parser.add_argument("--users", type=int, default=100, help="Users per page")
+    parser.add_argument("--rounds", type=int, default=2000, help="Serializations per measurement")
+    args = parser.parse_args()
+    
+    page = build_page(args.users)
+    
+    def current_path():
+        return JSONResponse(jsonable_encoder(page)).body
+    
+    def orjson_path():
+        return APIResponse(page).body
+    
+    print(f"{args.users} users, {args.rounds} rounds (best of 5)")
+    results = {}
+    for name, func in (("jsonable_encoder + json", current_path), ("APIResponse (orjson)", orjson_path)):
+        best = min(timeit.repeat(func, number=args.rounds, repeat=5)) / args.rounds
+        results[name] = best
+        print(f"  {name:<26} {best * 1e6:9.1f} us/response  {len(func()):>7} bytes")
+    
+    baseline, candidate = results.values()
+    print(f"  speedup: {baseline / candidate:.1f}x")
+
+if __name__ == "__main__":
+    main()
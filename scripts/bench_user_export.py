@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Benchmark the streaming user export (NDJSON and CSV) against the previous
+approach of paging /admin/users/ (count + skip/limit of 100 + UserInDB
+validation per row), on the scratch collection used by
+bench_admin_pagination (seeded if needed). ``--synthetic`` feeds generated
+rows to the serializers instead, to measure them without a MongoDB server.
+Usage: python -m scripts.bench_user_export [--docs 1000000] [--compare-pages 100] [--synthetic]
+"""
+import argparse
+import asyncio
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add the project root to the Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from bson import ObjectId
+from app.core.responses import dumps
+from app.db.session import Database, get_collection
+from app.models.user import UserInDB
+from app.services.user_export import EXPORT_STREAMS, export_cursor
+from scripts.bench_admin_pagination import seed
+
+PAGE_SIZE = 100
+
+async def synthetic_rows(docs: int):
+    """Export rows shaped like the seeded users, as the cursor would deliver them"""
+    start = datetime.utcnow() - timedelta(days=3650)
+    for i in range(docs):
+        created_at = start + timedelta(seconds=i // 2)
+        yield {
+            "_id": ObjectId(),
+            "email": f"bench{i}@example.com",
+            "first_name": f"First{i}",
+            "last_name": f"Last{i}",
+            "role": "admin" if i % 500 == 0 else "user",
+            "is_active": i % 10 != 0,
+            "is_verified": i % 3 == 0,
+            "created_at": created_at,
+            "updated_at": created_at,
+        }
+
+async def run_export(rows, fmt: str):
+    tracemalloc.start()
+    started = time.perf_counter()
+    total_bytes = 0
+    async for chunk in EXPORT_STREAMS[fmt](rows()):
+        total_bytes += len(chunk)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, total_bytes, peak
+
+async def run_paged(collection, pages: int):
+    """The previous client loop, for the first ``pages`` pages only"""
+    started = time.perf_counter()
+    rows = 0
+    for page in range(pages):
+        await collection.count_documents({})
+        users = [UserInDB(**doc) async for doc in collection.find().skip(page * PAGE_SIZE).limit(PAGE_SIZE)]
+        dumps({"items": users})
+        rows += len(users)
+    return time.perf_counter() - started, rows
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark the streaming user export")
+    parser.add_argument("--docs", type=int, default=1_000_000, help="Users in the scratch collection")
+    parser.add_argument("--compare-pages", type=int, default=100, help="Pages of the old path to time")
+    parser.add_argument("--collection", default="bench_users", help="Scratch collection name")
+    parser.add_argument("--synthetic", action="store_true", help="Serialize generated rows; no database")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        print(f"{args.docs} synthetic users (serialization only)")
+        for fmt in EXPORT_STREAMS:
+            elapsed, total_bytes, peak = await run_export(lambda: synthetic_rows(args.docs), fmt)
+            print(
+                f"  {fmt:<7} {elapsed:7.1f} s  {args.docs / elapsed:>9,.0f} rows/s  "
+                f"{total_bytes / elapsed / 1e6:6.1f} MB/s  peak heap {peak / 1e6:5.1f} MB"
+            )
+        return
+
+    # Initialize database connection
+    await Database.connect_to_mongo()
+    collection = get_collection(args.collection)
+
+    try:
+        await seed(collection, args.docs)
+        docs = await collection.estimated_document_count()
+        print(f"{docs} users")
+        for fmt in EXPORT_STREAMS:
+            elapsed, total_bytes, peak = await run_export(lambda: export_cursor({}, collection), fmt)
+            print(
+                f"  {fmt:<7} {elapsed:7.1f} s  {docs / elapsed:>9,.0f} rows/s  "
+                f"{total_bytes / elapsed / 1e6:6.1f} MB/s  peak heap {peak / 1e6:5.1f} MB"
+            )
+        if args.compare_pages:
+            elapsed, rows = await run_paged(collection, args.compare_pages)
+            print(
+                f"  paged   {elapsed:7.1f} s  {rows / elapsed:>9,.0f} rows/s  "
+                f"(first {args.compare_pages} pages; deeper pages are slower)"
+            )
+    finally:
+        # Close database connection
+        await Database.close_mongo_connection()
+
+if __name__ == "__main__":
+    # Load environment variables
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    # Run the async main function
+    asyncio.run(main())
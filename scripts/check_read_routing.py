@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Check which replica set member serves each read route. Run against a
+replica set (see docker-compose.replset.yml): primary-routed reads must
+land on the primary, analytics reads on a secondary while one is healthy.
+Usage: python -m scripts.check_read_routing [--samples 20]
+"""
+import argparse
+import asyncio
+import sys
+from collections import Counter
+from pathlib import Path
+
+# Add the project root to the Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from pymongo import monitoring
+from app.crud.crud_user import user as crud_user
+from app.crud.crud_user_stats import user_stats
+from app.db.session import Database, analytics_read_preference
+from app.services.user_export import export_cursor
+
+class ServerRecorder(monitoring.CommandListener):
+    """Remembers which server each find/aggregate/count was sent to"""
+
+    def __init__(self):
+        self.servers = []
+
+    def started(self, event):
+        if event.command_name in ("find", "aggregate", "count"):
+            self.servers.append("%s:%s" % event.connection_id)
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+async def main():
+    parser = argparse.ArgumentParser(description="Check read routing on a replica set")
+    parser.add_argument("--samples", type=int, default=20, help="Reads per route")
+    args = parser.parse_args()
+
+    recorder = ServerRecorder()
+    monitoring.register(recorder)
+
+    # Initialize database connection
+    await Database.connect_to_mongo()
+
+    try:
+        hello = await Database.db.command("hello")
+        if "setName" not in hello:
+            print("Not connected to a replica set; every route goes to the one server")
+            sys.exit(1)
+        primary = hello["primary"]
+        print(f"Replica set {hello['setName']}, primary {primary}, read preference {analytics_read_preference().document}")
+
+        routes = {
+            "primary (auth)": lambda: crud_user.collection.find_one({}),
+            "analytics (admin list)": lambda: crud_user.list_page(1),
+            "analytics (estimated count)": crud_user.estimated_count,
+            "analytics (export)": lambda: export_cursor({}).to_list(length=1),
+            "analytics (stats)": user_stats.get_totals,
+        }
+        failed = False
+        for name, read in routes.items():
+            recorder.servers.clear()
+            for _ in range(args.samples):
+                await read()
+            servers = Counter(recorder.servers)
+            on_primary = servers.get(primary, 0)
+            expect_primary = name.startswith("primary")
+            ok = on_primary == sum(servers.values()) if expect_primary else on_primary == 0
+            failed |= not ok
+            print(f"  {'ok  ' if ok else 'FAIL'} {name}: {dict(servers)}")
+    finally:
+        # Close database connection
+        await Database.close_mongo_connection()
+
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    # Load environment variables
+    from dotenv import load_dotenv
+    load_dotenv()
+
+    # Run the async main function
+    asyncio.run(main())
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Verify with explain() that every admin user search shape is served by an
+index (no COLLSCAN in the winning plan) and that list pages come out of
+the keyset index already sorted (no SORT stage). Run after
+init_indexes.py; exits non-zero when a plan falls short.
+Usage: python -m scripts.check_user_search_plans
+"""
+import asyncio
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, List
+
+# Add the project root to the Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from bson import ObjectId
+from app.core.pagination import KEYSET_SORT, encode_cursor, keyset_after
+from app.crud.crud_user import SEARCH_PROJECTION, user as crud_user
+from app.db.session import Database
+
+def plan_stages(plan: Any) -> List[str]:
+    """All stage names in an explain plan tree"""
+    stages = []
+    if isinstance(plan, dict):
+        if "stage" in plan:
+            stages.append(plan["stage"])
+        for value in plan.values():
+            stages.extend(plan_stages(value))
+    elif isinstance(plan, list):
+        for item in plan:
+            stages.extend(plan_stages(item))
+    return stages
+
+def search_cases():
+    since = datetime.utcnow() - timedelta(days=30)
+    cursor = encode_cursor(datetime.utcnow(), ObjectId())
+    return {
+        "text": crud_user.build_search_query(q="john"),
+        "email prefix": crud_user.build_search_query(prefix="jo"),
+        "name prefix": crud_user.build_search_query(prefix="jo", prefix_field="name"),
+        "role": crud_user.build_search_query(role="admin"),
+        "is_active": crud_user.build_search_query(is_active=False),
+        "created range": crud_user.build_search_query(created_from=since),
+        "email prefix + role + next page": {
+            "$and": [crud_user.build_search_query(prefix="jo", role="user"), keyset_after(cursor)]
+        },
+    }
+
+def pagination_cases():
+    """Admin list pages; these must not sort in memory either"""
+    cursor = encode_cursor(datetime.utcnow(), ObjectId())
+    return {
+        "list": {},
+        "list next page": keyset_after(cursor),
+        "list legacy page": keyset_after(encode_cursor(None, ObjectId())),
+    }
+
+def plan_problems(stages: List[str], sorted_by_index: bool) -> List[str]:
+    problems = []
+    if "COLLSCAN" in stages:
+        problems.append("collection scan")
+    if "IXSCAN" not in stages:
+        problems.append("no index scan")
+    if sorted_by_index and "SORT" in stages:
+        problems.append("in-memory sort")
+    return problems
+
+async def main():
+    # Initialize database connection
+    await Database.connect_to_mongo()
+    
+    failures = 0
+    try:
+        cases = [(name, query, False) for name, query in search_cases().items()]
+        cases += [(name, query, True) for name, query in pagination_cases().items()]
+        for name, query, sorted_by_index in cases:
+            explain = await crud_user.collection.find(query, SEARCH_PROJECTION) \
+                .sort(KEYSET_SORT).limit(51).explain()
+            stages = plan_stages(explain["queryPlanner"]["winningPlan"])
+            problems = plan_problems(stages, sorted_by_index)
+            failures += bool(problems)
+            print(f"{'FAIL' if problems else 'ok  '} {name:<32} {' > '.join(stages)} {', '.join(problems)}")
+    finally:
+        # Close database connection
+        await Database.close_mongo_connection()
+    
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    # Load environment variables
+    from dotenv import load_dotenv
+    load_dotenv()
+    
+    # Run the async main function
+    asyncio.run(main())
@@ -1,7 +1,10 @@
 #!/usr/bin/env python3
 """
-Script to initialize database indexes.
+Script to reconcile database indexes with the registry in app/db/indexes.py.
+Missing indexes are created; undeclared or mismatched ones are reported.
+Usage: python -m scripts.init_indexes [--dry-run] [--drop-extra] [--collection users]
 """
+import argparse
 import asyncio
 import sys
 from pathlib import Path
@@ -9,58 +12,47 @@ from pathlib import Path
 # Add the project root to the Python path
 sys.path.append(str(Path(__file__).parent.parent))
 
-from app.core.config import settings
-from app.db.session import Database, get_collection
+from app.db.indexes import reconcile_indexes
+from app.db.session import Database
 
-async def create_indexes():
-    """
-    Create necessary database indexes
-    """
-    # Users collection indexes
-    users = get_collection("users")
-    
-    # Create unique index on email
-    await users.create_index("email", unique=True)
-    
-    # Create index on role for faster role-based queries
-    await users.create_index("role")
-    
-    # Create index on is_active for faster filtering of active users
-    await users.create_index("is_active")
-    
-    # Create text index for search
-    await users.create_index([
-        ("email", "text"),
-        ("first_name", "text"),
-        ("last_name", "text")
-    ])
-    
-    # Add indexes for other collections as needed
-    # files = get_collection("files")
-    # await files.create_index("user_id")
-    # await files.create_index("created_at")
-    
-    print("Database indexes created successfully")
+def print_report(report):
+    for collection, changes in report.items():
+        if not any(changes.values()):
+            print(f"{collection}: up to date")
+            continue
+        for kind, names in changes.items():
+            for name in names:
+                print(f"{collection}: {kind} {name}")
 
 async def main():
     """
     Main function to run the script
     """
+    parser = argparse.ArgumentParser(description="Reconcile database indexes with the registry")
+    parser.add_argument("--dry-run", action="store_true", help="Only report, create nothing")
+    parser.add_argument("--drop-extra", action="store_true", help="Drop indexes that are not in the registry")
+    parser.add_argument("--collection", action="append", help="Limit to a collection (repeatable)")
+    args = parser.parse_args()
+    
     # Initialize database connection
     await Database.connect_to_mongo()
     
     try:
-        # Create indexes
-        await create_indexes()
+        report = await reconcile_indexes(
+            apply=not args.dry_run,
+            drop_extra=args.drop_extra and not args.dry_run,
+            collections=args.collection,
+        )
+        print_report(report)
     except Exception as e:
-        print(f"Error creating indexes: {str(e)}")
+        print(f"Error reconciling indexes: {str(e)}")
         sys.exit(1)
     finally:
         # Close database connection
         await Database.close_mongo_connection()
     
-    print("Database initialization completed successfully")
-    sys.exit(0)
+    # Non-zero on mismatches so CI can catch drift
+    sys.exit(1 if any(changes["mismatched"] for changes in report.values()) else 0)
 
 if __name__ == "__main__":
     # Load environment variables
@@ -1,4 +1,14 @@
+#!/usr/bin/env python3
+"""
+Script to apply or revert versioned database migrations (app/db/migrations).
+Usage:
+    python -m scripts.migrate status
+    python -m scripts.migrate up [--to VERSION] [--dry-run] [--batch-size N] [--sleep S] [--max-lag S]
+    python -m scripts.migrate down --to VERSION [--dry-run] ...
+"""
+import argparse
 import asyncio
+import logging
 import sys
 from pathlib import Path
 
@@ -6,31 +16,55 @@ from pathlib import Path
 sys.path.append(str(Path(__file__).parent.parent))
 
 from app.db.session import Database
-from app.core.config import settings
+from app.db.indexes import reconcile_indexes
+from app.db.migrations.runner import MigrationRunner
 
-async def run_migrations():
+def parse_args():
+    parser = argparse.ArgumentParser(description="Apply or revert database migrations")
+    parser.add_argument("command", choices=["status", "up", "down"])
+    parser.add_argument("--to", type=int, help="Target version (required for down; 0 reverts everything)")
+    parser.add_argument("--dry-run", action="store_true", help="Count what would change, write nothing")
+    parser.add_argument("--batch-size", type=int, help="Documents per backfill batch")
+    parser.add_argument("--sleep", type=float, help="Seconds between backfill batches")
+    parser.add_argument("--max-lag", type=float, help="Pause while secondaries lag more than this (0 = off)")
+    args = parser.parse_args()
+    if args.command == "down" and args.to is None:
+        parser.error("down requires --to")
+    return args
+
+async def run_migrations(args):
     """Run database migrations"""
+    runner = MigrationRunner()
+    
+    if args.command == "status":
+        for entry in await runner.status():
+            applied = f" at {entry['applied_at']:%Y-%m-%d %H:%M}" if entry["applied_at"] else ""
+            print(f"{entry['version']:>4}  {entry['status']:<9}  {entry['description']}{applied}")
+        return
+    
+    options = {"batch_size": args.batch_size, "batch_sleep": args.sleep, "max_lag": args.max_lag}
+    if args.command == "up":
+        if not args.dry_run:
+            # Indexes are declared in app/db/indexes.py; migrations may rely on them
+            await reconcile_indexes()
+        versions = await runner.upgrade(args.to, dry_run=args.dry_run, **options)
+    else:
+        versions = await runner.downgrade(args.to, dry_run=args.dry_run, **options)
+    
+    prefix = "Dry run: would run" if args.dry_run else "Ran"
+    print(f"{prefix} {args.command} for {versions}" if versions else "Nothing to do")
+
+async def main():
+    args = parse_args()
+    
     # Initialize database connection
     await Database.connect_to_mongo()
     
     try:
-        # Get the database
-        db = Database.db
-        
-        # Example migration: Create indexes
-        users_collection = db["users"]
-        
-        # Create index on email field (unique)
-        await users_collection.create_index("email", unique=True)
-        
-        # Create index on created_at field
-        await users_collection.create_index("created_at")
-        
-        print("Migrations completed successfully!")
-        
+        await run_migrations(args)
     except Exception as e:
         print(f"Error running migrations: {str(e)}")
-        raise
+        sys.exit(1)
     finally:
         # Close database connection
         await Database.close_mongo_connection()
@@ -40,5 +74,8 @@ if __name__ == "__main__":
     from dotenv import load_dotenv
     load_dotenv()
     
-    # Run migrations
-    asyncio.run(run_migrations())
+    # Show backfill progress
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+    
+    # Run the async main function
+    asyncio.run(main())
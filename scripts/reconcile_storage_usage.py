@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Script to recompute per-user and per-folder storage usage counters from the blob inventory.
+Usage: python -m scripts.reconcile_storage_usage [--batch-size N]
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# Add the project root to the Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.db.session import Database
+from app.services.storage_usage import reconcile_storage_usage
+
+async def main():
+    parser = argparse.ArgumentParser(description="Reconcile storage usage counters")
+    parser.add_argument("--batch-size", type=int, default=None, help="Blobs per listing page and counters per bulk write")
+    args = parser.parse_args()
+    
+    # Initialize database connection
+    await Database.connect_to_mongo()
+    
+    try:
+        result = await reconcile_storage_usage(args.batch_size)
+        print(f"Scanned {result['blobs_scanned']} blobs, {result['counters']} counters, corrected {result['corrected']}")
+    except Exception as e:
+        print(f"Error reconciling storage usage: {str(e)}")
+        sys.exit(1)
+    finally:
+        # Close database connection
+        await Database.close_mongo_connection()
+
+if __name__ == "__main__":
+    # Load environment variables
+    from dotenv import load_dotenv
+    load_dotenv()
+    
+    # Run the async main function
+    asyncio.run(main())
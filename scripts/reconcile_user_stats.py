@@ -0,0 +1,37 @@
+#!/usr/bin/env python3
+"""
+Script to rebuild the admin dashboard user counters and daily signup buckets from the users collection.
+Run once after deploying the counters, then the app reconciles nightly.
+Usage: python -m scripts.reconcile_user_stats
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+# Add the project root to the Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+from app.db.session import Database
+from app.services.user_stats import reconcile_user_stats
+
+async def main():
+    # Initialize database connection
+    await Database.connect_to_mongo()
+    
+    try:
+        result = await reconcile_user_stats()
+        print(f"Counted {result['total']} users over {result['signup_days']} signup days")
+    except Exception as e:
+        print(f"Error reconciling user stats: {str(e)}")
+        sys.exit(1)
+    finally:
+        # Close database connection
+        await Database.close_mongo_connection()
+
+if __name__ == "__main__":
+    # Load environment variables
+    from dotenv import load_dotenv
+    load_dotenv()
+    
+    # Run the async main function
+    asyncio.run(main())
@@ -0,0 +1,23 @@
+import os
+import sys
+from pathlib import Path
+
+# Add the project root to the Python path
+sys.path.append(str(Path(__file__).parent.parent))
+
+# Settings required at import time; tests never reach these services
+os.environ.setdefault("MONGODB_URL", "mongodb://localhost:27017")
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+os.environ.setdefault("AZURE_STORAGE_ACCOUNT_NAME", "test")
+os.environ.setdefault("AZURE_STORAGE_ACCOUNT_KEY", "dGVzdA==")
+
+from azure.core.exceptions import ResourceExistsError
+from azure.storage.blob import ContainerClient
+
+
+def _container_exists(*args, **kwargs):
+    raise ResourceExistsError("The specified container already exists.")
+
+
+# The storage service creates its container on import; keep that offline
+ContainerClient.create_container = _container_exists
@@ -0,0 +1,65 @@
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import Route
+from starlette.testclient import TestClient
+from app.core.etag import not_modified, version_from_etag, version_etag
+from app.core.utils import from_millis
+from app.middleware.compression import CompressionMiddleware
+
+ETAG = version_etag(from_millis(1735689600000))
+BODY = b'{"data": "' + b"x" * 4096 + b'"}'
+
+
+async def resource(request: Request):
+    cached = not_modified(request, ETAG)
+    if cached is not None:
+        return cached
+    return Response(BODY, media_type="application/json", headers={"ETag": ETAG})
+
+
+app = Starlette(routes=[Route("/resource", resource)])
+app.add_middleware(CompressionMiddleware)
+client = TestClient(app)
+
+
+def test_compressed_body_gets_its_own_etag_and_vary():
+    response = client.get("/resource", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["etag"] == f'{ETAG[:-1]}-gzip"'
+    assert "Accept-Encoding" in response.headers["vary"]
+
+
+def test_identity_body_keeps_the_upstream_etag():
+    response = client.get("/resource", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+    assert response.headers["etag"] == ETAG
+
+
+def test_compressed_variant_tag_revalidates():
+    tag = client.get("/resource", headers={"Accept-Encoding": "gzip"}).headers["etag"]
+    response = client.get("/resource", headers={"Accept-Encoding": "gzip", "If-None-Match": tag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == tag
+    assert "Accept-Encoding" in response.headers["vary"]
+
+
+def test_compressed_variant_tag_is_a_valid_if_match_version():
+    assert version_from_etag(f'{ETAG[:-1]}-gzip"') == version_from_etag(ETAG)
+    assert version_from_etag(f'W/{ETAG}') is None
+
+
+def test_precompressed_openapi_still_gets_cors_headers(monkeypatch):
+    from app.core.responses import dumps
+    from app.main import app as api
+    from app.middleware.compression import precompressed
+
+    monkeypatch.setattr(precompressed, "_entries", {})
+    precompressed.put(api.openapi_url, dumps(api.openapi()), "application/json")
+    response = TestClient(api).get(
+        api.openapi_url, headers={"Origin": "https://example.com", "Accept-Encoding": "gzip"}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["access-control-allow-origin"] == "*"
+    assert response.json()["openapi"]
@@ -0,0 +1,113 @@
+from datetime import datetime
+from types import SimpleNamespace
+import pytest
+from bson import ObjectId
+from pymongo.errors import BulkWriteError
+from app.crud.crud_admin import CRUDAdmin
+from app.crud.crud_user import user as crud_user
+
+
+class AsyncDocs:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def __aiter__(self):
+        async def iterate():
+            for doc in self.docs:
+                yield doc
+        return iterate()
+
+
+class Users:
+    """
+    Just enough of the users collection for bulk operations. ``write_errors``
+    maps an _id to the error its operation gets; ``vanish`` are deleted by
+    someone else while the bulk write runs, so their operations match nothing.
+    """
+
+    def __init__(self, docs, write_errors=None, vanish=()):
+        self.docs = {doc["_id"]: doc for doc in docs}
+        self.write_errors = write_errors or {}
+        self.vanish = set(vanish)
+        self.batches = []
+
+    def find(self, query, projection=None):
+        return AsyncDocs([self.docs[oid] for oid in query["_id"]["$in"] if oid in self.docs])
+
+    async def bulk_write(self, operations, ordered=True):
+        self.batches.append(len(operations))
+        for oid in self.vanish:
+            self.docs.pop(oid, None)
+        errors, applied = [], 0
+        for index, op in enumerate(operations):
+            oid = op._filter["_id"]
+            if oid in self.write_errors:
+                errors.append({"index": index, "code": 2, "errmsg": self.write_errors[oid]})
+            elif oid in self.docs:
+                applied += 1
+        if errors:
+            raise BulkWriteError({"writeErrors": errors, "nMatched": applied, "nRemoved": applied})
+        return SimpleNamespace(matched_count=applied, deleted_count=applied)
+
+
+def member(**fields):
+    return {"_id": ObjectId(), "role": "user", "is_active": True, "is_verified": False,
+            "created_at": datetime(2025, 1, 1), **fields}
+
+
+@pytest.fixture
+def recorded(monkeypatch):
+    changes = []
+
+    async def record_stats(pairs):
+        changes.extend(pairs)
+
+    monkeypatch.setattr(crud_user, "record_stats", record_stats)
+    return changes
+
+
+def use(monkeypatch, users: Users):
+    monkeypatch.setattr(crud_user, "_collection", users)
+
+
+async def test_bulk_update_maps_every_outcome_back_to_its_id(monkeypatch, recorded):
+    own, ok, broken, gone = member(), member(), member(), member()
+    users = Users([own, ok, broken, gone], write_errors={broken["_id"]: "E11000"}, vanish=[gone["_id"]])
+    use(monkeypatch, users)
+    unknown = str(ObjectId())
+    ids = [str(own["_id"]), "not-an-id", unknown, str(ok["_id"]), str(broken["_id"]), str(gone["_id"])]
+
+    results = await CRUDAdmin().bulk_update(ids, {"role": "admin"}, exclude=str(own["_id"]))
+
+    assert [result["status"] for result in results] == [
+        "skipped", "invalid_id", "not_found", "updated", "error", "not_found"
+    ]
+    assert results[4]["error"] == "E11000"
+    # Only the user actually changed moves the counters, from its stored state
+    [(before, after)] = recorded
+    assert before["_id"] == ok["_id"]
+    assert before["role"] == "user" and after["role"] == "admin"
+
+
+async def test_bulk_delete_trusts_n_removed_and_records_deletions(monkeypatch, recorded):
+    first, broken, last = member(), member(), member(role="admin")
+    use(monkeypatch, Users([first, broken, last], write_errors={broken["_id"]: "not primary"}))
+
+    results = await CRUDAdmin().bulk_delete([str(first["_id"]), str(broken["_id"]), str(last["_id"])])
+
+    assert [result["status"] for result in results] == ["deleted", "error", "deleted"]
+    assert [(before["_id"], after) for before, after in recorded] == [(first["_id"], None), (last["_id"], None)]
+
+
+async def test_write_error_indexes_are_relative_to_their_chunk(monkeypatch, recorded):
+    monkeypatch.setattr("app.crud.crud_admin.settings.ADMIN_BULK_CHUNK_SIZE", 2)
+    docs = [member() for _ in range(5)]
+    users = Users(docs, write_errors={docs[3]["_id"]: "boom"})
+    use(monkeypatch, users)
+
+    results = await CRUDAdmin().bulk_update([str(doc["_id"]) for doc in docs], {"is_active": False})
+
+    assert users.batches == [2, 2, 1]
+    assert [result["status"] for result in results] == ["updated", "updated", "updated", "error", "updated"]
+    assert len(recorded) == 4
+    assert all(after["is_active"] is False for _, after in recorded)
@@ -0,0 +1,59 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+import pytest
+from fastapi.testclient import TestClient
+from app.core.config import settings
+from app.core.security import get_current_active_user
+from app.main import app
+from app.services import storage as storage_module
+from app.services.storage import storage
+from tests.test_responses import make_user
+
+PROPERTIES = SimpleNamespace(
+    etag='"0x8DB1234567890AB"',
+    size=3,
+    metadata={"original_filename": "a.txt"},
+    content_settings=SimpleNamespace(content_type="text/plain"),
+    creation_time=datetime(2025, 1, 1),
+    last_modified=datetime(2025, 1, 1),
+)
+
+
+def test_sas_expiry_is_stable_within_a_window():
+    start = datetime(2025, 1, 1, 12, 0)
+    window = timedelta(seconds=settings.SAS_URL_WINDOW)
+    ttl = timedelta(seconds=settings.SAS_URL_TTL)
+    assert storage.sas_expiry(start) == storage.sas_expiry(start + window - timedelta(seconds=1))
+    assert storage.sas_expiry(start + window) == storage.sas_expiry(start) + window
+    # Signed at any point of the window, a link lives at least SAS_URL_TTL
+    assert storage.sas_expiry(start + window - timedelta(seconds=1)) - (start + window) == ttl
+
+
+@pytest.fixture
+def client(monkeypatch):
+    async def get_properties(file_id):
+        return PROPERTIES
+
+    monkeypatch.setattr(storage, "get_properties", get_properties)
+    app.dependency_overrides[get_current_active_user] = lambda: make_user()
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+def test_same_window_gives_the_same_link_and_a_304(client):
+    first = client.get("/api/v1/uploads/a.txt")
+    second = client.get("/api/v1/uploads/a.txt")
+    assert first.status_code == 200
+    assert first.json()["data"] == second.json()["data"]
+    assert first.headers["etag"] == second.headers["etag"]
+    assert client.get("/api/v1/uploads/a.txt", headers={"If-None-Match": first.headers["etag"]}).status_code == 304
+
+
+def test_new_window_changes_the_link_and_the_etag(client, monkeypatch):
+    first = client.get("/api/v1/uploads/a.txt")
+    later = storage.sas_expiry() + timedelta(seconds=settings.SAS_URL_WINDOW)
+    monkeypatch.setattr(storage_module.storage, "sas_expiry", lambda now=None: later)
+    response = client.get("/api/v1/uploads/a.txt", headers={"If-None-Match": first.headers["etag"]})
+    assert response.status_code == 200
+    assert response.headers["etag"] != first.headers["etag"]
+    assert response.json()["data"]["url"] != first.json()["data"]["url"]
@@ -0,0 +1,48 @@
+import asyncio
+import pytest
+from app.core.config import settings
+from app.crud.crud_lease import lease
+from app.services.periodic import run_periodic
+
+
+@pytest.fixture
+def fake_lease(monkeypatch):
+    calls = {"acquire": 0, "complete": []}
+
+    async def acquire_due(name, holder, interval, ttl):
+        calls["acquire"] += 1
+        return True
+
+    async def complete(name, holder, succeeded):
+        calls["complete"].append(succeeded)
+
+    monkeypatch.setattr(lease, "acquire_due", acquire_due)
+    monkeypatch.setattr(lease, "complete", complete)
+    monkeypatch.setattr(settings, "PERIODIC_JOB_POLL_INTERVAL", 0.01)
+    return calls
+
+
+async def run_briefly(job, seconds=0.05):
+    task = asyncio.create_task(run_periodic("test_job", 24 * 60 * 60, job))
+    await asyncio.sleep(seconds)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
+
+async def test_due_job_runs_without_waiting_a_full_interval(fake_lease):
+    runs = []
+
+    async def job():
+        runs.append(1)
+
+    await run_briefly(job)
+    assert runs
+    assert fake_lease["complete"][0] is True
+
+
+async def test_failed_run_is_not_recorded_as_done(fake_lease):
+    async def job():
+        raise RuntimeError("boom")
+
+    await run_briefly(job)
+    assert fake_lease["complete"] and not any(fake_lease["complete"])
@@ -0,0 +1,155 @@
+import base64
+import hashlib
+import os
+import pytest
+from azure.core.exceptions import ResourceNotFoundError
+from types import SimpleNamespace
+from app.services import post_processing as module
+from app.services.post_processing import PostProcessingPipeline, analyze_content
+
+CHUNKS = [b"a" * 5000, b"b" * 7000, b"c" * 3]
+DATA = b"".join(CHUNKS)
+
+
+def fake_properties(size=len(DATA), content_md5=None):
+    return SimpleNamespace(
+        size=size,
+        metadata={"uploaded_by": "u1"},
+        content_settings=SimpleNamespace(content_type="text/plain", content_md5=content_md5),
+    )
+
+
+def test_analyze_content_reads_the_spooled_file(tmp_path):
+    path = tmp_path / "blob"
+    path.write_bytes(DATA)
+    result = analyze_content(str(path), "text/plain", [128])
+    assert result["size"] == len(DATA)
+    assert result["sha256"] == hashlib.sha256(DATA).hexdigest()
+    assert result["md5"] == hashlib.md5(DATA).digest()
+
+
+def test_analyze_content_decodes_images_from_the_file(tmp_path):
+    Image = pytest.importorskip("PIL.Image")
+    path = tmp_path / "image.png"
+    Image.new("RGB", (600, 300), "red").save(path, format="PNG")
+    result = analyze_content(str(path), "image/png", [128, 512])
+    assert [variant["name"] for variant in result["variants"]] == ["128.jpg", "512.jpg"]
+
+
+async def test_process_streams_to_a_temp_file_and_removes_it(tmp_path, monkeypatch):
+    saved = {}
+
+    async def get_properties(file_id):
+        return fake_properties(content_md5=bytearray(hashlib.md5(DATA).digest()))
+
+    async def iter_file_chunks(file_id):
+        for chunk in CHUNKS:
+            yield chunk
+
+    async def set_metadata(file_id, metadata):
+        saved.update(metadata)
+
+    monkeypatch.setattr(module.storage, "get_properties", get_properties)
+    monkeypatch.setattr(module.storage, "iter_file_chunks", iter_file_chunks)
+    monkeypatch.setattr(module.storage, "set_metadata", set_metadata)
+    monkeypatch.setattr(module.settings, "POST_PROCESSING_TEMP_DIR", str(tmp_path))
+
+    # No process pool: run_in_executor falls back to the default thread pool
+    await PostProcessingPipeline().process("file-1")
+
+    assert saved["sha256"] == hashlib.sha256(DATA).hexdigest()
+    assert base64.b64decode(saved["md5"]) == hashlib.md5(DATA).digest()
+    assert saved["checksum_status"] == "verified"
+    assert os.listdir(tmp_path) == []
+
+
+async def test_failed_download_leaves_no_temp_file(tmp_path, monkeypatch):
+    async def get_properties(file_id):
+        return fake_properties()
+
+    async def iter_file_chunks(file_id):
+        yield CHUNKS[0]
+        raise ConnectionError("connection reset")
+
+    monkeypatch.setattr(module.storage, "get_properties", get_properties)
+    monkeypatch.setattr(module.storage, "iter_file_chunks", iter_file_chunks)
+    monkeypatch.setattr(module.settings, "POST_PROCESSING_TEMP_DIR", str(tmp_path))
+
+    with pytest.raises(ConnectionError):
+        await PostProcessingPipeline().process("file-1")
+    assert os.listdir(tmp_path) == []
+
+
+async def test_variants_of_a_file_deleted_mid_processing_are_removed(tmp_path, monkeypatch):
+    Image = pytest.importorskip("PIL.Image")
+    path = tmp_path / "image.png"
+    Image.new("RGB", (600, 300), "red").save(path, format="PNG")
+    image = path.read_bytes()
+    deleted = []
+
+    async def get_properties(file_id):
+        properties = fake_properties(size=len(image))
+        properties.content_settings.content_type = "image/png"
+        return properties
+
+    async def iter_file_chunks(file_id):
+        yield image
+
+    async def put_derived(*args, **kwargs):
+        pass
+
+    async def set_metadata(file_id, metadata):
+        raise ResourceNotFoundError("The specified blob does not exist.")
+
+    async def delete_batch(file_ids):
+        deleted.extend(file_ids)
+        return []
+
+    for name, fake in (("get_properties", get_properties), ("iter_file_chunks", iter_file_chunks),
+                       ("put_derived", put_derived), ("set_metadata", set_metadata), ("delete_batch", delete_batch)):
+        monkeypatch.setattr(module.storage, name, fake)
+    monkeypatch.setattr(module.settings, "POST_PROCESSING_TEMP_DIR", str(tmp_path))
+
+    with pytest.raises(ResourceNotFoundError):
+        await PostProcessingPipeline().process("file-1")
+    assert deleted == ["_variants/file-1/128.jpg", "_variants/file-1/512.jpg"]
+
+
+def test_deleting_a_file_deletes_its_variants(monkeypatch):
+    from fastapi.testclient import TestClient
+    from app.api.v1.endpoints import uploads
+    from app.core.security import get_current_active_user
+    from app.main import app
+    from tests.test_responses import make_user
+
+    properties = fake_properties()
+    properties.metadata["variants"] = "_variants/a.png/128.jpg,_variants/a.png/512.jpg"
+    calls = {}
+
+    async def get_properties(file_id):
+        return properties
+
+    async def delete_file(file_id):
+        calls["deleted"] = file_id
+        return True
+
+    async def delete_batch(file_ids):
+        calls["variants"] = file_ids
+        return []
+
+    async def record(*args):
+        calls["usage"] = args
+
+    monkeypatch.setattr(module.storage, "get_properties", get_properties)
+    monkeypatch.setattr(module.storage, "delete_file", delete_file)
+    monkeypatch.setattr(module.storage, "delete_batch", delete_batch)
+    monkeypatch.setattr(uploads.storage_usage, "record", record)
+    app.dependency_overrides[get_current_active_user] = lambda: make_user()
+    try:
+        response = TestClient(app).delete("/api/v1/uploads/a.png")
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert calls["deleted"] == "a.png"
+    assert calls["variants"] == ["_variants/a.png/128.jpg", "_variants/a.png/512.jpg"]
@@ -0,0 +1,143 @@
+from datetime import datetime, timedelta
+import pytest
+from fastapi.testclient import TestClient
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo.hello import Hello
+from pymongo.read_preferences import SecondaryPreferred
+from pymongo.server_description import ServerDescription
+from pymongo.settings import TopologySettings
+from pymongo.topology_description import TOPOLOGY_TYPE, TopologyDescription
+from app.core.config import settings
+from app.crud.crud_user import user as crud_user
+from app.crud.crud_user_stats import user_stats
+from app.db.session import Database, analytics_read_preference
+from app.main import app
+from app.services.user_export import export_cursor
+from tests.test_user_endpoints import admin  # noqa: F401 (fixture)
+
+HOSTS = ["a:27017", "b:27017", "c:27017"]
+
+
+@pytest.fixture
+def read_preference(monkeypatch):
+    """Settings-driven read preference, rebuilt for each test"""
+    def build(mode="secondaryPreferred", max_staleness=90):
+        monkeypatch.setattr(settings, "ANALYTICS_READ_PREFERENCE", mode)
+        monkeypatch.setattr(settings, "ANALYTICS_MAX_STALENESS_SECONDS", max_staleness)
+        analytics_read_preference.cache_clear()
+        return analytics_read_preference()
+    yield build
+    analytics_read_preference.cache_clear()
+
+
+@pytest.fixture
+def database(monkeypatch, read_preference):
+    """A client that never connects; enough to inspect collection options"""
+    read_preference()
+    client = AsyncIOMotorClient("mongodb://localhost:27017", serverSelectionTimeoutMS=1)
+    monkeypatch.setattr(Database, "client", client)
+    monkeypatch.setattr(Database, "db", client["test"])
+    for crud in (crud_user, user_stats):
+        monkeypatch.setattr(crud, "_collection", None)
+        monkeypatch.setattr(crud, "_analytics_collection", None)
+    yield
+    client.close()
+
+
+def test_read_preference_carries_max_staleness(read_preference):
+    assert read_preference().document == {"mode": "secondaryPreferred", "maxStalenessSeconds": 90}
+    assert read_preference("nearest", 120).document == {"mode": "nearest", "maxStalenessSeconds": 120}
+    assert read_preference(max_staleness=0).document == {"mode": "secondaryPreferred"}
+    assert read_preference("primary").document == {"mode": "primary"}
+    with pytest.raises(ValueError):
+        read_preference("secondary")
+
+
+def test_admin_reads_use_the_analytics_read_preference(database):
+    expected = analytics_read_preference().document
+    assert crud_user.analytics_collection.read_preference.document == expected
+    assert user_stats.analytics_collection.read_preference.document == expected
+    assert export_cursor({}).collection.read_preference.document == expected
+    # Auth and conditional writes stay on the primary
+    assert crud_user.collection.read_preference.document == {"mode": "primary"}
+
+
+def member(host: str, primary: bool, lag: float) -> ServerDescription:
+    hello = Hello({
+        "ok": 1, "setName": "rs0", "hosts": HOSTS, "primary": HOSTS[0], "maxWireVersion": 17,
+        "isWritablePrimary": primary, "secondary": not primary,
+        "lastWrite": {"lastWriteDate": datetime.utcnow() - timedelta(seconds=lag)},
+    })
+    name, port = host.split(":")
+    return ServerDescription((name, int(port)), hello, round_trip_time=0.001)
+
+
+def test_driver_skips_secondaries_staler_than_the_bound(read_preference):
+    members = [member(HOSTS[0], True, 0), member(HOSTS[1], False, 5), member(HOSTS[2], False, 300)]
+    topology = TopologyDescription(
+        TOPOLOGY_TYPE.ReplicaSetWithPrimary, {m.address: m for m in members}, "rs0", None, None,
+        TopologySettings(heartbeat_frequency=10),
+    )
+    selected = topology.apply_selector(read_preference())
+    assert [server.address for server in selected] == [("b", 27017)]
+    # Without the bound the lagging member would be eligible too
+    assert len(topology.apply_selector(SecondaryPreferred())) == 2
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, *args):
+        return self
+
+    def limit(self, *args):
+        return self
+
+    async def to_list(self, length):
+        return self.docs[:length]
+
+    def __aiter__(self):
+        async def iterate():
+            for doc in self.docs:
+                yield doc
+        return iterate()
+
+
+class AnalyticsCollection:
+    def find(self, *args, **kwargs):
+        return FakeCursor([])
+
+    async def find_one(self, *args, **kwargs):
+        return None
+
+    async def estimated_document_count(self):
+        return 0
+
+
+class PrimaryCollection:
+    def __getattr__(self, name):
+        raise AssertionError(f"admin read went to the primary ({name})")
+
+
+@pytest.mark.parametrize("path", [
+    "/api/v1/admin/users/?include_total=true",
+    "/api/v1/admin/users/search?prefix=jo",
+    "/api/v1/admin/users/export",
+    "/api/v1/admin/stats",
+])
+def test_admin_endpoints_never_read_the_primary(admin, monkeypatch, path):  # noqa: F811
+    for crud in (crud_user, user_stats):
+        monkeypatch.setattr(crud, "_collection", PrimaryCollection())
+        monkeypatch.setattr(crud, "_analytics_collection", AnalyticsCollection())
+    response = TestClient(app).get(path)
+    assert response.status_code == 200, response.text
+
+
+def test_export_format_is_still_the_format_query_parameter(admin, monkeypatch):  # noqa: F811
+    monkeypatch.setattr(crud_user, "_analytics_collection", AnalyticsCollection())
+    response = TestClient(app).get("/api/v1/admin/users/export?format=csv")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert response.text.startswith("_id,email")
+    assert TestClient(app).get("/api/v1/admin/users/export?format=xml").status_code == 422
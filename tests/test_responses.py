@@ -0,0 +1,38 @@
+from datetime import datetime
+from bson import ObjectId
+from app.core.responses import standard_response
+from app.models.user import UserInDB
+
+HASH = "$2b$12$" + "x" * 53
+
+
+def make_user(**overrides) -> UserInDB:
+    data = {
+        "_id": ObjectId(),
+        "email": "jane@example.com",
+        "first_name": "Jane",
+        "last_name": "Doe",
+        "hashed_password": HASH,
+        "created_at": datetime(2025, 1, 1),
+        "updated_at": datetime(2025, 1, 2),
+    }
+    data.update(overrides)
+    return UserInDB(**data)
+
+
+def test_envelope_never_serializes_password_hash():
+    body = standard_response(True, data=make_user()).body
+    assert b"hashed_password" not in body
+    assert HASH.encode() not in body
+    assert b"jane@example.com" in body
+
+
+def test_nested_models_drop_password_hash():
+    body = standard_response(True, data={"items": [make_user(), make_user()]}).body
+    assert b"hashed_password" not in body
+
+
+def test_to_public_drops_password_hash():
+    public = make_user().to_public()
+    assert not hasattr(public, "hashed_password")
+    assert public.email == "jane@example.com"
@@ -0,0 +1,78 @@
+import asyncio
+import signal
+import pytest
+from uvicorn import Config
+from app.core import server as server_module
+from app.core.lifecycle import Lifecycle
+from app.core.server import DrainingServer
+
+
+@pytest.fixture
+def lifecycle(monkeypatch):
+    fresh = Lifecycle()
+    monkeypatch.setattr(server_module, "lifecycle", fresh)
+    return fresh
+
+
+def make_server(drain_delay=0.2, drain_timeout=1.0) -> DrainingServer:
+    server = DrainingServer(Config(app=None), drain_delay=drain_delay, drain_timeout=drain_timeout)
+    server.servers = []
+    return server
+
+
+async def test_signal_only_sets_a_flag_until_the_delay_passes(lifecycle):
+    server = make_server()
+    server.handle_exit(signal.SIGTERM, None)
+    assert not server.should_exit and not lifecycle.draining
+
+    assert await server.on_tick(1) is False
+    assert lifecycle.draining
+
+    await asyncio.sleep(0.25)
+    assert await server.on_tick(2) is True
+
+
+async def test_second_signal_skips_the_delay(lifecycle):
+    server = make_server(drain_delay=60)
+    server.handle_exit(signal.SIGTERM, None)
+    server.handle_exit(signal.SIGTERM, None)
+    assert server.should_exit
+
+
+async def test_shutdown_waits_for_requests_in_flight(lifecycle, monkeypatch):
+    server = make_server()
+    closed_at = []
+
+    async def uvicorn_shutdown(self, sockets=None):
+        closed_at.append(lifecycle.in_flight)
+
+    monkeypatch.setattr(server_module.Server, "shutdown", uvicorn_shutdown)
+    lifecycle.request_started()
+    asyncio.get_running_loop().call_later(0.2, lifecycle.request_finished)
+
+    await server.shutdown()
+    assert closed_at == [0]
+    assert 0 < server.config.timeout_graceful_shutdown < 1.0
+
+
+async def test_shutdown_gives_up_at_the_deadline(lifecycle, monkeypatch):
+    server = make_server(drain_timeout=0.2)
+
+    async def uvicorn_shutdown(self, sockets=None):
+        pass
+
+    monkeypatch.setattr(server_module.Server, "shutdown", uvicorn_shutdown)
+    lifecycle.request_started()
+    await asyncio.wait_for(server.shutdown(), timeout=1)
+    assert lifecycle.in_flight == 1
+    assert server.config.timeout_graceful_shutdown == 0.0
+
+
+@pytest.mark.parametrize("sig", [signal.SIGTERM, signal.SIGINT])
+async def test_signal_during_shutdown_forces_the_exit(lifecycle, sig):
+    server = make_server(drain_delay=60)
+    server.handle_exit(signal.SIGTERM, None)
+    server.handle_exit(signal.SIGTERM, None)
+    assert server.should_exit and not server.force_exit
+    server.handle_exit(sig, None)
+    assert server.force_exit
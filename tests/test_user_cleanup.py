@@ -0,0 +1,69 @@
+import asyncio
+import pytest
+from app.core.config import settings
+from app.crud.crud_cleanup_job import cleanup_job
+from app.crud.crud_storage_usage import storage_usage
+from app.services.user_cleanup import UserCleanupWorker
+
+
+@pytest.fixture
+def worker(monkeypatch):
+    worker = UserCleanupWorker()
+    worker.holder = "test:1"
+    finished = []
+
+    async def finish(user_id, holder, status, **kwargs):
+        finished.append((status, kwargs))
+
+    async def delete_user(user_id):
+        return 0
+
+    monkeypatch.setattr(cleanup_job, "finish", finish)
+    monkeypatch.setattr(storage_usage, "delete_user", delete_user)
+    worker.finished = finished
+    return worker
+
+
+async def test_failure_counts_an_attempt_and_schedules_retry(worker, monkeypatch):
+    async def process(job):
+        raise RuntimeError("storage down")
+
+    monkeypatch.setattr(worker, "process", process)
+    await worker._run_job({"_id": "u1", "attempts": 0})
+    status, kwargs = worker.finished[-1]
+    assert status == "pending"
+    assert kwargs["failed_attempt"] is True
+    assert kwargs["retry_at"] is not None
+
+
+async def test_shutdown_hands_job_back_without_counting_an_attempt(worker, monkeypatch):
+    async def process(job):
+        await asyncio.sleep(10)
+
+    monkeypatch.setattr(worker, "process", process)
+    task = asyncio.create_task(worker._run_job({"_id": "u1", "attempts": 0}))
+    await asyncio.sleep(0.01)
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+    assert worker.finished == [("pending", {})]
+
+
+async def test_bookkeeping_errors_do_not_escape(worker, monkeypatch):
+    async def process(job):
+        raise RuntimeError("storage down")
+
+    async def finish(*args, **kwargs):
+        raise RuntimeError("mongo blip")
+
+    monkeypatch.setattr(worker, "process", process)
+    monkeypatch.setattr(cleanup_job, "finish", finish)
+    await worker._run_job({"_id": "u1", "attempts": 0})
+
+
+async def test_job_over_the_cap_is_failed_without_running(worker, monkeypatch):
+    async def process(job):
+        raise AssertionError("should not run")
+
+    monkeypatch.setattr(worker, "process", process)
+    await worker._run_job({"_id": "u1", "attempts": settings.USER_CLEANUP_MAX_ATTEMPTS})
+    assert worker.finished[-1][0] == "failed"
@@ -0,0 +1,62 @@
+import pytest
+from fastapi.testclient import TestClient
+from app.core.security import get_current_active_user, get_current_admin_user
+from app.crud.crud_user import user as crud_user
+from app.main import app
+from tests.test_responses import HASH, make_user
+
+
+@pytest.fixture
+def admin():
+    admin = make_user(email="admin@example.com", role="admin")
+    app.dependency_overrides[get_current_active_user] = lambda: admin
+    app.dependency_overrides[get_current_admin_user] = lambda: admin
+    yield admin
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def client():
+    # No context manager: the lifespan (Mongo, Azure) is not started
+    return TestClient(app)
+
+
+def test_admin_get_user_hides_password_hash(admin, client, monkeypatch):
+    target = make_user()
+
+    async def get(user_id):
+        return target
+
+    monkeypatch.setattr(crud_user, "get", get)
+    response = client.get(f"/api/v1/admin/users/{target.id}")
+    assert response.status_code == 200
+    assert "hashed_password" not in response.text
+    assert HASH not in response.text
+    assert response.json()["data"]["email"] == target.email
+
+
+@pytest.fixture
+def member():
+    member = make_user()
+    app.dependency_overrides[get_current_active_user] = lambda: member
+    yield member
+    app.dependency_overrides.clear()
+
+
+def test_read_me_hides_password_hash(member, client):
+    response = client.get("/api/v1/users/me")
+    assert response.status_code == 200
+    assert "hashed_password" not in response.text
+    assert HASH not in response.text
+    assert response.headers["ETag"]
+
+
+def test_update_me_hides_password_hash(member, client, monkeypatch):
+    async def update(user_id, user_in, expected_updated_at=None):
+        return member
+
+    monkeypatch.setattr(crud_user, "update", update)
+    response = client.put("/api/v1/users/me", json={"first_name": "Janet"})
+    assert response.status_code == 200
+    assert "hashed_password" not in response.text
+    assert HASH not in response.text
@@ -0,0 +1,92 @@
+import os
+from datetime import datetime, timedelta
+import pytest
+from bson import ObjectId
+from pymongo import MongoClient
+from pymongo.errors import PyMongoError
+from app.core.pagination import KEYSET_SORT, decode_cursor, encode_cursor, keyset_after
+from app.crud.crud_user import SEARCH_PROJECTION, CRUDUser
+from app.db.indexes import INDEXES
+from app.models.user_schema import normalized_fields
+from scripts.check_user_search_plans import pagination_cases, plan_problems, plan_stages, search_cases
+
+
+def test_keyset_pages_continue_into_legacy_documents():
+    oid = ObjectId()
+    dated = keyset_after(encode_cursor(datetime(2025, 1, 1), oid))
+    assert {"created_at": None} in dated["$or"]
+    assert keyset_after(encode_cursor(None, oid)) == {"created_at": None, "_id": {"$lt": oid}}
+
+
+class FakeCursor:
+    def __init__(self, docs):
+        self.docs = docs
+
+    def sort(self, *args):
+        return self
+
+    def limit(self, *args):
+        return self
+
+    async def to_list(self, length):
+        return self.docs[:length]
+
+
+@pytest.mark.parametrize("projection", [None, SEARCH_PROJECTION])
+async def test_list_page_cursor_after_a_legacy_document(projection, monkeypatch):
+    legacy = [{"_id": ObjectId(), "email": f"{i}@example.com"} for i in range(3)]
+    crud = CRUDUser()
+    crud._analytics_collection = type("Collection", (), {"find": lambda self, *args: FakeCursor(legacy)})()
+    monkeypatch.setattr("app.crud.crud_user.user_write_back.add", lambda original, changes: None)
+
+    docs, next_cursor = await crud.list_page(2, projection=projection)
+
+    assert len(docs) == 2
+    assert decode_cursor(next_cursor) == (None, legacy[1]["_id"])
+
+
+@pytest.fixture(scope="module")
+def users():
+    """A throwaway users collection on MONGODB_TEST_URL, with the declared indexes"""
+    url = os.environ.get("MONGODB_TEST_URL")
+    if not url:
+        pytest.skip("MONGODB_TEST_URL not set")
+    client = MongoClient(url, serverSelectionTimeoutMS=2000)
+    try:
+        client.admin.command("ping")
+    except PyMongoError as e:
+        pytest.skip(f"MongoDB not reachable: {e}")
+    db = client[f"test_plans_{ObjectId()}"]
+    collection = db["users"]
+    collection.create_indexes(INDEXES["users"])
+    now = datetime.utcnow()
+    docs = []
+    for i in range(2000):
+        doc = {
+            "email": f"user{i}@example.com", "first_name": f"John{i}", "last_name": "Doe",
+            "role": "admin" if i % 100 == 0 else "user", "is_active": i % 10 != 0,
+            "created_at": now - timedelta(minutes=i),
+        }
+        doc.update(normalized_fields(doc))
+        docs.append(doc)
+    collection.insert_many(docs)
+    yield collection
+    client.drop_database(db.name)
+    client.close()
+
+
+def explain_stages(collection, query):
+    explain = collection.find(query, SEARCH_PROJECTION).sort(KEYSET_SORT).limit(51).explain()
+    return plan_stages(explain["queryPlanner"]["winningPlan"])
+
+
+@pytest.mark.parametrize("name", list(search_cases()))
+def test_search_uses_an_index(users, name):
+    stages = explain_stages(users, search_cases()[name])
+    assert plan_problems(stages, sorted_by_index=False) == [], stages
+
+
+@pytest.mark.parametrize("name", list(pagination_cases()))
+def test_pages_come_sorted_from_the_keyset_index(users, name):
+    stages = explain_stages(users, pagination_cases()[name])
+    assert plan_problems(stages, sorted_by_index=True) == [], stages
@@ -0,0 +1,114 @@
+from collections import Counter
+from datetime import datetime
+from typing import Optional
+import pytest
+from bson import ObjectId
+from pymongo import ReturnDocument
+from app.crud import crud_user as crud_user_module
+from app.crud.crud_user import CRUDUser
+from app.crud.crud_user_stats import TOTALS_ID, CRUDUserStats, signup_day, signup_key, user_counts
+from app.models.user import UserUpdate
+
+DAY = datetime(2025, 3, 4, 15, 30)
+
+
+class CountedUpdate(UserUpdate):
+    """An update touching a counted field; UserUpdate itself has none today"""
+    is_active: Optional[bool] = None
+
+
+class CounterCollection:
+    """Applies the $inc/$set/$setOnInsert upserts user_stats sends, in memory"""
+
+    def __init__(self):
+        self.docs = {}
+
+    async def bulk_write(self, operations, ordered=True):
+        for op in operations:
+            doc = self.docs.setdefault(op._filter["_id"], {})
+            for field, delta in op._doc.get("$inc", {}).items():
+                doc[field] = doc.get(field, 0) + delta
+            doc.update(op._doc.get("$set", {}))
+
+    def counts(self):
+        totals = {key: value for key, value in self.docs.get(TOTALS_ID, {}).items() if key != "updated_at"}
+        signups = {key: doc["count"] for key, doc in self.docs.items() if key != TOTALS_ID}
+        return totals, signups
+
+
+@pytest.fixture
+def stats():
+    stats = CRUDUserStats()
+    stats._collection = CounterCollection()
+    return stats
+
+
+def user(**fields):
+    return {"_id": ObjectId(), "role": "user", "is_active": True, "is_verified": False, "created_at": DAY, **fields}
+
+
+def test_user_counts_and_legacy_defaults():
+    assert user_counts(user(is_verified=True), 1) == Counter({"total": 1, "active": 1, "verified": 1, "by_role.user": 1})
+    # Fields missing on legacy documents count as their defaults
+    assert user_counts({"_id": ObjectId()}, -1) == Counter({"total": -1, "active": -1, "by_role.user": -1})
+    legacy = {"_id": ObjectId.from_datetime(DAY)}
+    assert signup_day(legacy) == datetime(2025, 3, 4)
+    assert signup_day(user()) == datetime(2025, 3, 4)
+
+
+async def test_create_then_delete_cancels_out(stats):
+    created = user(role="admin", is_verified=True)
+    await stats.record_created(created)
+    totals, signups = stats._collection.counts()
+    assert totals == {"total": 1, "active": 1, "verified": 1, "by_role.admin": 1}
+    assert signups == {signup_key(DAY): 1}
+
+    await stats.record_changes([(created, None)])
+    totals, signups = stats._collection.counts()
+    assert set(totals.values()) == {0}
+    assert signups == {signup_key(DAY): 0}
+
+
+async def test_role_and_activation_flip_moves_only_those_counters(stats):
+    before = user()
+    await stats.record_created(before)
+    await stats.record_changes([(before, {**before, "role": "admin", "is_active": False})])
+    totals, signups = stats._collection.counts()
+    assert totals == {"total": 1, "active": 0, "inactive": 1, "by_role.user": 0, "by_role.admin": 1}
+    assert signups == {signup_key(DAY): 1}
+
+
+async def test_no_op_change_writes_nothing(stats):
+    before = user()
+    await stats.record_changes([(before, dict(before))])
+    assert stats._collection.docs == {}
+
+
+async def test_update_counts_the_merged_before_and_after(monkeypatch):
+    stored = {
+        "_id": ObjectId(), "email": "a@example.com", "first_name": "A", "last_name": "B",
+        "hashed_password": "x", "created_at": DAY,  # legacy: no role, is_active or updated_at
+    }
+    recorded = []
+
+    class Users:
+        async def find_one_and_update(self, query, update, return_document):
+            assert return_document is ReturnDocument.BEFORE
+            return dict(stored)
+
+    crud = CRUDUser()
+    crud._collection = Users()
+    monkeypatch.setattr(crud_user_module.user_write_back, "add", lambda original, changes: None)
+
+    async def record_stats(changes):
+        recorded.extend(changes)
+
+    monkeypatch.setattr(crud, "record_stats", record_stats)
+    updated = await crud.update(str(stored["_id"]), CountedUpdate(is_active=False))
+
+    assert updated.is_active is False
+    [(before, after)] = recorded
+    assert before == stored
+    assert after["is_active"] is False and after["email"] == stored["email"]
+    assert user_counts(after, 1) - user_counts(before, 1) == Counter({"inactive": 1})
+    assert user_counts(before, 1) - user_counts(after, 1) == Counter({"active": 1})
@@ -0,0 +1,70 @@
+import asyncio
+from datetime import datetime
+from bson import ObjectId
+from app.core.etag import version_etag, version_from_etag
+from app.crud import crud_user as crud_user_module
+from app.crud.crud_user import CRUDUser
+from app.models.user_schema import upgrade_user
+
+
+def matches(doc, query):
+    """Just enough of MongoDB's matcher for the version filter"""
+    for key, condition in query.items():
+        if key == "$or":
+            if not any(matches(doc, clause) for clause in condition):
+                return False
+        elif isinstance(condition, dict) and "$exists" in condition:
+            if (key in doc) != condition["$exists"]:
+                return False
+        elif doc.get(key) != condition:
+            return False
+    return True
+
+
+def etag_version(doc):
+    """The version an If-Match carries for ``doc`` as served (upgraded)"""
+    upgraded = dict(doc)
+    upgrade_user(upgraded)
+    return version_from_etag(version_etag(upgraded["updated_at"]))
+
+
+def test_if_match_accepts_legacy_document_without_updated_at():
+    doc = {"_id": ObjectId(), "email": "a@example.com", "created_at": datetime(2024, 5, 1, 12, 0, 0, 123000)}
+    assert matches(doc, CRUDUser._version_filter(doc["_id"], etag_version(doc)))
+
+
+def test_if_match_accepts_legacy_document_without_timestamps():
+    doc = {"_id": ObjectId(), "email": "a@example.com"}
+    assert matches(doc, CRUDUser._version_filter(doc["_id"], etag_version(doc)))
+
+
+def test_if_match_rejects_changed_document():
+    doc = {"_id": ObjectId(), "created_at": datetime(2024, 5, 1), "updated_at": datetime(2024, 6, 1)}
+    stale = datetime(2024, 5, 1)
+    assert not matches(doc, CRUDUser._version_filter(doc["_id"], stale))
+    assert matches(doc, CRUDUser._version_filter(doc["_id"], datetime(2024, 6, 1)))
+
+
+async def test_concurrent_gets_do_not_mutate_the_shared_document(monkeypatch):
+    doc = {
+        "_id": ObjectId(), "email": "a@example.com", "first_name": "A", "last_name": "B",
+        "hashed_password": "x", "created_at": datetime(2024, 5, 1),
+    }
+    raw = dict(doc)
+    written_back = []
+
+    class Collection:
+        async def find_one(self, query):
+            await asyncio.sleep(0.01)
+            return doc
+
+    crud = CRUDUser()
+    crud._collection = Collection()
+    monkeypatch.setattr(crud_user_module.user_write_back, "add", lambda original, changes: written_back.append(original))
+
+    first, second = await asyncio.gather(crud.get(str(doc["_id"])), crud.get(str(doc["_id"])))
+
+    assert doc == raw
+    assert first.updated_at == second.updated_at == doc["created_at"]
+    # Both callers saw the legacy version, so the write-back filter matches the stored document
+    assert written_back == [{"_id": doc["_id"]}, {"_id": doc["_id"]}]